@@ -1,14 +1,16 @@
 from rest_framework import routers
-from media_gallery.views import MediaViewSet
+from media_gallery.views import MediaUploadViewSet, MediaViewSet
 from players.views import PlayerViewSet
 from teams.views import TeamViewSet
 from matches.views import MatchViewSet, LineupViewSet
 from tournaments.views import TournamentViewSet, TournamentParticipationViewSet
 from grounds.views import GroundViewSet
 from financials.views import TransactionViewSet
+from jobs.views import JobViewSet
 from inventory.views import (
     InventoryCategoryViewSet,
     InventoryItemViewSet,
+    InventoryMovementViewSet,
     ItemAssignmentViewSet,
     SaleViewSet,
 )
@@ -22,8 +24,11 @@ router.register(r'tournaments', TournamentViewSet)
 router.register(r'tournament-participations', TournamentParticipationViewSet)
 router.register(r'grounds', GroundViewSet)
 router.register(r'media', MediaViewSet)
+router.register(r'media-uploads', MediaUploadViewSet)
 router.register(r'transactions', TransactionViewSet)
 router.register(r'inventory-categories', InventoryCategoryViewSet)
 router.register(r'inventory-items', InventoryItemViewSet)
 router.register(r'item-assignments', ItemAssignmentViewSet)
+router.register(r'inventory-movements', InventoryMovementViewSet)
 router.register(r'sales', SaleViewSet)
+router.register(r'jobs', JobViewSet)
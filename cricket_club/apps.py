@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class CricketClubConfig(AppConfig):
+    name = "cricket_club"
+
+    def ready(self):
+        import cricket_club.signals
@@ -0,0 +1,252 @@
+"""
+Versioned cache helpers shared by the API.
+
+Every cached payload is keyed on the current version counter of each model it
+was built from. Saving or deleting a row of a watched model bumps that
+model's counter, so old entries are never read again and simply expire; no
+code has to know which keys a change affects.
+
+A rebuild is guarded by a short lock: one request recomputes while concurrent
+requests serve the previous payload (kept under a stale key) or wait briefly
+for the fresh one, so an invalidation never sends a burst of identical
+queries to the database.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+DEFAULT_TIMEOUT = 300
+STALE_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 30
+LOCK_WAIT_SECONDS = 2.0
+LOCK_POLL_SECONDS = 0.05
+
+
+def versioned_cache_enabled():
+    """
+    Whether cached payloads and validators can be trusted: only when the cache
+    is shared by every worker (see ``VERSIONED_CACHE_ENABLED``).
+    """
+    return settings.VERSIONED_CACHE_ENABLED
+
+
+def _version_key(model):
+    return f"model-version:{model._meta.label_lower}"
+
+
+def _modified_key(model):
+    return f"model-modified:{model._meta.label_lower}"
+
+
+def model_versions(models):
+    """
+    Current version of each model, in order. A missing counter (never bumped,
+    or evicted) is seeded from the clock, so it can never line up with the
+    version of an entry that is still cached.
+    """
+    keys = [_version_key(model) for model in models]
+    stored = cache.get_many(keys)
+    missing = [key for key in keys if key not in stored]
+    if missing:
+        seed = time.time_ns()
+        for key in missing:
+            cache.add(key, seed, None)
+        stored.update(cache.get_many(missing))
+    return [stored.get(key, 0) for key in keys]
+
+
+def bump_model_version(*models):
+    """Invalidates everything cached from ``models``. Safe to call from bulk write paths."""
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+    cache.set_many({_modified_key(model): time.time() for model in models}, None)
+
+
+def model_validators(models, *parts):
+    """
+    HTTP validators for a response built from ``models``: a weak ETag over
+    their version counters and ``parts``, and the latest time any of them
+    changed. A missing timestamp is seeded with the current time, like a
+    missing counter. Both come from the cache alone, so checking them never
+    touches the database.
+    """
+    versions = model_versions(models)
+    digest = hashlib.md5(
+        "|".join([*(str(version) for version in versions), *(str(part) for part in parts)]).encode()
+    ).hexdigest()
+    keys = [_modified_key(model) for model in models]
+    modified = cache.get_many(keys)
+    missing = [key for key in keys if key not in modified]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, None)
+        modified.update(cache.get_many(missing))
+    last_modified = int(max(modified.values())) if modified else None
+    return f'W/"{digest}"', last_modified
+
+
+def invalidate_models(*models):
+    """
+    Bumps ``models`` now and again when the surrounding transaction commits,
+    so an entry rebuilt from pre-commit rows in between is dropped as well.
+    """
+    bump_model_version(*models)
+    transaction.on_commit(lambda: bump_model_version(*models))
+
+
+def versioned_key(name, models, *parts):
+    versions = "-".join(str(version) for version in model_versions(models))
+    suffix = ""
+    if parts:
+        suffix = ":" + hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f"{name}:v{versions}{suffix}"
+
+
+def get_or_build(name, models, build, *parts, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns the cached payload for ``name``/``parts`` at the current versions
+    of ``models``, calling ``build()`` at most once across concurrent callers.
+    Without a shared cache every call builds the payload afresh.
+    """
+    if not versioned_cache_enabled():
+        return build()
+
+    key = versioned_key(name, models, *parts)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    stale_key = f"{name}:stale" + (key[key.rfind(":"):] if parts else "")
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, True, LOCK_TIMEOUT):
+        try:
+            value = build()
+            cache.set(key, value, timeout)
+            cache.set(stale_key, value, STALE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    stale = cache.get(stale_key)
+    if stale is not None:
+        return stale
+
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_SECONDS)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return build()
+
+
+def _bump_sender(sender, **kwargs):
+    invalidate_models(sender)
+
+
+def _bump_m2m(sender, instance, model, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_models(type(instance), model)
+
+
+def watch_models(*models):
+    """Bumps each model's version on post_save/post_delete and on changes to its many-to-many fields."""
+    for model in models:
+        label = model._meta.label_lower
+        post_save.connect(_bump_sender, sender=model, dispatch_uid=f"cache-version-{label}-save")
+        post_delete.connect(_bump_sender, sender=model, dispatch_uid=f"cache-version-{label}-delete")
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            m2m_changed.connect(
+                _bump_m2m,
+                sender=through,
+                dispatch_uid=f"cache-version-{through._meta.label_lower}-m2m",
+            )
+
+
+class CachedListMixin:
+    """
+    Serves ``list`` responses for non-staff users from the versioned cache.
+    ``cache_models`` names every model the serialized rows read from.
+    The full absolute URL is part of the key, so filters, cursors and the
+    host in absolute links each get their own entry.
+    """
+
+    cache_models = ()
+    cache_timeout = DEFAULT_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+        data = get_or_build(
+            f"list:{self.basename}",
+            self.cache_models,
+            build,
+            request.build_absolute_uri(),
+            timeout=self.cache_timeout,
+        )
+        return Response(data)
+
+
+def conditional_response(request, models, build_response, *parts, send_last_modified=True):
+    """
+    Returns 304 Not Modified when the client's If-None-Match/If-Modified-Since
+    still match ``models`` (and ``parts``); otherwise calls ``build_response()``
+    and stamps the validators on it. Responses that also depend on the clock
+    pass ``send_last_modified=False`` and a time bucket in ``parts``. Staff
+    responses differ from the public ones, so they are always built, as is
+    everything when the cache is not shared.
+    """
+    user = getattr(request, "user", None)
+    if (user is not None and user.is_staff) or not versioned_cache_enabled():
+        return build_response()
+
+    renderer = getattr(request, "accepted_renderer", None)
+    etag, last_modified = model_validators(
+        models, request.build_absolute_uri(), getattr(renderer, "format", ""), *parts
+    )
+    if not send_last_modified:
+        last_modified = None
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = build_response()
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """Adds ETag/Last-Modified validators, from ``cache_models``, to ``list`` and ``retrieve``."""
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.cache_models, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.cache_models, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
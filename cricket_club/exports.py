@@ -0,0 +1,88 @@
+"""
+Streaming file exports. Rows are read from the database a chunk at a time and
+written out as they arrive, so an export's memory use does not grow with its
+length.
+"""
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def iter_by_pk(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the rows of ``queryset`` in primary-key order, one keyset query
+    (``pk > last``) per chunk. Unlike ``iterator()``, this stays bounded on
+    MySQL, whose driver buffers a whole result set client-side.
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1].pk
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the formatted line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def streaming_csv_response(filename, header, rows):
+    response = StreamingHttpResponse(iter_csv(header, rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _load_openpyxl():
+    try:
+        from openpyxl import Workbook
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("XLSX export needs openpyxl; install it from requirements.txt.") from exc
+    return Workbook
+
+
+def write_xlsx(fileobj, header, rows, sheet_title="Export"):
+    """
+    Writes ``rows`` to ``fileobj`` as a single-sheet workbook. The workbook is
+    write-only, so openpyxl spools each row to disk as it is appended instead
+    of keeping the sheet in memory.
+    """
+    Workbook = _load_openpyxl()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(fileobj)
+
+
+def streaming_xlsx_response(filename, header, rows, sheet_title="Export"):
+    """
+    An XLSX file can only be finished once every row is in (the zip index
+    comes last), so the workbook is built in a temporary file and then
+    streamed from disk in blocks.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        write_xlsx(spool, header, rows, sheet_title)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
@@ -0,0 +1,76 @@
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def parse_date(value):
+    return date.fromisoformat(value)
+
+
+def parse_bool(value):
+    lowered = value.strip().lower()
+    if lowered in ("true", "1", "yes"):
+        return True
+    if lowered in ("false", "0", "no"):
+        return False
+    raise ValueError(value)
+
+
+def choice(choices):
+    allowed = {key for key, _ in choices}
+
+    def parse(value):
+        if value not in allowed:
+            raise ValueError(value)
+        return value
+
+    return parse
+
+
+def start_of_day(value):
+    """Parses a date into the aware datetime it starts at, for ``__gte`` on DateTimeFields."""
+    return timezone.make_aware(datetime.combine(parse_date(value), time.min))
+
+
+def start_of_next_day(value):
+    """Parses a date into the aware start of the following day, for ``__lt`` on DateTimeFields."""
+    return timezone.make_aware(datetime.combine(parse_date(value) + timedelta(days=1), time.min))
+
+
+def apply_filter_params(queryset, values, filter_params):
+    """
+    Filters ``queryset`` by the entries of ``values`` (a mapping of parameter
+    to raw string) named in ``filter_params``; unparseable values are a 400.
+    """
+    filters = {}
+    errors = {}
+    for param, (lookup, parse) in filter_params.items():
+        raw_value = values.get(param)
+        if raw_value in (None, ""):
+            continue
+        try:
+            filters[lookup] = parse(raw_value)
+        except (TypeError, ValueError):
+            errors[param] = f"Invalid value '{raw_value}'."
+    if errors:
+        raise ValidationError(errors)
+    return queryset.filter(**filters)
+
+
+class QueryParamFilterMixin:
+    """
+    Applies ``filter_params`` to ``filter_actions`` (list requests by default). Each entry maps a query
+    parameter to ``(lookup, parser)``; the lookups compare the raw column so the
+    database can use its index (date ranges become ``>=``/``<`` bounds rather
+    than ``DATE(column)`` expressions). Unparseable values are a 400.
+    """
+
+    filter_params = {}
+    filter_actions = ("list",)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.filter_actions:
+            return queryset
+        return apply_filter_params(queryset, self.request.query_params, self.filter_params)
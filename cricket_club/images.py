@@ -0,0 +1,236 @@
+"""
+Resized WebP variants of uploaded images.
+
+Every image field listed in ``cricket_club.signals`` gets a ``thumbnail`` and a
+``medium`` rendition next to the original, under a name derived from the
+original's storage name (``variants/<path>/<variant>.webp``), so no extra
+columns are needed. Variants are written when a row with a new image is saved
+and deleted when that image is replaced or its row is deleted. Anything
+uploaded before that is rendered by a background job the first time it is
+serialized; until then, and for files that cannot be rendered, responses point
+at the original.
+"""
+import hashlib
+import logging
+import os
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from jobs.services import enqueue
+
+from .upload_validators import ALLOWED_IMAGE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+# Longest edge, in pixels; the aspect ratio is kept and images are never upscaled.
+VARIANT_SIZES = {
+    "thumbnail": 320,
+    "medium": 1024,
+}
+WEBP_QUALITY = 80
+VARIANT_ROOT = "variants"
+
+# Whether an original's variants exist, keyed on its storage name. Names are
+# never reused for different content, so the state cannot go stale; it only
+# saves a storage lookup per serialized row.
+VARIANTS_READY = "ready"
+VARIANTS_PENDING = "pending"
+VARIANTS_FAILED = "failed"
+VARIANT_STATE_TIMEOUTS = {
+    VARIANTS_READY: 24 * 60 * 60,
+    # A lost render job is queued again after this long.
+    VARIANTS_PENDING: 10 * 60,
+    # Broken files are not decoded again on every request.
+    VARIANTS_FAILED: 24 * 60 * 60,
+}
+
+
+def variant_name(name, variant):
+    root, _extension = os.path.splitext(name)
+    return f"{VARIANT_ROOT}/{root}/{variant}.webp"
+
+
+def has_variants(name):
+    """Only image uploads get variants; gallery videos and other files keep just the original."""
+    return os.path.splitext(name or "")[1].lower() in ALLOWED_IMAGE_EXTENSIONS
+
+
+def _state_key(name):
+    return f"image-variants:{hashlib.md5(name.encode()).hexdigest()}"
+
+
+def _set_state(name, state):
+    cache.set(_state_key(name), state, VARIANT_STATE_TIMEOUTS[state])
+
+
+def _render(image, size):
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_variants(name, *, image=None, storage=default_storage):
+    """
+    Writes every variant of the original stored as ``name``. ``image`` is an
+    already-decoded Pillow image of the same file, when the caller has one.
+    Returns the names written; a file that is not a readable image yields
+    none and is remembered as failed.
+    """
+    if not has_variants(name):
+        return []
+    written = []
+    try:
+        if image is None:
+            with storage.open(name, "rb") as handle:
+                image = Image.open(handle)
+                image.load()
+        for variant, size in VARIANT_SIZES.items():
+            target = variant_name(name, variant)
+            if storage.exists(target):
+                storage.delete(target)
+            written.append(storage.save(target, ContentFile(_render(image, size))))
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        logger.warning("Could not render image variants for %s.", name, exc_info=True)
+        _set_state(name, VARIANTS_FAILED)
+        return []
+    _set_state(name, VARIANTS_READY)
+    return written
+
+
+def delete_variants(name, storage=default_storage):
+    for variant in VARIANT_SIZES:
+        storage.delete(variant_name(name, variant))
+    cache.delete(_state_key(name))
+
+
+def variants_ready(name, storage=default_storage):
+    """
+    Whether the variants of ``name`` exist. Missing ones are queued for the
+    ``render_image_variants`` job (once per ``VARIANTS_PENDING`` window) and
+    reported as not ready, so serializing a row never decodes an image.
+    """
+    key = _state_key(name)
+    state = cache.get(key)
+    if state is not None:
+        return state == VARIANTS_READY
+    if all(storage.exists(variant_name(name, variant)) for variant in VARIANT_SIZES):
+        _set_state(name, VARIANTS_READY)
+        return True
+    if cache.add(key, VARIANTS_PENDING, VARIANT_STATE_TIMEOUTS[VARIANTS_PENDING]):
+        # Imported here: cricket_club.jobs imports this module for its handler.
+        from .jobs import RENDER_IMAGE_VARIANTS_JOB
+
+        enqueue(RENDER_IMAGE_VARIANTS_JOB, {"name": name})
+    return False
+
+
+def variant_url(field_file, variant):
+    """URL of ``variant`` for ``field_file``, or of the original until it is rendered; None without an image."""
+    if not field_file or not has_variants(field_file.name):
+        return None
+    if variants_ready(field_file.name, field_file.storage):
+        return field_file.storage.url(variant_name(field_file.name, variant))
+    return field_file.url
+
+
+def watch_image_fields(*model_fields):
+    """
+    Renders variants whenever a row of each ``(model, field_name)`` pair is
+    saved with a new upload, and deletes the old ones once the image is
+    replaced, cleared or its row deleted.
+    """
+    for model, field_name in model_fields:
+        uid = f"image-variants:{model._meta.label_lower}.{field_name}"
+        post_init.connect(_remember_image(field_name), sender=model, weak=False, dispatch_uid=uid)
+        pre_save.connect(_note_upload(field_name), sender=model, weak=False, dispatch_uid=uid)
+        post_save.connect(_render_upload(field_name), sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(_delete_image_variants(field_name), sender=model, weak=False, dispatch_uid=uid)
+
+
+def _loaded_images(instance):
+    return instance.__dict__.setdefault("_loaded_image_names", {})
+
+
+def _remember_image(field_name):
+    def receiver(sender, instance, **kwargs):
+        # The raw attribute is the stored name for rows loaded from the
+        # database; reading it skips building a FieldFile per instance.
+        value = instance.__dict__.get(field_name)
+        _loaded_images(instance)[field_name] = getattr(value, "name", value) or ""
+
+    return receiver
+
+
+def _note_upload(field_name):
+    def receiver(sender, instance, raw=False, **kwargs):
+        if field_name not in instance.__dict__:
+            return  # Deferred, so not assigned since the row was loaded.
+        field_file = getattr(instance, field_name)
+        # Only a file assigned since the row was loaded is uncommitted; it is
+        # written to storage later in save(), which also drops the upload object.
+        if raw or not field_file or field_file._committed:
+            return
+        upload = getattr(field_file, "_file", None)
+        instance.__dict__.setdefault("_pending_image_variants", {})[field_name] = getattr(
+            upload, "decoded_image", None
+        )
+
+    return receiver
+
+
+def _render_upload(field_name):
+    def receiver(sender, instance, **kwargs):
+        if field_name not in instance.__dict__:
+            return
+        field_file = getattr(instance, field_name)
+        pending = instance.__dict__.get("_pending_image_variants", {})
+        if field_name in pending:
+            generate_variants(field_file.name, image=pending.pop(field_name), storage=field_file.storage)
+
+        loaded = _loaded_images(instance)
+        previous, current = loaded.get(field_name), field_file.name or ""
+        if previous and previous != current and has_variants(previous):
+            storage = field_file.storage
+            transaction.on_commit(lambda: delete_variants(previous, storage))
+        loaded[field_name] = current
+
+    return receiver
+
+
+def _delete_image_variants(field_name):
+    def receiver(sender, instance, **kwargs):
+        if field_name not in instance.__dict__:
+            return  # Loading a deferred field would query the deleted row.
+        field_file = getattr(instance, field_name)
+        if field_file and has_variants(field_file.name):
+            name, storage = field_file.name, field_file.storage
+            transaction.on_commit(lambda: delete_variants(name, storage))
+
+    return receiver
+
+
+class ImageVariantField(serializers.ReadOnlyField):
+    """Read-only URL of one variant of an image field, absolute when a request is in context."""
+
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        url = variant_url(value, self.variant)
+        if url is None:
+            return None
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
@@ -0,0 +1,11 @@
+"""Background job handlers for the project-wide helpers."""
+from jobs.services import register
+
+from .images import generate_variants
+
+RENDER_IMAGE_VARIANTS_JOB = "cricket_club.render_image_variants"
+
+
+@register(RENDER_IMAGE_VARIANTS_JOB)
+def render_image_variants(name):
+    return {"variants": generate_variants(name)}
@@ -0,0 +1,64 @@
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from grounds.models import Ground
+from inventory.models import InventoryItem
+from matches.models import Match
+from media_gallery.models import Media
+from media_gallery.services import approved_media_counts
+from players.models import Player
+from teams.models import Team
+from tournaments.models import Tournament, TournamentParticipation
+
+from .cache import get_or_build
+
+KPIS_CACHE_TIMEOUT = 60
+
+# The cached KPIs are keyed on the version of each of these models.
+KPI_MODELS = (Player, Match, Team, Ground, InventoryItem, Media, Tournament, TournamentParticipation)
+
+
+def compute_kpis():
+    """Builds the KPI payload with one aggregate query per table."""
+    now = timezone.now()
+    today = now.date()
+
+    match_counts = Match.objects.aggregate(
+        total=Count("id"),
+        upcoming=Count("id", filter=Q(date__gte=now)),
+        completed=Count("id", filter=Q(date__lt=now)),
+        win=Count("id", filter=Q(result="win")),
+        loss=Count("id", filter=Q(result="loss")),
+        draw=Count("id", filter=Q(result="draw")),
+        no_result=Count("id", filter=Q(result="no_result")),
+    )
+    tournament_counts = Tournament.objects.aggregate(
+        total=Count("id"),
+        upcoming=Count("id", filter=Q(start_date__gte=today)),
+        completed=Count("id", filter=Q(start_date__lt=today)),
+    )
+
+    return {
+        "total_players": Player.objects.count(),
+        "total_matches": match_counts["total"],
+        "upcoming_matches": match_counts["upcoming"],
+        "completed_matches": match_counts["completed"],
+        "total_teams": Team.objects.count(),
+        "total_grounds": Ground.objects.count(),
+        "total_inventory_items": InventoryItem.objects.count(),
+        "total_media": sum(approved_media_counts().values()),
+        "total_tournaments": tournament_counts["total"],
+        "upcoming_tournaments": tournament_counts["upcoming"],
+        "completed_tournaments": tournament_counts["completed"],
+        "total_tournament_participations": TournamentParticipation.objects.count(),
+        "results": {
+            "win": match_counts["win"],
+            "loss": match_counts["loss"],
+            "draw": match_counts["draw"],
+            "no_result": match_counts["no_result"],
+        },
+    }
+
+
+def get_kpis():
+    return get_or_build("kpis", KPI_MODELS, compute_kpis, timeout=KPIS_CACHE_TIMEOUT)
@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the primary key. Page cost stays flat however deep
+    the client scrolls because each page is a ``WHERE id > cursor`` seek.
+    """
+    ordering = "id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class NewestFirstCursorPagination(IdCursorPagination):
+    """Same seek pagination, newest rows first."""
+    ordering = "-id"
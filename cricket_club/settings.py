@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 from urllib.parse import urlparse
 
 import dj_database_url
@@ -37,6 +38,12 @@ def _merge_unique(*values):
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resumable (chunked) media uploads: chunks are appended to a part file here,
+# which must be on a volume shared by every app server, then moved into storage.
+MEDIA_UPLOAD_TEMP_DIR = os.getenv("MEDIA_UPLOAD_TEMP_DIR", os.path.join(BASE_DIR, "upload_parts"))
+MEDIA_UPLOAD_MAX_BYTES = int(os.getenv("MEDIA_UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+MEDIA_UPLOAD_CHUNK_MAX_BYTES = int(os.getenv("MEDIA_UPLOAD_CHUNK_MAX_BYTES", str(8 * 1024 * 1024)))
+
 # Custom club settings
 MONTHLY_FEE = 750
 
@@ -49,6 +56,42 @@ PHONEPE_CONFIG = {
     "CALLBACK_URL": "http://kk11.in/payment/status",  # Update this in production
 }
 
+# Twilio WhatsApp notifications
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER")
+TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL", "https://api.twilio.com")
+WHATSAPP_MAX_WORKERS = int(os.getenv("WHATSAPP_MAX_WORKERS", "8"))
+WHATSAPP_RATE_PER_SECOND = float(os.getenv("WHATSAPP_RATE_PER_SECOND", "10"))
+
+# Shared cache: Redis when REDIS_URL is set, per-process memory otherwise (tests, local dev).
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "cricket_club",
+            "TIMEOUT": 300,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "cricket-club",
+            "TIMEOUT": 300,
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+# Versioned caching and the ETag/Last-Modified validators built on it rely on
+# every worker seeing the same version counters. A per-process cache keeps one
+# set per worker, so writes handled by one worker would go unnoticed by the
+# others; it is only trusted by the (single-process) test runner.
+RUNNING_TESTS = sys.argv[1:2] == ["test"]
+VERSIONED_CACHE_ENABLED = bool(REDIS_URL) or RUNNING_TESTS
+
 
 SECRET_KEY = os.getenv(
     "DJANGO_SECRET_KEY",
@@ -93,6 +136,9 @@ INSTALLED_APPS = [
     "tournaments",
     "grounds",
     "media_gallery",
+    "jobs",
+    "notifications",
+    "cricket_club",
     "rest_framework",
     "rest_framework_simplejwt",
     "corsheaders",
@@ -238,6 +284,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'cricket_club.pagination.IdCursorPagination',
 }
 
 SIMPLE_JWT = {
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+
+from inventory.models import InventoryCategory, InventoryItem, InventoryMovement, ItemAssignment, Sale
+from media_gallery.models import Media
+from players.models import Membership, MembershipLeave, Player
+from teams.models import Team
+
+from .cache import watch_models
+from .images import watch_image_fields
+from .kpis import KPI_MODELS
+
+# Every model read by a cached payload (KPIs, dashboard fragments, public lists, the stock report).
+watch_models(*KPI_MODELS, Membership, MembershipLeave, get_user_model())
+watch_models(InventoryCategory, InventoryMovement, ItemAssignment, Sale)
+
+watch_image_fields(
+    (Player, "profile_picture"),
+    (Team, "logo"),
+    (InventoryCategory, "image"),
+    (InventoryItem, "image"),
+    (Media, "file"),
+)
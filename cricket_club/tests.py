@@ -0,0 +1,266 @@
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from PIL import ExifTags, Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from cricket_club.cache import bump_model_version, get_or_build, model_versions, versioned_key
+from cricket_club.upload_validators import validate_uploaded_image
+from cricket_club.kpis import KPIS_CACHE_TIMEOUT
+from matches.models import Match
+from financials.models import Transaction
+from players.models import Player
+from players.services import refresh_player_membership
+from teams.models import Team
+from tournaments.models import Tournament
+
+
+class KPIsViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Home XI")
+        now = timezone.now()
+        for days, result in ((-7, "win"), (-3, "loss"), (-1, "win"), (5, None)):
+            Match.objects.create(
+                team1=self.team,
+                external_opponent="Visitors",
+                date=now + timedelta(days=days),
+                result=result,
+            )
+        Tournament.objects.create(name="Past Cup", start_date=now.date() - timedelta(days=30), entry_fee=100)
+        cache.clear()
+
+    def test_counts_come_from_grouped_aggregates(self):
+        with self.assertNumQueries(8):
+            response = self.client.get("/api/kpis/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_matches"], 4)
+        self.assertEqual(response.data["upcoming_matches"], 1)
+        self.assertEqual(response.data["completed_matches"], 3)
+        self.assertEqual(response.data["results"], {"win": 2, "loss": 1, "draw": 0, "no_result": 0})
+        self.assertEqual(response.data["completed_tournaments"], 1)
+        self.assertEqual(response.data["upcoming_tournaments"], 0)
+
+    def test_repeat_requests_are_served_from_cache_until_a_model_changes(self):
+        self.client.get("/api/kpis/")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/kpis/")
+        self.assertEqual(cached.data["total_players"], 0)
+
+        Player.objects.create(first_name="New", last_name="Member", phone_number="8400000001")
+        refreshed = self.client.get("/api/kpis/")
+        self.assertEqual(refreshed.data["total_players"], 1)
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_saving_a_watched_model_invalidates_dependent_entries(self):
+        builds = []
+        build = lambda: builds.append(1) or len(builds)
+
+        self.assertEqual(get_or_build("test:teams", (Team,), build), 1)
+        self.assertEqual(get_or_build("test:teams", (Team,), build), 1)
+        self.assertEqual(get_or_build("test:matches", (Match,), build), 2)
+
+        Team.objects.create(name="Invalidator")
+
+        self.assertEqual(get_or_build("test:teams", (Team,), build), 3)
+        self.assertEqual(get_or_build("test:matches", (Match,), build), 2)
+
+    def test_many_to_many_changes_bump_both_sides(self):
+        team = Team.objects.create(name="Roster")
+        player = Player.objects.create(first_name="Roster", last_name="Member", phone_number="8400000002")
+        before = model_versions((Team, Player))
+
+        team.players.add(player)
+
+        after = model_versions((Team, Player))
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+    def test_concurrent_misses_build_once(self):
+        builds = []
+        release = threading.Event()
+
+        def slow_build():
+            builds.append(1)
+            release.wait(1)
+            return "fresh"
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            futures = [pool.submit(get_or_build, "test:stampede", (Team,), slow_build) for _ in range(6)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(builds, [1])
+        self.assertEqual(results, ["fresh"] * 6)
+
+    def test_waiters_get_the_previous_payload_while_one_caller_rebuilds(self):
+        get_or_build("test:stale", (Team,), lambda: "old")
+        bump_model_version(Team)
+        cache.add(versioned_key("test:stale", (Team,)) + ":lock", True)
+
+        self.assertEqual(get_or_build("test:stale", (Team,), lambda: "new"), "old")
+
+    def test_public_lists_are_served_from_cache_until_data_changes(self):
+        client = APIClient()
+        Team.objects.create(name="Cached XI")
+        client.get("/api/teams/")
+
+        with self.assertNumQueries(0):
+            cached = client.get("/api/teams/")
+        self.assertEqual([team["name"] for team in cached.data["results"]], ["Cached XI"])
+
+        Team.objects.create(name="Fresh XI")
+        refreshed = client.get("/api/teams/")
+        self.assertEqual(len(refreshed.data["results"]), 2)
+
+    def test_bulk_membership_updates_invalidate_player_lists(self):
+        client = APIClient()
+        player = Player.objects.create(first_name="Bulk", last_name="Status", phone_number="8400000003")
+        self.assertTrue(client.get("/api/players/").data["results"][0]["membership_active"])
+
+        # bulk_create skips signals; the membership refresh's UPDATE must invalidate on its own.
+        Transaction.objects.bulk_create(
+            [Transaction(player=player, category="monthly", amount=750, due_date=timezone.localdate() - timedelta(days=60))]
+        )
+        refresh_player_membership(player.id)
+
+        response = client.get("/api/players/")
+        self.assertFalse(response.data["results"][0]["membership_active"])
+
+    @override_settings(VERSIONED_CACHE_ENABLED=False)
+    def test_per_process_cache_is_bypassed(self):
+        builds = []
+        build = lambda: builds.append(1) or len(builds)
+
+        self.assertEqual(get_or_build("test:unshared", (Team,), build), 1)
+        self.assertEqual(get_or_build("test:unshared", (Team,), build), 2)
+        self.assertIsNone(cache.get(versioned_key("test:unshared", (Team,))))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Validated XI")
+
+    def test_matching_etag_returns_not_modified_without_queries(self):
+        first = self.client.get("/api/teams/")
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first["ETag"].startswith('W/"'))
+
+        with self.assertNumQueries(0):
+            repeat = self.client.get("/api/teams/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(repeat.content, b"")
+
+    def test_changes_produce_a_new_etag(self):
+        first = self.client.get(f"/api/teams/{self.team.id}/")
+
+        Team.objects.filter(pk=self.team.pk).update(name="Renamed XI")
+        bump_model_version(Team)
+        changed = self.client.get(f"/api/teams/{self.team.id}/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed.data["name"], "Renamed XI")
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_etag_differs_per_url(self):
+        listing = self.client.get("/api/teams/")
+        detail = self.client.get(f"/api/teams/{self.team.id}/", HTTP_IF_NONE_MATCH=listing["ETag"])
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
+
+    def test_kpi_etag_turns_over_with_the_cache_window(self):
+        Player.objects.create(first_name="Last", last_name="Modified", phone_number="8400000004")
+        with mock.patch("cricket_club.views.time.time", return_value=1_000_000):
+            first = self.client.get("/api/kpis/")
+            self.assertNotIn("Last-Modified", first)
+            with self.assertNumQueries(0):
+                repeat = self.client.get("/api/kpis/", HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A match can move from upcoming to completed without any write.
+        with mock.patch("cricket_club.views.time.time", return_value=1_000_000 + KPIS_CACHE_TIMEOUT):
+            later = self.client.get("/api/kpis/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(later.status_code, status.HTTP_200_OK)
+
+    @override_settings(VERSIONED_CACHE_ENABLED=False)
+    def test_no_validators_without_a_shared_cache(self):
+        response = self.client.get("/api/teams/")
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_staff_responses_carry_no_validators(self):
+        staff = get_user_model().objects.create_user(phone_number="8400000005", password="password", is_staff=True)
+        self.client.force_authenticate(staff)
+        self.assertNotIn("ETag", self.client.get("/api/teams/"))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class UploadValidationTests(TestCase):
+    def _upload(self, image, name="photo.jpg", format="JPEG", **save_kwargs):
+        buffer = BytesIO()
+        image.save(buffer, format=format, **save_kwargs)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{format.lower()}")
+
+    def test_metadata_reflects_exif_orientation(self):
+        exif = Image.Exif()
+        exif[ExifTags.Base.Orientation] = 6
+        upload = self._upload(Image.new("RGB", (40, 30), "red"), exif=exif)
+
+        validate_uploaded_image(upload)
+
+        self.assertEqual(upload.image_metadata, {"width": 30, "height": 40, "format": "JPEG", "orientation": 6})
+        self.assertEqual(upload.decoded_image.size, (40, 30))
+        self.assertEqual(upload.tell(), 0)
+
+    def test_oversized_dimensions_are_rejected_from_the_header(self):
+        upload = self._upload(Image.new("RGB", (1, 1)), name="bomb.png", format="PNG")
+        data = bytearray(upload.read())
+        # Rewrite the IHDR chunk to claim 20000x20000 pixels; the pixel data no longer matches.
+        data[16:24] = struct.pack(">II", 20000, 20000)
+        data[29:33] = struct.pack(">I", zlib.crc32(bytes(data[12:29])))
+        bomb = SimpleUploadedFile("bomb.png", bytes(data), content_type="image/png")
+
+        with self.assertRaisesMessage(ValidationError, "Image dimensions are too large."):
+            validate_uploaded_image(bomb)
+
+    def test_upload_is_decoded_once_for_validation_and_variants(self):
+        admin = get_user_model().objects.create_user(phone_number="8400000006", password="password", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        with mock.patch("PIL.Image.open", wraps=Image.open) as image_open:
+            response = client.post(
+                "/api/teams/",
+                {"name": "Logo XI", "logo": self._upload(Image.new("RGB", (600, 400), "blue"), name="logo.jpg")},
+                format="multipart",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(image_open.call_count, 1)
+        self.assertTrue(response.data["thumbnail_url"].endswith("/thumbnail.webp"))
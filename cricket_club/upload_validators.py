@@ -1,17 +1,29 @@
 import os
 
-from PIL import Image, UnidentifiedImageError
+from PIL import ExifTags, Image, UnidentifiedImageError
 from rest_framework import serializers
 
 
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
 ALLOWED_IMAGE_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
 MAX_IMAGE_SIZE_BYTES = 5 * 1024 * 1024
+# Checked from the header before any pixel is decoded; a few-KB PNG can claim gigapixels.
+MAX_IMAGE_PIXELS = 40 * 1000 * 1000
+# EXIF orientations that rotate the picture by 90 degrees, swapping its displayed width and height.
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
 
 
 def validate_uploaded_image(file_obj):
+    """
+    Validates an uploaded image with a single decode. On success the upload
+    carries the decoded Pillow image as ``decoded_image`` (picked up by the
+    variant pipeline in ``cricket_club.images``) and its ``image_metadata``:
+    displayed width and height, format and EXIF orientation.
+    """
     if not file_obj:
         return file_obj
+    if hasattr(file_obj, "image_metadata"):
+        return file_obj
 
     extension = os.path.splitext(file_obj.name or "")[1].lower()
     if extension not in ALLOWED_IMAGE_EXTENSIONS:
@@ -28,15 +40,42 @@ def validate_uploaded_image(file_obj):
 
     try:
         file_obj.seek(0)
-        with Image.open(file_obj) as image:
-            image.verify()
-            if image.format not in ALLOWED_IMAGE_FORMATS:
-                raise serializers.ValidationError(
-                    "Unsupported image format. Allowed: JPEG, PNG, WEBP, GIF."
-                )
-    except (UnidentifiedImageError, OSError, ValueError):
+        # open() only parses the header, so format and dimensions are known
+        # before load() decodes the pixels.
+        image = Image.open(file_obj)
+        if image.format not in ALLOWED_IMAGE_FORMATS:
+            raise serializers.ValidationError(
+                "Unsupported image format. Allowed: JPEG, PNG, WEBP, GIF."
+            )
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise serializers.ValidationError("Image dimensions are too large.")
+        image.load()
+    except Image.DecompressionBombError:
+        raise serializers.ValidationError("Image dimensions are too large.")
+    except (UnidentifiedImageError, OSError, ValueError, SyntaxError):
         raise serializers.ValidationError("Uploaded file is not a valid image.")
     finally:
         file_obj.seek(0)
 
+    orientation = image.getexif().get(ExifTags.Base.Orientation, 1)
+    width, height = image.size
+    if orientation in TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    file_obj.decoded_image = image
+    file_obj.image_metadata = {
+        "width": width,
+        "height": height,
+        "format": image.format,
+        "orientation": orientation,
+    }
     return file_obj
+
+
+class ValidatedImageField(serializers.ImageField):
+    """
+    ImageField validated by ``validate_uploaded_image`` alone; DRF's default
+    runs its own Pillow pass, which would decode every upload twice.
+    """
+
+    def to_internal_value(self, data):
+        return validate_uploaded_image(serializers.FileField.to_internal_value(self, data))
@@ -19,11 +19,14 @@ else:
     raise SystemExit("DB not reachable, exiting.")
 PY
 
-echo "Running migrations..."
-python manage.py migrate --noinput
+# The worker container shares this entrypoint but leaves migrations to web.
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+  echo "Running migrations..."
+  python manage.py migrate --noinput
 
-echo "Collecting static..."
-python manage.py collectstatic --noinput
+  echo "Collecting static..."
+  python manage.py collectstatic --noinput
+fi
 
 echo "Starting server..."
 exec "$@"
\ No newline at end of file
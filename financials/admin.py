@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import MembershipFeeSchedule, Transaction
+from .models import MembershipFeeSchedule, PaymentAttempt, Transaction
 
 
 @admin.register(MembershipFeeSchedule)
@@ -13,3 +13,10 @@ class TransactionAdmin(admin.ModelAdmin):
     list_filter = ('category', 'paid', 'waived', 'due_date')
 
 admin.site.register(Transaction, TransactionAdmin)
+
+
+@admin.register(PaymentAttempt)
+class PaymentAttemptAdmin(admin.ModelAdmin):
+    list_display = ('merchant_transaction_id', 'transaction', 'amount', 'status', 'created_at', 'settled_at')
+    search_fields = ['merchant_transaction_id']
+    list_filter = ('status',)
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class FinancialsConfig(AppConfig):
     name = "financials"
+
+    def ready(self):
+        # Membership upkeep only. The payment notification receivers in
+        # ``financials.signals`` are not connected.
+        import financials.receivers
@@ -0,0 +1,48 @@
+from cricket_club.exports import iter_by_pk
+
+TRANSACTION_EXPORT_HEADER = (
+    "id",
+    "player_id",
+    "player",
+    "phone_number",
+    "category",
+    "amount",
+    "due_date",
+    "paid",
+    "payment_date",
+    "waived",
+    "waived_reason",
+)
+
+
+def transaction_export_rows(queryset):
+    """Ledger rows with the player's name joined in, read in primary-key chunks."""
+    transactions = queryset.select_related("player").only(
+        "id",
+        "category",
+        "amount",
+        "due_date",
+        "paid",
+        "payment_date",
+        "waived",
+        "waived_reason",
+        "player__id",
+        "player__first_name",
+        "player__last_name",
+        "player__phone_number",
+    )
+    for transaction in iter_by_pk(transactions):
+        player = transaction.player
+        yield (
+            transaction.id,
+            player.id,
+            f"{player.first_name} {player.last_name}".strip(),
+            player.phone_number or "",
+            transaction.category,
+            transaction.amount,
+            transaction.due_date,
+            transaction.paid,
+            transaction.payment_date,
+            transaction.waived,
+            transaction.waived_reason,
+        )
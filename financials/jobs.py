@@ -0,0 +1,122 @@
+"""Background job handlers for billing, invoice notifications and PhonePe polling."""
+from datetime import time, timedelta
+
+from django.db import transaction as db_transaction
+from django.utils.dateparse import parse_date
+
+from jobs.models import Job
+from jobs.services import RetryLater, enqueue, on_worker_boot, register, schedule_daily
+from notifications.models import WhatsAppDelivery
+from notifications.services import notify_invoices_issued
+
+from .models import PaymentAttempt, Transaction
+from .payments import ALREADY_PAID, NOT_FOUND, WAIVED, lookup_payment, mark_attempt_failed, settle_payment
+from .phonepe_utils import check_payment_status, warm_phonepe_client
+from .reconciliation import reconcile_pending_payments
+from .services import generate_monthly_invoices
+
+GENERATE_MONTHLY_INVOICES_JOB = "financials.generate_monthly_invoices"
+INVOICES_ISSUED_NOTIFICATION_JOB = "financials.notify_invoices_issued"
+POLL_PAYMENT_STATUS_JOB = "financials.poll_payment_status"
+RECONCILE_PENDING_PAYMENTS_JOB = "financials.reconcile_pending_payments"
+
+on_worker_boot(warm_phonepe_client)
+
+# Nightly, ahead of the membership refresh, so members whose callback was lost are not lapsed.
+schedule_daily(RECONCILE_PENDING_PAYMENTS_JOB, at=time(0, 5))
+
+PAYMENT_POLL_DELAY = timedelta(minutes=2)
+PAYMENT_POLL_MAX_ATTEMPTS = 8
+
+
+def schedule_payment_poll(merchant_transaction_id, *, requested_by=None):
+    """
+    Queues a status poll for an attempt the ledger still has as initiated,
+    unless one is already queued or running. The attempt row is locked while
+    checking, so concurrent callbacks for the same order queue one poll
+    between them. Returns the new job, or None when nothing was queued.
+    """
+    with db_transaction.atomic():
+        attempt = (
+            PaymentAttempt.objects.select_for_update()
+            .filter(merchant_transaction_id=merchant_transaction_id, status=PaymentAttempt.STATUS_INITIATED)
+            .first()
+        )
+        if attempt is None:
+            return None
+        already_polling = Job.objects.filter(
+            name=POLL_PAYMENT_STATUS_JOB,
+            status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+            payload__merchant_transaction_id=merchant_transaction_id,
+        ).exists()
+        if already_polling:
+            return None
+        return enqueue(
+            POLL_PAYMENT_STATUS_JOB,
+            {"merchant_transaction_id": merchant_transaction_id},
+            delay=PAYMENT_POLL_DELAY,
+            max_attempts=PAYMENT_POLL_MAX_ATTEMPTS,
+            requested_by=requested_by,
+        )
+
+
+@register(GENERATE_MONTHLY_INVOICES_JOB)
+def run_monthly_billing(billing_date=None):
+    billing_date = parse_date(billing_date) if billing_date else None
+    result = generate_monthly_invoices(billing_date=billing_date)
+    invoice_ids = [invoice.id for invoice in result.created_invoices]
+    if invoice_ids:
+        enqueue(INVOICES_ISSUED_NOTIFICATION_JOB, {"transaction_ids": invoice_ids})
+    return {
+        "due_date": result.due_date.isoformat(),
+        "billable_players": result.billable_players,
+        "created_invoices": result.created_count,
+        "skipped_existing": result.skipped_existing,
+        "invoice_ids": invoice_ids,
+    }
+
+
+@register(INVOICES_ISSUED_NOTIFICATION_JOB)
+def send_invoices_issued_notifications(transaction_ids):
+    transactions = Transaction.objects.select_related("player").filter(pk__in=transaction_ids, paid=False)
+    deliveries = notify_invoices_issued(transactions)
+    return {
+        status: sum(1 for delivery in deliveries if delivery.status == status)
+        for status, _ in WhatsAppDelivery.STATUS_CHOICES
+    }
+
+
+@register(POLL_PAYMENT_STATUS_JOB)
+def poll_payment_status(merchant_transaction_id):
+    lookup = lookup_payment(merchant_transaction_id)
+    if lookup is None:
+        return {"state": NOT_FOUND}
+    if lookup.settled or lookup.waived:
+        return {"state": ALREADY_PAID if lookup.settled else WAIVED, "transaction_id": lookup.transaction_id}
+
+    status_response = check_payment_status(merchant_transaction_id)
+    if not status_response:
+        raise RetryLater("Could not fetch status from PhonePe.")
+
+    if status_response.state == "COMPLETED":
+        outcome = settle_payment(lookup.transaction_id, merchant_transaction_id)
+        return {"state": status_response.state, "settlement": outcome, "transaction_id": lookup.transaction_id}
+
+    if status_response.state == "FAILED":
+        mark_attempt_failed(merchant_transaction_id)
+        return {"state": status_response.state}
+
+    raise RetryLater(f"Payment is {status_response.state}.")
+
+
+@register(RECONCILE_PENDING_PAYMENTS_JOB)
+def run_payment_reconciliation():
+    result = reconcile_pending_payments()
+    return {
+        "checked": result.checked,
+        "completed": result.completed,
+        "failed": result.failed,
+        "pending": result.pending,
+        "unreachable": result.unreachable,
+        "settled": len(result.settled_transaction_ids),
+    }
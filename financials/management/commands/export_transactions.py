@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cricket_club.exports import iter_csv, write_xlsx
+from cricket_club.filters import parse_date
+from financials.exports import TRANSACTION_EXPORT_HEADER, transaction_export_rows
+from financials.models import Transaction
+
+
+class Command(BaseCommand):
+    help = 'Exports the transaction ledger, with player names, as CSV or XLSX without loading it into memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', dest='file_format', help='Output format.')
+        parser.add_argument('--output', help='File to write. CSV goes to stdout when omitted.')
+        parser.add_argument('--category', choices=[value for value, _ in Transaction.CATEGORY_CHOICES], help='Only this category.')
+        parser.add_argument('--due-from', type=parse_date, help='Only transactions due on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--due-to', type=parse_date, help='Only transactions due on or before this date (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        queryset = Transaction.objects.all()
+        if options['category']:
+            queryset = queryset.filter(category=options['category'])
+        if options['due_from']:
+            queryset = queryset.filter(due_date__gte=options['due_from'])
+        if options['due_to']:
+            queryset = queryset.filter(due_date__lte=options['due_to'])
+        rows = transaction_export_rows(queryset)
+
+        if options['file_format'] == 'xlsx':
+            if not options['output']:
+                raise CommandError('--output is required for XLSX exports.')
+            try:
+                with open(options['output'], 'wb') as output:
+                    write_xlsx(output, TRANSACTION_EXPORT_HEADER, rows, sheet_title='Transactions')
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+        elif options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(iter_csv(TRANSACTION_EXPORT_HEADER, rows))
+        else:
+            for line in iter_csv(TRANSACTION_EXPORT_HEADER, rows):
+                self.stdout.write(line, ending='')
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from financials.reconciliation import (
+    RECONCILE_LOOKBACK_DAYS,
+    RECONCILE_MAX_WORKERS,
+    RECONCILE_RATE_PER_SECOND,
+    reconcile_pending_payments,
+)
+
+
+class Command(BaseCommand):
+    help = 'Checks pending PhonePe orders with PhonePe and settles the ones that completed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RECONCILE_LOOKBACK_DAYS, help='Only check orders initiated in the last N days.')
+        parser.add_argument('--workers', type=int, default=RECONCILE_MAX_WORKERS, help='Concurrent status requests.')
+        parser.add_argument('--rate', type=float, default=RECONCILE_RATE_PER_SECOND, help='Maximum status requests per second.')
+
+    def handle(self, *args, **options):
+        result = reconcile_pending_payments(
+            days=options['days'],
+            max_workers=options['workers'],
+            rate_per_second=options['rate'],
+        )
+
+        self.stdout.write(
+            f'Checked {result.checked} order(s): {result.completed} completed, {result.failed} failed, '
+            f'{result.pending} pending, {result.unreachable} unreachable.'
+        )
+        self.stdout.write(self.style.SUCCESS(f'Settled {len(result.settled_transaction_ids)} transaction(s).'))
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financials", "0008_transaction_waived_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentAttempt",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("merchant_transaction_id", models.CharField(max_length=64, unique=True)),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("initiated", "Initiated"), ("completed", "Completed"), ("failed", "Failed")],
+                        default="initiated",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("settled_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payment_attempts",
+                        to="financials.transaction",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financials", "0009_paymentattempt"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="transaction",
+            name="due_date",
+            field=models.DateField(db_index=True, default=datetime.date.today),
+        ),
+    ]
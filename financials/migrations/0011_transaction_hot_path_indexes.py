@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financials", "0010_transaction_due_date_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["player", "category", "due_date"], name="txn_player_category_due_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(category="monthly", paid=False, waived=False),
+                fields=["player", "due_date"],
+                name="txn_open_monthly_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["player", "payment_date", "due_date"], name="txn_player_recent_idx"),
+        ),
+    ]
@@ -26,15 +26,62 @@ class Transaction(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='transactions')
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default='merchandise')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
-    due_date = models.DateField(default=date.today)
+    due_date = models.DateField(default=date.today, db_index=True)
     paid = models.BooleanField(default=False)
     payment_date = models.DateField(null=True, blank=True)
     waived = models.BooleanField(default=False)
     waived_reason = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            # Invoice-exists checks, backfill windows and bulk-insert pk refills:
+            # equality on (player, category) plus a due_date range.
+            models.Index(fields=["player", "category", "due_date"], name="txn_player_category_due_idx"),
+            # Oldest open monthly invoice per player (membership state). MySQL
+            # cannot build partial indexes, so Django skips this one there and
+            # those queries seek the index above on (player, category), reading
+            # due_date in order and filtering paid/waived row by row.
+            models.Index(
+                fields=["player", "due_date"],
+                name="txn_open_monthly_due_idx",
+                condition=models.Q(category="monthly", paid=False, waived=False),
+            ),
+            # The dashboard's most recent transaction per player.
+            models.Index(fields=["player", "payment_date", "due_date"], name="txn_player_recent_idx"),
+        ]
+
     def __str__(self):
         if self.waived:
             status = "Waived"
         else:
             status = "Paid" if self.paid else "Unpaid"
         return f"{self.get_category_display()} for {self.player} ({status})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "category" in field_names:
+            # Lets a save tell whether the row was a monthly fee before it, without a pre_save query.
+            instance._stored_category = instance.category
+        return instance
+
+
+class PaymentAttempt(models.Model):
+    STATUS_INITIATED = 'initiated'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_INITIATED, 'Initiated'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    merchant_transaction_id = models.CharField(max_length=64, unique=True)
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='payment_attempts')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_INITIATED)
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.merchant_transaction_id} ({self.get_status_display()})"
@@ -0,0 +1,149 @@
+"""Payment-attempt ledger and idempotent settlement for PhonePe orders."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from players.models import Player
+from players.services import refresh_player_membership
+
+from .models import PaymentAttempt, Transaction
+from .services import refresh_player_memberships
+
+SETTLED = "settled"
+ALREADY_PAID = "already_paid"
+WAIVED = "waived"
+NOT_FOUND = "not_found"
+
+
+@dataclass
+class PaymentLookup:
+    transaction_id: Optional[int]
+    attempt_status: Optional[str]
+    paid: bool = False
+    waived: bool = False
+
+    @property
+    def settled(self) -> bool:
+        return self.paid or self.attempt_status == PaymentAttempt.STATUS_COMPLETED
+
+
+def transaction_id_from_merchant_id(merchant_transaction_id: str) -> int:
+    """Parses the ``TXN{id}_{suffix}`` ids built by ``InitiatePaymentView``."""
+    return int(merchant_transaction_id.split("_")[0].replace("TXN", ""))
+
+
+def record_payment_attempt(transaction, merchant_transaction_id: str) -> PaymentAttempt:
+    return PaymentAttempt.objects.create(
+        merchant_transaction_id=merchant_transaction_id,
+        transaction=transaction,
+        amount=transaction.amount,
+    )
+
+
+def mark_attempt_failed(merchant_transaction_id: str) -> int:
+    return mark_attempts_failed([merchant_transaction_id])
+
+
+def mark_attempts_failed(merchant_transaction_ids: List[str]) -> int:
+    if not merchant_transaction_ids:
+        return 0
+    return PaymentAttempt.objects.filter(
+        merchant_transaction_id__in=merchant_transaction_ids,
+        status=PaymentAttempt.STATUS_INITIATED,
+    ).update(status=PaymentAttempt.STATUS_FAILED)
+
+
+def lookup_payment(merchant_transaction_id: str) -> Optional[PaymentLookup]:
+    """
+    Resolves a merchant transaction id against the ledger. A completed attempt
+    answers in one query; ids from before the ledger existed fall back to the
+    id embedded in the merchant transaction id. Returns None when no
+    transaction matches.
+    """
+    attempt = (
+        PaymentAttempt.objects.filter(merchant_transaction_id=merchant_transaction_id)
+        .values_list("status", "transaction_id")
+        .first()
+    )
+    if attempt is not None:
+        attempt_status, transaction_id = attempt
+        if attempt_status == PaymentAttempt.STATUS_COMPLETED:
+            return PaymentLookup(transaction_id, attempt_status, paid=True)
+    else:
+        attempt_status = None
+        try:
+            transaction_id = transaction_id_from_merchant_id(merchant_transaction_id)
+        except (IndexError, ValueError):
+            return None
+
+    flags = Transaction.objects.filter(pk=transaction_id).values_list("paid", "waived").first()
+    if flags is None:
+        return None
+    return PaymentLookup(transaction_id, attempt_status, paid=flags[0], waived=flags[1])
+
+
+def settle_payment(transaction_id: int, merchant_transaction_id: Optional[str] = None) -> str:
+    """
+    Marks a transaction paid with a single conditional UPDATE, so duplicate
+    callbacks and concurrent pollers settle it exactly once without row locks.
+
+    The UPDATE skips model signals, so the membership refresh they would have
+    done runs here for the winning call.
+    """
+    with db_transaction.atomic():
+        updated = Transaction.objects.filter(pk=transaction_id, paid=False, waived=False).update(
+            paid=True,
+            payment_date=timezone.localdate(),
+        )
+        if merchant_transaction_id:
+            PaymentAttempt.objects.filter(merchant_transaction_id=merchant_transaction_id).exclude(
+                status=PaymentAttempt.STATUS_COMPLETED
+            ).update(status=PaymentAttempt.STATUS_COMPLETED, settled_at=timezone.now())
+
+        if updated:
+            player_id, category = Transaction.objects.filter(pk=transaction_id).values_list(
+                "player_id", "category"
+            ).get()
+            if category == "monthly":
+                refresh_player_membership(player_id)
+            return SETTLED
+
+    flags = Transaction.objects.filter(pk=transaction_id).values_list("paid", "waived").first()
+    if flags is None:
+        return NOT_FOUND
+    return ALREADY_PAID if flags[0] else WAIVED
+
+
+def settle_payments(attempts: Dict[str, int]) -> List[int]:
+    """
+    Bulk counterpart of ``settle_payment`` for reconciliation runs: settles
+    every ``{merchant_transaction_id: transaction_id}`` pair with one UPDATE
+    and returns the ids of the transactions this call marked paid.
+
+    The unpaid rows are locked first so the returned ids, and the memberships
+    refreshed for them, exclude anything a concurrent callback won.
+    """
+    if not attempts:
+        return []
+    with db_transaction.atomic():
+        rows = list(
+            Transaction.objects.select_for_update()
+            .filter(pk__in=set(attempts.values()), paid=False, waived=False)
+            .values_list("pk", "player_id", "category")
+        )
+        settled_ids = [pk for pk, _, _ in rows]
+        Transaction.objects.filter(pk__in=settled_ids).update(paid=True, payment_date=timezone.localdate())
+        PaymentAttempt.objects.filter(merchant_transaction_id__in=list(attempts)).exclude(
+            status=PaymentAttempt.STATUS_COMPLETED
+        ).update(status=PaymentAttempt.STATUS_COMPLETED, settled_at=timezone.now())
+
+        monthly_player_ids = {player_id for _, player_id, category in rows if category == "monthly"}
+        if monthly_player_ids:
+            players = Player.objects.select_related("membership").filter(
+                pk__in=monthly_player_ids, membership__isnull=False
+            ).in_bulk()
+            today = timezone.localdate()
+            refresh_player_memberships(players, {player_id: today for player_id in players})
+    return settled_ids
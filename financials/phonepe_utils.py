@@ -1,7 +1,19 @@
+import logging
+import threading
+import time
 import uuid
+from functools import lru_cache
+
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# PhonePe OAuth tokens are valid for an hour; refresh the cached client a bit
+# before that so no request goes out with an expired token.
+DEFAULT_CLIENT_TTL_SECONDS = 55 * 60
+
 
+@lru_cache(maxsize=None)
 def _load_phonepe_sdk():
     try:
         from phonepe.sdk.pg.payments.v2.standard_checkout_client import StandardCheckoutClient
@@ -16,12 +28,9 @@ def _load_phonepe_sdk():
         ) from exc
     return StandardCheckoutClient, StandardCheckoutPayRequest, MetaInfo, Env
 
-def get_phonepe_client():
-    """
-    Utility to get the PhonePe client instance using settings.
-    """
+
+def _build_phonepe_client(config):
     StandardCheckoutClient, _, _, Env = _load_phonepe_sdk()
-    config = settings.PHONEPE_CONFIG
     env = Env.SANDBOX if config['ENV'] == 'SANDBOX' else Env.PRODUCTION
 
     # If you need to pass 'should_publish_events', add it here. Default is usually False.
@@ -32,6 +41,76 @@ def get_phonepe_client():
         env=env
     )
 
+
+class PhonePeClientHolder:
+    """
+    Per-process cache for the authenticated PhonePe client.
+
+    Building the client imports the SDK and fetches an OAuth token, so it is
+    done once and reused until the TTL runs out. Refreshes happen under a lock
+    with a second check, so concurrent threads never fetch two tokens.
+    """
+
+    def __init__(self, build=_build_phonepe_client):
+        self._build = build
+        self._lock = threading.Lock()
+        self._client = None
+        self._config_key = None
+        self._expires_at = 0.0
+
+    def get(self):
+        config = settings.PHONEPE_CONFIG
+        config_key = tuple(sorted(config.items()))
+        if self._is_fresh(config_key):
+            return self._client
+        with self._lock:
+            if not self._is_fresh(config_key):
+                ttl = config.get('CLIENT_TTL_SECONDS', DEFAULT_CLIENT_TTL_SECONDS)
+                self._client = self._build(config)
+                self._config_key = config_key
+                self._expires_at = time.monotonic() + ttl
+            return self._client
+
+    def invalidate(self):
+        with self._lock:
+            self._client = None
+            self._config_key = None
+            self._expires_at = 0.0
+
+    def _is_fresh(self, config_key):
+        return (
+            self._client is not None
+            and self._config_key == config_key
+            and time.monotonic() < self._expires_at
+        )
+
+
+_client_holder = PhonePeClientHolder()
+
+
+def get_phonepe_client():
+    """
+    Utility to get the PhonePe client instance using settings.
+    """
+    return _client_holder.get()
+
+
+def invalidate_phonepe_client():
+    _client_holder.invalidate()
+
+
+def warm_phonepe_client():
+    """
+    Builds the client ahead of the first payment request. Called when web and
+    job workers boot; failures are logged so a PhonePe outage never blocks startup.
+    """
+    try:
+        get_phonepe_client()
+    except Exception:
+        logger.exception("PhonePe client warm-up failed; it will be retried on first use.")
+        return False
+    return True
+
 def initiate_phonepe_payment(transaction_id, amount, user_id):
     """
     Initiates a payment request to PhonePe using the SDK.
@@ -50,7 +129,12 @@ def initiate_phonepe_payment(transaction_id, amount, user_id):
         meta_info=MetaInfo()
     )
 
-    response = client.pay(request)
+    try:
+        response = client.pay(request)
+    except Exception:
+        # A rejected token surfaces here; rebuild the client on the next call.
+        invalidate_phonepe_client()
+        raise
     return response
 
 def check_payment_status(merchant_order_id):
@@ -64,7 +148,7 @@ def check_payment_status(merchant_order_id):
         # Check status without additional details (details=False)
         response = client.get_order_status(merchant_order_id, details=False)
         return response
-    except Exception as e:
-        # In a real app, log this error
-        print(f"Error checking PhonePe status: {e}")
+    except Exception:
+        logger.exception("Error checking PhonePe status for %s", merchant_order_id)
+        invalidate_phonepe_client()
         return None
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Transaction
+from players.services import refresh_player_membership
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def refresh_membership_after_monthly_change(sender, instance, **kwargs):
+    if "monthly" in (instance.category, getattr(instance, "_stored_category", None)):
+        refresh_player_membership(instance.player_id)
+    instance._stored_category = instance.category
@@ -0,0 +1,93 @@
+"""Bulk reconciliation of PhonePe orders whose callback never arrived."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import List, Optional
+
+from django.utils import timezone
+
+from notifications.services import RateLimiter
+
+from .models import PaymentAttempt
+from .payments import mark_attempts_failed, settle_payments
+from .phonepe_utils import check_payment_status
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_LOOKBACK_DAYS = 3
+RECONCILE_MAX_WORKERS = 8
+RECONCILE_RATE_PER_SECOND = 5.0
+
+
+@dataclass
+class ReconciliationResult:
+    checked: int = 0
+    completed: int = 0
+    failed: int = 0
+    pending: int = 0
+    unreachable: int = 0
+    settled_transaction_ids: List[int] = field(default_factory=list)
+
+
+def pending_payment_attempts(days: int = RECONCILE_LOOKBACK_DAYS):
+    """Initiated attempts from the last ``days`` days whose transaction is still open."""
+    return PaymentAttempt.objects.filter(
+        status=PaymentAttempt.STATUS_INITIATED,
+        created_at__gte=timezone.now() - timedelta(days=days),
+        transaction__paid=False,
+        transaction__waived=False,
+    ).order_by("created_at")
+
+
+def _fetch_state(limiter: RateLimiter, merchant_transaction_id: str) -> Optional[str]:
+    limiter.wait()
+    response = check_payment_status(merchant_transaction_id)
+    return response.state if response else None
+
+
+def reconcile_pending_payments(
+    *,
+    days: int = RECONCILE_LOOKBACK_DAYS,
+    max_workers: int = RECONCILE_MAX_WORKERS,
+    rate_per_second: float = RECONCILE_RATE_PER_SECOND,
+) -> ReconciliationResult:
+    """
+    Polls PhonePe for every pending order from the last ``days`` days through a
+    bounded, rate-limited thread pool, then settles completed orders with one
+    bulk update and marks failed ones in another. Worker threads only make
+    HTTP calls; all database writes happen afterwards on the calling thread.
+    """
+    attempts = list(pending_payment_attempts(days).values_list("merchant_transaction_id", "transaction_id"))
+    result = ReconciliationResult(checked=len(attempts))
+    if not attempts:
+        return result
+
+    limiter = RateLimiter(rate_per_second)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(attempts))) as pool:
+        states = list(pool.map(lambda attempt: _fetch_state(limiter, attempt[0]), attempts))
+
+    completed = {}
+    failed = []
+    for (merchant_transaction_id, transaction_id), state in zip(attempts, states):
+        if state == "COMPLETED":
+            completed[merchant_transaction_id] = transaction_id
+        elif state == "FAILED":
+            failed.append(merchant_transaction_id)
+        elif state is None:
+            result.unreachable += 1
+        else:
+            result.pending += 1
+
+    result.settled_transaction_ids = settle_payments(completed)
+    result.completed = len(completed)
+    result.failed = mark_attempts_failed(failed)
+    logger.info(
+        "Reconciled %s PhonePe order(s): %s completed, %s failed, %s pending, %s unreachable.",
+        result.checked,
+        result.completed,
+        result.failed,
+        result.pending,
+        result.unreachable,
+    )
+    return result
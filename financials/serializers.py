@@ -21,6 +21,11 @@ class GenerateMonthlyInvoicesSerializer(serializers.Serializer):
         required=False,
         help_text="Optional billing date for the generated monthly invoices. Defaults to today.",
     )
+    background = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Queue the billing run as a background job and return its id instead of waiting.",
+    )
 
 
 class BackfillMonthlyPaymentsSerializer(serializers.Serializer):
@@ -33,3 +38,11 @@ class BackfillMonthlyPaymentsSerializer(serializers.Serializer):
         if attrs["end_month"] < attrs["start_month"]:
             raise serializers.ValidationError({"end_month": "End month must be on or after start month."})
         return attrs
+
+
+class BulkBackfillMonthlyPaymentsSerializer(serializers.Serializer):
+    entries = BackfillMonthlyPaymentsSerializer(many=True, allow_empty=False)
+    payment_date = serializers.DateField(
+        required=False,
+        help_text="Optional payment date for entries that do not set their own.",
+    )
@@ -1,17 +1,22 @@
+from bisect import bisect_right
 from calendar import monthrange
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Exists, Min, OuterRef, Q, QuerySet, Subquery
 from django.utils import timezone
 
-from players.models import Player
+from cricket_club.cache import invalidate_models
+from players.models import Membership, MembershipLeave, Player
 
 from .models import MembershipFeeSchedule, Transaction
 
 DEFAULT_MONTHLY_INVOICE_AMOUNT = Decimal("1050.00")
+BULK_CREATE_BATCH_SIZE = 500
+BACKFILL_PLAYER_CHUNK_SIZE = 100
 
 
 @dataclass
@@ -26,6 +31,14 @@ class BillingResult:
         return len(self.created_invoices)
 
 
+@dataclass
+class BackfillRange:
+    player_id: int
+    start_month: date
+    end_month: date
+    payment_date: Optional[date] = None
+
+
 @dataclass
 class BackfillResult:
     created_transactions: List[Transaction]
@@ -39,18 +52,12 @@ class BackfillResult:
 
 
 def _players_queryset(players: Optional[Iterable[Player]] = None):
-    if players is not None:
-        return players
-    return Player.objects.select_related("subscription", "membership").all()
-
-
-def _invoice_exists(player: Player, billing_date: date) -> bool:
-    return Transaction.objects.filter(
-        player=player,
-        category="monthly",
-        due_date__year=billing_date.year,
-        due_date__month=billing_date.month,
-    ).exists()
+    queryset = Player.objects.select_related("subscription", "membership")
+    if players is None:
+        return queryset.all()
+    if isinstance(players, QuerySet):
+        return queryset.filter(pk__in=players.values("pk"))
+    return queryset.filter(pk__in=[player.pk for player in players])
 
 
 def _monthly_due_date(billing_date: date) -> date:
@@ -79,6 +86,30 @@ def _month_iter(start_month: date, end_month: date):
         current = _next_month(current)
 
 
+class FeeScheduleResolver:
+    """
+    In-memory view of ``MembershipFeeSchedule`` answering "which amount is
+    effective on date X" with a binary search instead of a query per month.
+    Each run loads its own, so an admin's edit applies to the next run in
+    every process.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        rows = sorted(rows)
+        self.effective_dates = [effective_from for effective_from, _ in rows]
+        self.amounts = [amount for _, amount in rows]
+
+    @classmethod
+    def load(cls) -> "FeeScheduleResolver":
+        return cls(MembershipFeeSchedule.objects.values_list("effective_from", "amount"))
+
+    def amount_for(self, billing_date: date) -> Decimal:
+        index = bisect_right(self.effective_dates, billing_date)
+        if index:
+            return self.amounts[index - 1]
+        return DEFAULT_MONTHLY_INVOICE_AMOUNT
+
+
 def get_monthly_invoice_amount(billing_date: date) -> Decimal:
     schedule = (
         MembershipFeeSchedule.objects.filter(effective_from__lte=billing_date)
@@ -90,20 +121,71 @@ def get_monthly_invoice_amount(billing_date: date) -> Decimal:
     return DEFAULT_MONTHLY_INVOICE_AMOUNT
 
 
-def _should_bill_player_for_month(player: Player, billing_date: date, *, require_current_active=True) -> bool:
-    subscription = getattr(player, "subscription", None)
-    membership = getattr(player, "membership", None)
-    if subscription is None or membership is None:
-        return False
-    if membership.join_date > billing_date:
-        return False
-    if membership.fee_exempt or membership.is_on_leave_for_month(billing_date):
-        return False
-    if require_current_active:
-        player.sync_membership_status(as_of=billing_date)
-        if membership.status != "active" or not player.membership_active:
-            return False
-    return True
+def _billing_candidates(players, billing_date: date):
+    """
+    Players who could be billed for the month of ``billing_date``, annotated
+    with everything the billing decision needs so it runs in a single query.
+    """
+    month_start, month_end = _month_start(billing_date), _month_end(billing_date)
+    unpaid_monthly = Transaction.objects.filter(
+        player=OuterRef("pk"),
+        category="monthly",
+        paid=False,
+        waived=False,
+    ).order_by("due_date", "id")
+    return (
+        _players_queryset(players)
+        .filter(
+            subscription__isnull=False,
+            membership__isnull=False,
+            membership__join_date__lte=billing_date,
+            membership__fee_exempt=False,
+        )
+        .annotate(
+            on_leave=Exists(
+                MembershipLeave.objects.filter(
+                    membership=OuterRef("membership"),
+                    start_date__lte=month_end,
+                    end_date__gte=month_start,
+                )
+            ),
+            oldest_unpaid_due_date=Subquery(unpaid_monthly.values("due_date")[:1]),
+            has_monthly_invoice=Exists(
+                Transaction.objects.filter(
+                    player=OuterRef("pk"),
+                    category="monthly",
+                    due_date__gte=month_start,
+                    due_date__lte=month_end,
+                )
+            ),
+        )
+        .filter(on_leave=False)
+        .order_by("pk")
+    )
+
+
+def _bulk_create_transactions(transactions: List[Transaction]) -> List[Transaction]:
+    """
+    Inserts ``transactions`` in chunks. Backends that cannot return primary keys
+    from a bulk insert (MySQL) get them back with one lookup per chunk, keyed on
+    (player, category, due_date), which is unique for the monthly rows we create.
+    """
+    for offset in range(0, len(transactions), BULK_CREATE_BATCH_SIZE):
+        chunk = transactions[offset:offset + BULK_CREATE_BATCH_SIZE]
+        Transaction.objects.bulk_create(chunk)
+        if connection.features.can_return_rows_from_bulk_insert:
+            continue
+        pending = {(txn.player_id, txn.category, txn.due_date): txn for txn in chunk}
+        rows = Transaction.objects.filter(
+            player_id__in={txn.player_id for txn in chunk},
+            category__in={txn.category for txn in chunk},
+            due_date__in={txn.due_date for txn in chunk},
+        ).values_list("id", "player_id", "category", "due_date")
+        for pk, player_id, category, due_date in rows:
+            txn = pending.get((player_id, category, due_date))
+            if txn is not None and txn.pk is None:
+                txn.pk = pk
+    return transactions
 
 
 @transaction.atomic
@@ -115,28 +197,49 @@ def generate_monthly_invoices(
     billing_date = billing_date or timezone.localdate()
     due_date = _monthly_due_date(billing_date)
     monthly_amount = get_monthly_invoice_amount(billing_date)
-    created_invoices: List[Transaction] = []
+    lapse_cutoff = date.today() - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS)
+    pending_invoices: List[Transaction] = []
+    status_changes = {}
     billable_players = 0
     skipped_existing = 0
 
-    for player in _players_queryset(players):
-        if not _should_bill_player_for_month(player, billing_date):
+    for player in _billing_candidates(players, billing_date):
+        membership = player.membership
+        oldest_due_date = player.oldest_unpaid_due_date
+        computed_status = membership.status_for(oldest_due_date, as_of=billing_date)
+        if membership.status != computed_status:
+            membership.status = computed_status
+            status_changes.setdefault(computed_status, []).append(membership.pk)
+
+        # Same rule as ``Player.membership_active``: nothing unpaid past the lapse window.
+        membership_active = oldest_due_date is None or oldest_due_date >= lapse_cutoff
+        if membership.status != Membership.STATUS_ACTIVE or not membership_active:
             continue
 
         billable_players += 1
 
-        if _invoice_exists(player, billing_date):
+        if player.has_monthly_invoice:
             skipped_existing += 1
             continue
 
-        invoice = Transaction.objects.create(
-            player=player,
-            category="monthly",
-            amount=monthly_amount,
-            due_date=due_date,
-            paid=False,
+        pending_invoices.append(
+            Transaction(
+                player=player,
+                category="monthly",
+                amount=monthly_amount,
+                due_date=due_date,
+                paid=False,
+            )
         )
-        created_invoices.append(invoice)
+
+    for new_status, membership_ids in status_changes.items():
+        Membership.objects.filter(pk__in=membership_ids).update(status=new_status)
+
+    created_invoices = _bulk_create_transactions(pending_invoices)
+    if created_invoices:
+        _record_new_unpaid_invoice(due_date)
+    if status_changes or created_invoices:
+        invalidate_models(Membership)
 
     return BillingResult(
         created_invoices=created_invoices,
@@ -146,6 +249,172 @@ def generate_monthly_invoices(
     )
 
 
+def _backfill_chunk(ranges: List[BackfillRange], players: Optional[Dict[int, Player]] = None):
+    """
+    Backfills every range in ``ranges`` with a fixed number of queries: one
+    each for players, existing invoices and leave periods, chunked inserts and
+    the membership status refresh.
+    """
+    player_ids = {entry.player_id for entry in ranges}
+    if players is None:
+        players = Player.objects.select_related("membership", "subscription").in_bulk(player_ids)
+    window_start = min(_month_start(entry.start_month) for entry in ranges)
+    window_end = max(_month_end(entry.end_month) for entry in ranges)
+
+    existing_months = {
+        (player_id, due_date.year, due_date.month)
+        for player_id, due_date in Transaction.objects.filter(
+            player_id__in=player_ids,
+            category="monthly",
+            due_date__gte=window_start,
+            due_date__lte=window_end,
+        ).values_list("player_id", "due_date")
+    }
+    leave_periods: Dict[int, List[tuple]] = {}
+    for player_id, start_date, end_date in MembershipLeave.objects.filter(
+        membership__player_id__in=player_ids,
+        start_date__lte=window_end,
+        end_date__gte=window_start,
+    ).values_list("membership__player_id", "start_date", "end_date"):
+        leave_periods.setdefault(player_id, []).append((start_date, end_date))
+
+    fee_schedule = FeeScheduleResolver.load()
+    results = []
+    pending: List[Transaction] = []
+    status_as_of: Dict[int, date] = {}
+
+    for entry in ranges:
+        player = players.get(entry.player_id)
+        if player is None:
+            results.append((entry, None))
+            continue
+        result = BackfillResult([], 0, 0, 0)
+        results.append((entry, result))
+        membership = getattr(player, "membership", None)
+        if membership is None or getattr(player, "subscription", None) is None:
+            continue
+
+        leaves = leave_periods.get(player.pk, [])
+        for billing_date in _month_iter(entry.start_month, entry.end_month):
+            if membership.join_date > billing_date:
+                result.skipped_before_join += 1
+                continue
+            month_start, month_end = _month_start(billing_date), _month_end(billing_date)
+            on_leave = any(start <= month_end and end >= month_start for start, end in leaves)
+            if membership.fee_exempt or on_leave:
+                result.skipped_leave_months += 1
+                continue
+            month_key = (player.pk, billing_date.year, billing_date.month)
+            if month_key in existing_months:
+                result.skipped_existing += 1
+                continue
+
+            existing_months.add(month_key)
+            due_date = _monthly_due_date(billing_date)
+            backfilled = Transaction(
+                player=player,
+                category="monthly",
+                amount=fee_schedule.amount_for(billing_date),
+                due_date=due_date,
+                paid=True,
+                payment_date=entry.payment_date or due_date,
+            )
+            pending.append(backfilled)
+            result.created_transactions.append(backfilled)
+
+        as_of = _month_end(entry.end_month)
+        status_as_of[player.pk] = max(as_of, status_as_of.get(player.pk, as_of))
+
+    _bulk_create_transactions(pending)
+    refresh_player_memberships(players, status_as_of)
+    return results
+
+
+def _record_new_unpaid_invoice(due_date: date) -> None:
+    """
+    Bulk inserts skip the transaction signals, so fold the month's unpaid
+    invoice into the materialized membership state with one UPDATE.
+    """
+    lapse_cutoff = date.today() - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS)
+    Membership.objects.filter(
+        Q(oldest_unpaid_due_date__isnull=True) | Q(oldest_unpaid_due_date__gt=due_date),
+        player__transactions__category="monthly",
+        player__transactions__due_date=due_date,
+        player__transactions__paid=False,
+        player__transactions__waived=False,
+    ).update(oldest_unpaid_due_date=due_date, membership_active=due_date >= lapse_cutoff)
+
+
+def refresh_player_memberships(players: Dict[int, Player], status_as_of: Dict[int, date]) -> None:
+    """
+    Re-derives the materialized membership state for ``status_as_of``'s
+    players with one aggregate query and one bulk_update. ``players`` must
+    map those ids to players loaded with their membership.
+    """
+    if not status_as_of:
+        return
+    oldest_due_dates = dict(
+        Transaction.objects.filter(
+            player_id__in=status_as_of,
+            category="monthly",
+            paid=False,
+            waived=False,
+        )
+        .values("player_id")
+        .annotate(oldest=Min("due_date"))
+        .values_list("player_id", "oldest")
+    )
+    changed_memberships = []
+    for player_id, as_of in status_as_of.items():
+        membership = players[player_id].membership
+        if membership.apply_unpaid_due_date(oldest_due_dates.get(player_id), as_of=as_of):
+            changed_memberships.append(membership)
+    Membership.objects.bulk_update(
+        changed_memberships,
+        ["status", "oldest_unpaid_due_date", "membership_active"],
+        batch_size=BULK_CREATE_BATCH_SIZE,
+    )
+    if changed_memberships:
+        invalidate_models(Membership)
+
+
+def iter_bulk_backfill_monthly_payments(
+    ranges: Iterable[BackfillRange],
+    *,
+    chunk_size: int = BACKFILL_PLAYER_CHUNK_SIZE,
+) -> Iterator[Tuple[BackfillRange, Optional[BackfillResult]]]:
+    """
+    Backfills many (player, start_month, end_month) ranges, yielding
+    ``(range, result)`` pairs as each chunk of players is committed. The result
+    is ``None`` when the player does not exist.
+    """
+    ranges = [
+        BackfillRange(
+            player_id=entry.player_id,
+            start_month=_month_start(entry.start_month),
+            end_month=_month_start(entry.end_month),
+            payment_date=entry.payment_date,
+        )
+        for entry in ranges
+    ]
+    if any(entry.end_month < entry.start_month for entry in ranges):
+        raise ValueError("end_month must be on or after start_month")
+
+    chunks: List[List[BackfillRange]] = []
+    chunk_players = set()
+    for entry in ranges:
+        if not chunks or (entry.player_id not in chunk_players and len(chunk_players) >= chunk_size):
+            chunks.append([])
+            chunk_players = set()
+        chunks[-1].append(entry)
+        chunk_players.add(entry.player_id)
+
+    for chunk in chunks:
+        with transaction.atomic():
+            results = _backfill_chunk(chunk)
+        yield from results
+
+
 @transaction.atomic
 def backfill_monthly_payments(
     *,
@@ -159,41 +428,11 @@ def backfill_monthly_payments(
     if end_month < start_month:
         raise ValueError("end_month must be on or after start_month")
 
-    created_transactions: List[Transaction] = []
-    skipped_existing = 0
-    skipped_leave_months = 0
-    skipped_before_join = 0
-    membership = getattr(player, "membership", None)
-    if membership is None or getattr(player, "subscription", None) is None:
-        return BackfillResult(created_transactions, 0, 0, 0)
-
-    for billing_date in _month_iter(start_month, end_month):
-        if membership.join_date > billing_date:
-            skipped_before_join += 1
-            continue
-        if membership.fee_exempt or membership.is_on_leave_for_month(billing_date):
-            skipped_leave_months += 1
-            continue
-        if _invoice_exists(player, billing_date):
-            skipped_existing += 1
-            continue
-
-        due_date = _monthly_due_date(billing_date)
-        transaction_date = payment_date or due_date
-        invoice = Transaction.objects.create(
-            player=player,
-            category="monthly",
-            amount=get_monthly_invoice_amount(billing_date),
-            due_date=due_date,
-            paid=True,
-            payment_date=transaction_date,
-        )
-        created_transactions.append(invoice)
-
-    player.sync_membership_status(as_of=_month_end(end_month))
-    return BackfillResult(
-        created_transactions=created_transactions,
-        skipped_existing=skipped_existing,
-        skipped_leave_months=skipped_leave_months,
-        skipped_before_join=skipped_before_join,
+    entry = BackfillRange(
+        player_id=player.pk,
+        start_month=start_month,
+        end_month=end_month,
+        payment_date=payment_date,
     )
+    [(_, result)] = _backfill_chunk([entry], players={player.pk: player})
+    return result
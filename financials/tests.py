@@ -1,14 +1,44 @@
+import importlib.util
+import os
+import tempfile
+from unittest import skipIf, skipUnless
+
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.management import call_command
-from players.models import MembershipLeave, Player
-from financials.models import Transaction
-from financials.services import get_monthly_invoice_amount
+from django.db import connection
+from players.models import Membership, MembershipLeave, Player, Subscription
+from financials.jobs import POLL_PAYMENT_STATUS_JOB, RECONCILE_PENDING_PAYMENTS_JOB
+from financials.models import MembershipFeeSchedule, PaymentAttempt, Transaction
+from financials.payments import ALREADY_PAID, SETTLED, WAIVED, record_payment_attempt, settle_payment, settle_payments
+from financials.reconciliation import reconcile_pending_payments
+from jobs.models import Job
+from jobs.services import enqueue_scheduled_jobs, run_pending_jobs
+from financials.services import (
+    BULK_CREATE_BATCH_SIZE,
+    DEFAULT_MONTHLY_INVOICE_AMOUNT,
+    FeeScheduleResolver,
+    backfill_monthly_payments,
+    generate_monthly_invoices,
+    get_monthly_invoice_amount,
+    iter_bulk_backfill_monthly_payments,
+)
 from datetime import date, timedelta
+from decimal import Decimal
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 import base64
+import math
+import re
+import threading
+import time
+from io import BytesIO, StringIO
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.utils import timezone
+from financials.phonepe_utils import DEFAULT_CLIENT_TTL_SECONDS, PhonePeClientHolder, warm_phonepe_client
 import json
 from unittest.mock import patch, MagicMock
 
@@ -442,3 +472,720 @@ class GenerateMonthlyInvoicesApiTests(TestCase):
         )
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SetBasedBillingTests(TestCase):
+    billing_date = date(2026, 3, 1)
+
+    def _bulk_roster(self, size, offset=0):
+        Player.objects.bulk_create(
+            [
+                Player(first_name=f"Bulk{offset + index}", last_name="Member", age=20)
+                for index in range(size)
+            ]
+        )
+        players = list(Player.objects.filter(first_name__startswith="Bulk").order_by("pk")[offset:offset + size])
+        Membership.objects.bulk_create(
+            [Membership(player=player, join_date=date(2025, 1, 1), status="active") for player in players]
+        )
+        Subscription.objects.bulk_create([Subscription(player=player) for player in players])
+        return players
+
+    def _run_billing(self):
+        with CaptureQueriesContext(connection) as context:
+            result = generate_monthly_invoices(billing_date=self.billing_date)
+        statements = [query["sql"] for query in context.captured_queries]
+        inserts = [sql for sql in statements if sql.startswith("INSERT")]
+        return result, len(statements) - len(inserts), len(inserts)
+
+    def test_eligibility_and_status_sync_match_per_player_rules(self):
+        billed, on_leave, exempt, lapsed = self._bulk_roster(4)
+        MembershipLeave.objects.create(
+            membership=on_leave.membership,
+            start_date=date(2026, 2, 20),
+            end_date=date(2026, 3, 5),
+        )
+        Membership.objects.filter(player=exempt).update(fee_exempt=True)
+        Transaction.objects.create(
+            player=lapsed, category="monthly", amount=750, due_date=date(2025, 11, 10), paid=False,
+        )
+
+        result, _, _ = self._run_billing()
+
+        self.assertEqual([invoice.player_id for invoice in result.created_invoices], [billed.id])
+        self.assertIsNotNone(result.created_invoices[0].pk)
+        self.assertEqual(result.created_invoices[0].amount, get_monthly_invoice_amount(self.billing_date))
+        self.assertEqual(result.billable_players, 1)
+        self.assertEqual(result.due_date, date(2026, 3, 10))
+        lapsed.membership.refresh_from_db()
+        self.assertEqual(lapsed.membership.status, "left")
+        billed.membership.refresh_from_db()
+        self.assertEqual(billed.membership.oldest_unpaid_due_date, date(2026, 3, 10))
+
+        Transaction.objects.filter(pk=result.created_invoices[0].pk).update(paid=True)
+        second_run, _, _ = self._run_billing()
+        self.assertEqual(second_run.created_count, 0)
+        self.assertEqual(second_run.skipped_existing, 1)
+
+    def test_query_count_is_constant_for_ten_thousand_players(self):
+        self._bulk_roster(10)
+        small_result, small_queries, small_inserts = self._run_billing()
+        Transaction.objects.filter(category="monthly").delete()
+
+        self._bulk_roster(9990, offset=10)
+        large_result, large_queries, large_inserts = self._run_billing()
+
+        self.assertEqual(small_result.created_count, 10)
+        self.assertEqual(large_result.created_count, 10000)
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(small_inserts, 1)
+        insert_fields = [field for field in Transaction._meta.concrete_fields if not field.primary_key]
+        backend_batch_size = connection.ops.bulk_batch_size(insert_fields, large_result.created_invoices)
+        inserts_per_chunk = math.ceil(BULK_CREATE_BATCH_SIZE / min(BULK_CREATE_BATCH_SIZE, backend_batch_size))
+        self.assertEqual(large_inserts, math.ceil(10000 / BULK_CREATE_BATCH_SIZE) * inserts_per_chunk)
+
+
+class FeeScheduleResolverTests(TestCase):
+    def test_resolves_effective_amount_by_date(self):
+        resolver = FeeScheduleResolver(
+            [(date(2026, 2, 1), Decimal("1050.00")), (date(2024, 1, 1), Decimal("750.00"))]
+        )
+
+        self.assertEqual(resolver.amount_for(date(2023, 12, 31)), DEFAULT_MONTHLY_INVOICE_AMOUNT)
+        self.assertEqual(resolver.amount_for(date(2024, 1, 1)), Decimal("750.00"))
+        self.assertEqual(resolver.amount_for(date(2026, 1, 31)), Decimal("750.00"))
+        self.assertEqual(resolver.amount_for(date(2026, 2, 1)), Decimal("1050.00"))
+
+    def test_backfill_reads_the_schedule_once(self):
+        player = Player.objects.create(first_name="Backfill", last_name="Member", phone_number="8000000101")
+        Membership.objects.filter(player=player).update(join_date=date(2020, 1, 1))
+        player.refresh_from_db()
+
+        with CaptureQueriesContext(connection) as context:
+            backfill_monthly_payments(player=player, start_month=date(2023, 1, 1), end_month=date(2026, 12, 1))
+
+        schedule_table = MembershipFeeSchedule._meta.db_table
+        self.assertEqual(len([query for query in context.captured_queries if schedule_table in query["sql"]]), 1)
+
+    def test_backfill_uses_the_schedule_as_stored(self):
+        player = Player.objects.create(first_name="Backfill", last_name="Rate", phone_number="8000000102")
+        Membership.objects.filter(player=player).update(join_date=date(2020, 1, 1))
+        player.refresh_from_db()
+        schedule = MembershipFeeSchedule.objects.create(effective_from=date(2029, 6, 1), amount=Decimal("1200.00"))
+        backfill_monthly_payments(player=player, start_month=date(2030, 1, 1), end_month=date(2030, 1, 1))
+
+        # An edit from another process: no signal reaches this one.
+        MembershipFeeSchedule.objects.filter(pk=schedule.pk).update(amount=Decimal("1300.00"))
+        backfill_monthly_payments(player=player, start_month=date(2030, 2, 1), end_month=date(2030, 2, 1))
+
+        amounts = player.transactions.filter(category="monthly").order_by("due_date").values_list("amount", flat=True)
+        self.assertEqual(list(amounts), [Decimal("1200.00"), Decimal("1300.00")])
+
+    def test_schedule_changes_invalidate_cached_amounts(self):
+        self.assertEqual(get_monthly_invoice_amount(date(2030, 1, 1)), Decimal("1050.00"))
+
+        schedule = MembershipFeeSchedule.objects.create(effective_from=date(2029, 6, 1), amount=Decimal("1200.00"))
+        self.assertEqual(get_monthly_invoice_amount(date(2030, 1, 1)), Decimal("1200.00"))
+
+        schedule.delete()
+        self.assertEqual(get_monthly_invoice_amount(date(2030, 1, 1)), Decimal("1050.00"))
+
+
+class BulkBackfillMonthlyPaymentsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(
+            phone_number='9000000051',
+            password='password',
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.first_player = Player.objects.create(first_name='First', last_name='Import', phone_number='8000000051')
+        self.second_player = Player.objects.create(first_name='Second', last_name='Import', phone_number='8000000052')
+        Membership.objects.filter(player__in=[self.first_player, self.second_player]).update(
+            join_date=date(2024, 1, 1),
+            status="active",
+        )
+        self.url = reverse('bulk-backfill-monthly-payments')
+
+    def _post(self, payload):
+        response = self.client.post(self.url, payload, format='json')
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        return response, lines
+
+    def test_streams_progress_per_range(self):
+        MembershipLeave.objects.create(
+            membership=self.second_player.membership,
+            start_date=date(2025, 2, 1),
+            end_date=date(2025, 2, 28),
+        )
+        Transaction.objects.create(
+            player=self.first_player, category='monthly', amount=750, due_date=date(2025, 3, 10), paid=True,
+        )
+
+        response, lines = self._post(
+            {
+                'payment_date': '2025-04-01',
+                'entries': [
+                    {'player_id': self.first_player.id, 'start_month': '2025-01-01', 'end_month': '2025-03-01'},
+                    {'player_id': self.second_player.id, 'start_month': '2025-01-15', 'end_month': '2025-03-31'},
+                    {'player_id': 999999, 'start_month': '2025-01-01', 'end_month': '2025-03-01'},
+                ],
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        first, second, missing, summary = lines
+        self.assertEqual(first['created_transactions'], 2)
+        self.assertEqual(first['skipped_existing'], 1)
+        self.assertEqual(second['created_transactions'], 2)
+        self.assertEqual(second['skipped_leave_months'], 1)
+        self.assertEqual(missing['error'], 'Player not found.')
+        self.assertEqual(summary['created_transactions'], 4)
+        self.assertTrue(summary['done'])
+        self.assertEqual(
+            Transaction.objects.filter(
+                player=self.second_player, category='monthly', paid=True, payment_date=date(2025, 4, 1),
+            ).count(),
+            2,
+        )
+
+    def test_failure_partway_ends_the_stream_with_an_error_line(self):
+        entries = [
+            {'player_id': player.id, 'start_month': '2025-01-01', 'end_month': '2025-02-01'}
+            for player in (self.first_player, self.second_player)
+        ]
+
+        def first_chunk_then_fail(ranges):
+            yield from iter_bulk_backfill_monthly_payments(ranges[:1])
+            raise RuntimeError("database went away")
+
+        with patch('financials.views.iter_bulk_backfill_monthly_payments', first_chunk_then_fail), self.assertLogs(
+            'financials.views', level='ERROR'
+        ):
+            response, lines = self._post({'entries': entries})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first, failure = lines
+        self.assertEqual(first['created_transactions'], 2)
+        self.assertFalse(failure['done'])
+        self.assertEqual(failure['details'], 'database went away')
+        self.assertEqual((failure['processed_ranges'], failure['created_transactions']), (1, 2))
+
+    def test_query_count_does_not_grow_with_players(self):
+        entries = [
+            {'player_id': player.id, 'start_month': '2024-01-01', 'end_month': '2025-12-01'}
+            for player in (self.first_player, self.second_player)
+        ]
+        with CaptureQueriesContext(connection) as one_player:
+            self._post({'entries': entries[:1]})
+        Transaction.objects.filter(category='monthly').delete()
+        with CaptureQueriesContext(connection) as two_players:
+            self._post({'entries': entries})
+
+        self.assertEqual(len(one_player.captured_queries), len(two_players.captured_queries))
+
+    def test_rejects_inverted_range(self):
+        response = self.client.post(
+            self.url,
+            {'entries': [{'player_id': self.first_player.id, 'start_month': '2025-03-01', 'end_month': '2025-01-01'}]},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PhonePeClientHolderTests(TestCase):
+    def setUp(self):
+        self.builds = []
+
+    def _build(self, config):
+        self.builds.append(config["CLIENT_ID"])
+        time.sleep(0.01)
+        return object()
+
+    def test_client_is_built_once_across_threads(self):
+        holder = PhonePeClientHolder(build=self._build)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: holder.get(), range(32)))
+
+        self.assertEqual(len(self.builds), 1)
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+    def test_client_is_rebuilt_after_expiry_or_invalidation(self):
+        holder = PhonePeClientHolder(build=self._build)
+        first = holder.get()
+
+        with patch("financials.phonepe_utils.time.monotonic", return_value=time.monotonic() + DEFAULT_CLIENT_TTL_SECONDS + 1):
+            second = holder.get()
+        self.assertIsNot(first, second)
+
+        holder.invalidate()
+        holder.get()
+        self.assertEqual(len(self.builds), 3)
+
+    def test_config_change_rebuilds_client(self):
+        holder = PhonePeClientHolder(build=self._build)
+        holder.get()
+        with self.settings(PHONEPE_CONFIG={**settings.PHONEPE_CONFIG, "CLIENT_ID": "other"}):
+            holder.get()
+        self.assertEqual(self.builds, [settings.PHONEPE_CONFIG["CLIENT_ID"], "other"])
+
+    def test_warm_up_never_raises(self):
+        with patch("financials.phonepe_utils._client_holder.get", side_effect=RuntimeError("SDK missing")):
+            self.assertFalse(warm_phonepe_client())
+
+
+class TransactionReceiverTests(TestCase):
+    def setUp(self):
+        self.player = Player.objects.create(first_name="Receiver", last_name="Player", age=25)
+
+    def test_saving_a_paid_transaction_queues_no_notification_and_no_lookup(self):
+        transaction = Transaction.objects.get(
+            pk=Transaction.objects.create(player=self.player, category="fine", amount=100).pk
+        )
+        transaction.paid = True
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            transaction.save()
+        self.assertFalse(Job.objects.exists())
+
+    def test_moving_a_fee_out_of_monthly_refreshes_membership(self):
+        transaction = Transaction.objects.create(
+            player=self.player, category="monthly", amount=750, due_date=timezone.localdate() - timedelta(days=120)
+        )
+        self.player.membership.refresh_from_db()
+        self.assertFalse(self.player.membership.membership_active)
+
+        transaction = Transaction.objects.get(pk=transaction.pk)
+        transaction.category = "fine"
+        transaction.save()
+        self.player.membership.refresh_from_db()
+        self.assertTrue(self.player.membership.membership_active)
+
+
+class PaymentCallbackLedgerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.player = Player.objects.create(first_name="Ledger", last_name="Player", age=25)
+        self.transaction = Transaction.objects.create(player=self.player, amount=500, category="monthly")
+        self.merchant_transaction_id = f"TXN{self.transaction.id}_abc12345"
+        record_payment_attempt(self.transaction, self.merchant_transaction_id)
+        self.callback_url = reverse('payment-callback')
+
+    def _callback(self):
+        return self.client.post(self.callback_url, {'merchantTransactionId': self.merchant_transaction_id}, format='json')
+
+    @patch('financials.views.check_payment_status')
+    def test_completed_callback_settles_once_without_queueing_jobs(self, mock_status):
+        mock_status.return_value = MagicMock(state="COMPLETED")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._callback()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.transaction.refresh_from_db()
+        self.assertTrue(self.transaction.paid)
+        self.assertEqual(self.transaction.payment_date, timezone.localdate())
+        attempt = PaymentAttempt.objects.get(merchant_transaction_id=self.merchant_transaction_id)
+        self.assertEqual(attempt.status, PaymentAttempt.STATUS_COMPLETED)
+        self.assertIsNotNone(attempt.settled_at)
+        self.assertFalse(Job.objects.exists())
+
+    @patch('financials.views.check_payment_status')
+    def test_duplicate_callbacks_skip_phonepe(self, mock_status):
+        mock_status.return_value = MagicMock(state="COMPLETED")
+        self._callback()
+        mock_status.reset_mock()
+
+        with self.assertNumQueries(1):
+            response = self._callback()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "success")
+        mock_status.assert_not_called()
+
+    @patch('financials.views.check_payment_status')
+    def test_order_paid_elsewhere_is_not_rechecked(self, mock_status):
+        Transaction.objects.filter(pk=self.transaction.pk).update(paid=True)
+
+        response = self.client.post(
+            self.callback_url,
+            {'merchantTransactionId': f"TXN{self.transaction.id}_legacy01"},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_status.assert_not_called()
+
+    @patch('financials.views.check_payment_status')
+    def test_failed_payment_is_recorded_on_the_attempt(self, mock_status):
+        mock_status.return_value = MagicMock(state="FAILED")
+
+        response = self._callback()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            PaymentAttempt.objects.get(merchant_transaction_id=self.merchant_transaction_id).status,
+            PaymentAttempt.STATUS_FAILED,
+        )
+
+    @patch('financials.views.check_payment_status', return_value=None)
+    def test_unreachable_phonepe_queues_one_poll_per_recorded_attempt(self, mock_status):
+        for _ in range(3):
+            self.assertEqual(self._callback().data["status"], "pending")
+        self.client.post(self.callback_url, {'merchantTransactionId': f"TXN{self.transaction.id}_forged01"}, format='json')
+
+        polls = Job.objects.filter(name=POLL_PAYMENT_STATUS_JOB)
+        self.assertEqual([job.payload for job in polls], [{"merchant_transaction_id": self.merchant_transaction_id}])
+
+        polls.update(status=Job.STATUS_FAILED)
+        self._callback()
+        self.assertEqual(polls.filter(status=Job.STATUS_QUEUED).count(), 1)
+
+    def test_settlement_is_a_conditional_update(self):
+        self.assertEqual(settle_payment(self.transaction.id, self.merchant_transaction_id), SETTLED)
+        self.assertEqual(settle_payment(self.transaction.id, self.merchant_transaction_id), ALREADY_PAID)
+
+        waived = Transaction.objects.create(player=self.player, amount=500, category="fine", waived=True)
+        self.assertEqual(settle_payment(waived.id), WAIVED)
+        waived.refresh_from_db()
+        self.assertFalse(waived.paid)
+
+
+class StubPhonePeStatusApi:
+    """Stands in for the SDK client: answers get_order_status from a state table."""
+
+    def __init__(self, states, latency=0.02):
+        self.states = states
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_order_status(self, merchant_order_id, details=False):
+        with self._lock:
+            self.calls.append(merchant_order_id)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            state = self.states[merchant_order_id]
+            if state is None:
+                raise ConnectionError("PhonePe unavailable")
+            return MagicMock(state=state)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class PaymentReconciliationTests(TestCase):
+    def setUp(self):
+        self.player = Player.objects.create(first_name="Recon", last_name="Player", age=25)
+        states = {}
+        self.transactions = {}
+        for index, state in enumerate(["COMPLETED"] * 6 + ["FAILED", "PENDING", None]):
+            transaction = Transaction.objects.create(player=self.player, amount=500, category="monthly", due_date=date(2026, 1 + index, 10))
+            merchant_transaction_id = f"TXN{transaction.id}_recon{index:03d}"
+            record_payment_attempt(transaction, merchant_transaction_id)
+            states[merchant_transaction_id] = state
+            self.transactions[merchant_transaction_id] = transaction
+        self.stub = StubPhonePeStatusApi(states)
+        holder_patch = patch("financials.phonepe_utils._client_holder", PhonePeClientHolder(build=lambda config: self.stub))
+        holder_patch.start()
+        self.addCleanup(holder_patch.stop)
+
+    def test_pending_orders_are_polled_concurrently_and_settled_in_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = reconcile_pending_payments(max_workers=4, rate_per_second=0)
+
+        self.assertEqual(sorted(self.stub.calls), sorted(self.transactions))
+        self.assertGreater(self.stub.max_in_flight, 1)
+        self.assertLessEqual(self.stub.max_in_flight, 4)
+        self.assertEqual((result.checked, result.completed, result.failed, result.pending, result.unreachable), (9, 6, 1, 1, 1))
+        self.assertEqual(Transaction.objects.filter(player=self.player, paid=True).count(), 6)
+        self.assertEqual(PaymentAttempt.objects.filter(status=PaymentAttempt.STATUS_COMPLETED).count(), 6)
+        self.assertEqual(PaymentAttempt.objects.filter(status=PaymentAttempt.STATUS_FAILED).count(), 1)
+        self.assertFalse(Job.objects.exists())
+        self.player.membership.refresh_from_db()
+        self.assertEqual(self.player.membership.oldest_unpaid_due_date, date(2026, 7, 10))
+
+    def test_settlement_is_one_update_regardless_of_order_count(self):
+        completed = {mtid: txn.id for mtid, txn in self.transactions.items() if self.stub.states[mtid] == "COMPLETED"}
+        with CaptureQueriesContext(connection) as context:
+            settle_payments(completed)
+        transaction_updates = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "financials_transaction"')
+        ]
+        self.assertEqual(len(transaction_updates), 1)
+
+    def test_already_settled_orders_are_not_polled_again(self):
+        reconcile_pending_payments(rate_per_second=0)
+        self.stub.calls.clear()
+
+        result = reconcile_pending_payments(rate_per_second=0)
+
+        self.assertEqual(result.checked, 2)
+        self.assertEqual(len(self.stub.calls), 2)
+
+    def test_rate_limit_bounds_request_rate(self):
+        started = time.monotonic()
+        reconcile_pending_payments(max_workers=8, rate_per_second=40)
+        self.assertGreaterEqual(time.monotonic() - started, 8 / 40 - 0.01)
+
+    def test_workers_queue_and_run_the_nightly_reconciliation(self):
+        with patch.dict("jobs.services._queued_runs", clear=True):
+            enqueue_scheduled_jobs()
+        job = Job.objects.get(name=RECONCILE_PENDING_PAYMENTS_JOB)
+        self.assertIsNotNone(job.schedule_key)
+
+        run_pending_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result["checked"], 9)
+        self.assertEqual(job.result["settled"], 6)
+        self.assertEqual(Transaction.objects.filter(player=self.player, paid=True).count(), 6)
+
+    def test_management_command_reports_counts(self):
+        out = StringIO()
+        call_command("reconcile_payments", "--rate", "0", stdout=out)
+        self.assertIn("Checked 9 order(s): 6 completed, 1 failed, 1 pending, 1 unreachable.", out.getvalue())
+
+
+class TransactionListFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(phone_number="9111111111", password="password", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.player = Player.objects.create(first_name="Filter", last_name="One", age=20)
+        self.other = Player.objects.create(first_name="Filter", last_name="Two", age=20)
+        Transaction.objects.all().delete()
+        for month in range(1, 7):
+            Transaction.objects.create(player=self.player, category="monthly", amount=750, due_date=date(2026, month, 10), paid=month <= 2)
+        Transaction.objects.create(player=self.other, category="fine", amount=100, due_date=date(2026, 3, 1))
+
+    def test_list_is_cursor_paginated(self):
+        first = self.client.get("/api/transactions/", {"page_size": 4})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data["results"]), 4)
+        self.assertIsNone(first.data["previous"])
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual(len(second.data["results"]), 3)
+        self.assertIsNone(second.data["next"])
+        ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+        self.assertEqual(ids, sorted(Transaction.objects.values_list("id", flat=True)))
+
+    def test_filters_combine_on_indexed_columns(self):
+        response = self.client.get(
+            "/api/transactions/",
+            {"player": self.player.id, "category": "monthly", "paid": "false", "due_from": "2026-03-01", "due_to": "2026-05-31"},
+        )
+        self.assertEqual(
+            [row["due_date"] for row in response.data["results"]],
+            ["2026-03-10", "2026-04-10", "2026-05-10"],
+        )
+
+    def test_invalid_filter_values_are_rejected(self):
+        response = self.client.get("/api/transactions/", {"category": "bogus", "due_from": "March"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {"category", "due_from"})
+
+
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+
+
+class TransactionExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = get_user_model().objects.create_user(phone_number="9111111112", password="password", is_staff=True)
+        self.client.force_authenticate(user=self.admin_user)
+        self.player = Player.objects.create(first_name="Ledger", last_name="One", age=20, phone_number="9000000001")
+        self.other = Player.objects.create(first_name="Ledger", last_name="Two", age=20)
+        Transaction.objects.all().delete()
+        for year in (2024, 2025, 2026):
+            Transaction.objects.create(player=self.player, category="monthly", amount=750, due_date=date(year, 1, 10))
+        Transaction.objects.create(player=self.other, category="fine", amount=100, due_date=date(2026, 3, 1))
+
+    def test_csv_export_streams_rows_with_player_names(self):
+        response = self.client.get("/api/transactions/export/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('filename="transactions.csv"', response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:4], ["id", "player_id", "player", "phone_number"])
+        self.assertEqual(len(lines), 5)
+        self.assertIn("Ledger One,9000000001,monthly,750.00,2024-01-10", lines[1])
+        self.assertIn("Ledger Two", lines[4])
+
+    def test_csv_export_applies_list_filters(self):
+        response = self.client.get("/api/transactions/export/", {"category": "monthly", "due_from": "2025-01-01"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([line.split(",")[6] for line in lines[1:]], ["2025-01-10", "2026-01-10"])
+
+    def test_non_staff_export_only_their_own_rows(self):
+        member = get_user_model().objects.create_user(phone_number="9111111113", password="password")
+        self.other.user = member
+        self.other.save()
+        self.client.force_authenticate(user=member)
+        lines = b"".join(self.client.get("/api/transactions/export/").streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Ledger Two", lines[1])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get("/api/transactions/export/", {"file_format": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rows_are_read_in_primary_key_chunks(self):
+        from cricket_club.exports import iter_by_pk
+
+        expected = list(Transaction.objects.order_by("id").values_list("id", flat=True))
+        with CaptureQueriesContext(connection) as queries:
+            ids = [row.id for row in iter_by_pk(Transaction.objects.all(), chunk_size=2)]
+        self.assertEqual(ids, expected)
+        # Two full chunks, then an empty one that ends the scan.
+        self.assertEqual(len(queries), 3)
+
+    def test_command_writes_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ledger.csv")
+            call_command("export_transactions", "--output", path, "--due-from", "2026-01-01", stdout=StringIO())
+            with open(path) as output:
+                lines = output.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all("2026-" in line for line in lines[1:]))
+
+    @skipUnless(HAS_OPENPYXL, "openpyxl is not installed.")
+    def test_xlsx_export_writes_a_workbook(self):
+        from openpyxl import load_workbook
+
+        response = self.client.get("/api/transactions/export/", {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        workbook = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+        rows = list(workbook["Transactions"].values)
+        self.assertEqual(rows[0][2], "player")
+        self.assertEqual([row[2] for row in rows[1:]], ["Ledger One"] * 3 + ["Ledger Two"])
+
+    @skipIf(HAS_OPENPYXL, "openpyxl is installed.")
+    def test_xlsx_export_reports_missing_dependency(self):
+        response = self.client.get("/api/transactions/export/", {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertIn("openpyxl", response.data["error"])
+
+
+def _mysql_plan_tables(node):
+    """Every ``table`` entry of a MySQL ``EXPLAIN FORMAT=JSON`` plan."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "table" and isinstance(value, dict):
+                yield value
+            yield from _mysql_plan_tables(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _mysql_plan_tables(item)
+
+
+@skipUnless(connection.vendor in ("sqlite", "mysql", "postgresql"), "No plan parser for this database.")
+class TransactionIndexPlanTests(TestCase):
+    """
+    Fails if a hot-path Transaction query stops using an index and scans the
+    table, checking the plan of whichever database the suite runs on. MySQL
+    cannot build the partial ``txn_open_monthly_due_idx`` (Django skips it),
+    so there the open-invoice queries must use ``txn_player_category_due_idx``.
+    """
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            # The fixture is tiny; without this the planner rightly prefers a sequential scan.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        self.player = Player.objects.create(first_name="Plan", last_name="Player", age=20)
+        for month in range(1, 13):
+            Transaction.objects.create(player=self.player, category="monthly", amount=750, due_date=date(2025, month, 10))
+        today = date.today()
+        self.month_start = today.replace(day=1)
+        self.month_end = self.month_start + timedelta(days=27)
+
+    def assertIndexedPlan(self, queryset, *, seek_columns=(), ordered=False, mysql_index=None):
+        if connection.vendor == "mysql":
+            return self.assertMySQLIndexedPlan(queryset, ordered=ordered, index=mysql_index)
+        if connection.vendor == "postgresql":
+            return self.assertPostgresIndexedPlan(queryset, ordered=ordered)
+        plan = queryset.explain()
+        table_scans = [line for line in plan.splitlines() if re.search(r"\bSCAN financials_transaction\b", line)]
+        self.assertEqual(table_scans, [], plan)
+        searches = [line for line in plan.splitlines() if "SEARCH financials_transaction USING" in line]
+        self.assertTrue(searches, plan)
+        for column in seek_columns:
+            # The index seek itself must constrain the column, not a row filter after it.
+            self.assertTrue(any(column in line.split("(", 1)[-1] for line in searches), plan)
+        if ordered:
+            self.assertNotIn("TEMP B-TREE", plan, plan)
+
+    def assertMySQLIndexedPlan(self, queryset, *, ordered, index):
+        raw_plan = queryset.explain(format="json")
+        plan = json.loads(raw_plan)
+        tables = [table for table in _mysql_plan_tables(plan) if table.get("table_name") == "financials_transaction"]
+        self.assertTrue(tables, raw_plan)
+        for table in tables:
+            self.assertNotEqual(table.get("access_type"), "ALL", raw_plan)
+            self.assertTrue(table.get("key"), raw_plan)
+            if index:
+                self.assertEqual(table["key"], index, raw_plan)
+        if ordered:
+            self.assertNotIn('"using_filesort": true', raw_plan, raw_plan)
+
+    def assertPostgresIndexedPlan(self, queryset, *, ordered):
+        plan = queryset.explain()
+        self.assertNotIn("Seq Scan on financials_transaction", plan, plan)
+        self.assertRegex(plan, r"Index (Only )?Scan", plan)
+        if ordered:
+            self.assertNotRegex(plan, r"\bSort\s+\(", plan)
+
+    def test_invoice_exists_range_uses_index(self):
+        self.assertIndexedPlan(
+            Transaction.objects.filter(
+                player=self.player,
+                category="monthly",
+                due_date__gte=self.month_start,
+                due_date__lte=self.month_end,
+            ),
+            seek_columns=("category", "due_date"),
+            mysql_index="txn_player_category_due_idx",
+        )
+
+    def test_membership_active_check_uses_index(self):
+        self.assertIndexedPlan(
+            self.player.transactions.filter(
+                category="monthly",
+                paid=False,
+                waived=False,
+                due_date__lt=date.today() - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS),
+            ),
+            seek_columns=("due_date",),
+            mysql_index="txn_player_category_due_idx",
+        )
+
+    def test_oldest_unpaid_lookup_is_an_ordered_index_seek(self):
+        self.assertIndexedPlan(
+            self.player.transactions.filter(category="monthly", paid=False, waived=False).order_by("due_date", "id")[:1],
+            ordered=True,
+            mysql_index="txn_player_category_due_idx",
+        )
+
+    def test_dashboard_last_transaction_is_an_ordered_index_seek(self):
+        self.assertIndexedPlan(
+            Transaction.objects.filter(player=self.player).order_by("-payment_date", "-due_date", "-id")[:1],
+            ordered=True,
+            mysql_index="txn_player_recent_idx",
+        )
+
+    def test_ledger_date_range_uses_index(self):
+        self.assertIndexedPlan(
+            Transaction.objects.filter(due_date__gte=self.month_start, due_date__lte=self.month_end),
+            seek_columns=("due_date",),
+        )
@@ -2,6 +2,7 @@ from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import (
     BackfillMonthlyPaymentsView,
+    BulkBackfillMonthlyPaymentsView,
     GenerateMonthlyInvoicesView,
     InitiatePaymentView,
     PaymentCallbackView,
@@ -16,6 +17,7 @@ router.register(
 urlpatterns = [
     path('generate-monthly-invoices/', GenerateMonthlyInvoicesView.as_view(), name='generate-monthly-invoices'),
     path('backfill-monthly-payments/', BackfillMonthlyPaymentsView.as_view(), name='backfill-monthly-payments'),
+    path('bulk-backfill-monthly-payments/', BulkBackfillMonthlyPaymentsView.as_view(), name='bulk-backfill-monthly-payments'),
     path('initiate-payment/', InitiatePaymentView.as_view(), name='initiate-payment'),
     path('payment-callback/', PaymentCallbackView.as_view(), name='payment-callback'),
 ]
@@ -1,10 +1,12 @@
 import base64
 import json
+import logging
 import uuid
-from datetime import date
 
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
@@ -12,23 +14,56 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema
 
+from .exports import TRANSACTION_EXPORT_HEADER, transaction_export_rows
 from .models import Transaction
 from .serializers import (
     BackfillMonthlyPaymentsSerializer,
+    BulkBackfillMonthlyPaymentsSerializer,
     TransactionSerializer,
     InitiatePaymentSerializer,
     PaymentCallbackSerializer,
     GenerateMonthlyInvoicesSerializer,
 )
+from .jobs import GENERATE_MONTHLY_INVOICES_JOB, schedule_payment_poll
+from .payments import (
+    NOT_FOUND,
+    WAIVED,
+    lookup_payment,
+    mark_attempt_failed,
+    record_payment_attempt,
+    settle_payment,
+)
 from .phonepe_utils import initiate_phonepe_payment, check_payment_status
-from .services import backfill_monthly_payments, generate_monthly_invoices, get_monthly_invoice_amount
+from .services import (
+    BackfillRange,
+    backfill_monthly_payments,
+    generate_monthly_invoices,
+    get_monthly_invoice_amount,
+    iter_bulk_backfill_monthly_payments,
+)
+from cricket_club.exports import streaming_csv_response, streaming_xlsx_response
+from cricket_club.filters import QueryParamFilterMixin, choice, parse_bool, parse_date
+from jobs.services import enqueue
 from players.models import Player
 
+logger = logging.getLogger(__name__)
 
-class TransactionViewSet(viewsets.ModelViewSet):
+
+class TransactionViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    filter_params = {
+        "player": ("player_id", int),
+        "category": ("category", choice(Transaction.CATEGORY_CHOICES)),
+        "paid": ("paid", parse_bool),
+        "waived": ("waived", parse_bool),
+        "due_from": ("due_date__gte", parse_date),
+        "due_to": ("due_date__lte", parse_date),
+        "paid_from": ("payment_date__gte", parse_date),
+        "paid_to": ("payment_date__lte", parse_date),
+    }
+    filter_actions = ("list", "export")
 
     def get_queryset(self):
         user = self.request.user
@@ -43,6 +78,25 @@ class TransactionViewSet(viewsets.ModelViewSet):
 
         return queryset.filter(player=player)
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        The (filtered) ledger with player names, streamed as CSV or, with
+        ``?file_format=xlsx``, as a spreadsheet.
+        """
+        file_format = request.query_params.get("file_format", "csv")
+        rows = transaction_export_rows(self.filter_queryset(self.get_queryset()))
+        if file_format == "csv":
+            return streaming_csv_response("transactions.csv", TRANSACTION_EXPORT_HEADER, rows)
+        if file_format != "xlsx":
+            return Response({"error": "file_format must be csv or xlsx."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return streaming_xlsx_response(
+                "transactions.xlsx", TRANSACTION_EXPORT_HEADER, rows, sheet_title="Transactions"
+            )
+        except RuntimeError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
 
 class InitiatePaymentView(APIView):
     permission_classes = [IsAuthenticated]
@@ -66,6 +120,7 @@ class InitiatePaymentView(APIView):
             return Response({"message": "Transaction already paid"}, status=status.HTTP_400_BAD_REQUEST)
 
         merchant_transaction_id = f"TXN{transaction.id}_{str(uuid.uuid4())[:8]}"
+        record_payment_attempt(transaction, merchant_transaction_id)
 
         try:
             response = initiate_phonepe_payment(
@@ -73,11 +128,14 @@ class InitiatePaymentView(APIView):
                 amount=transaction.amount,
                 user_id=request.user.id
             )
+            # Settle the order even if the redirect callback never arrives.
+            schedule_payment_poll(merchant_transaction_id, requested_by=request.user)
             return Response({
                 "payment_url": response.redirect_url, 
                 "merchant_transaction_id": merchant_transaction_id
             })
         except Exception as e:
+             mark_attempt_failed(merchant_transaction_id)
              return Response({"error": "Payment initiation failed", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class PaymentCallbackView(APIView):
@@ -120,36 +178,38 @@ class PaymentCallbackView(APIView):
                 "details": "No merchantTransactionId found in request. Send {'merchantTransactionId': '...'}"
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # --- FAST PATH ---
+        # PhonePe retries webhooks and the browser redirect hits this view too;
+        # orders the ledger already settled are answered without calling PhonePe.
+        lookup = lookup_payment(merchant_transaction_id)
+        if lookup is None:
+            return Response({"error": "Transaction not found for this ID"}, status=status.HTTP_404_NOT_FOUND)
+        if lookup.settled:
+            return Response({"status": "success", "message": "Payment verified and updated"})
+        if lookup.waived:
+            return Response({"message": "Transaction has been waived"}, status=status.HTTP_400_BAD_REQUEST)
+
         # --- VERIFICATION ---
         try:
             # Verify status with PhonePe Server
             status_response = check_payment_status(merchant_transaction_id)
 
             if not status_response:
-                 return Response({"status": "pending", "message": "Could not fetch status from PhonePe"})
+                # Only orders the ledger has as initiated get a (single) poll;
+                # this view is public, so ids it merely parses must not queue work.
+                schedule_payment_poll(merchant_transaction_id)
+                return Response({"status": "pending", "message": "Could not fetch status from PhonePe"})
 
             if status_response.state == "COMPLETED":
-                try:
-                    # Parse "TXN{id}_{uuid}"
-                    txn_prefix = merchant_transaction_id.split('_')[0] 
-                    txn_id = txn_prefix.replace("TXN", "") 
-                    
-                    transaction = Transaction.objects.get(id=txn_id)
-                    
-                    if transaction.waived:
-                        return Response({"message": "Transaction has been waived"}, status=status.HTTP_400_BAD_REQUEST)
-
-                    if not transaction.paid:
-                        transaction.paid = True
-                        transaction.payment_date = date.today()
-                        transaction.save()
-                        
-                    return Response({"status": "success", "message": "Payment verified and updated"})
-                
-                except (IndexError, ValueError, Transaction.DoesNotExist):
+                outcome = settle_payment(lookup.transaction_id, merchant_transaction_id)
+                if outcome == WAIVED:
+                    return Response({"message": "Transaction has been waived"}, status=status.HTTP_400_BAD_REQUEST)
+                if outcome == NOT_FOUND:
                     return Response({"error": "Transaction not found for this ID"}, status=status.HTTP_404_NOT_FOUND)
+                return Response({"status": "success", "message": "Payment verified and updated"})
 
             elif status_response.state == "FAILED":
+                mark_attempt_failed(merchant_transaction_id)
                 return Response({"status": "failed", "message": "Payment failed"}, status=status.HTTP_400_BAD_REQUEST)
 
             else:
@@ -168,6 +228,21 @@ class GenerateMonthlyInvoicesView(APIView):
         serializer.is_valid(raise_exception=True)
 
         billing_date = serializer.validated_data.get("billing_date")
+        if serializer.validated_data.get("background"):
+            job = enqueue(
+                GENERATE_MONTHLY_INVOICES_JOB,
+                {"billing_date": billing_date.isoformat() if billing_date else None},
+                requested_by=request.user,
+            )
+            return Response(
+                {
+                    "message": "Monthly invoice generation queued.",
+                    "job_id": job.id,
+                    "status": job.status,
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
         result = generate_monthly_invoices(billing_date=billing_date)
 
         return Response(
@@ -224,3 +299,86 @@ class BackfillMonthlyPaymentsView(APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+
+class BulkBackfillMonthlyPaymentsView(APIView):
+    """
+    Backfills many players in one request and streams one NDJSON line per
+    range as soon as its chunk of players is committed. The stream always ends
+    with a summary line carrying ``"done": true``, or an ``"error"`` line if
+    the run stopped partway (chunks already streamed stay committed). A stream
+    that ends without either was cut off.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(request=BulkBackfillMonthlyPaymentsSerializer, responses={200: None})
+    def post(self, request):
+        serializer = BulkBackfillMonthlyPaymentsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        default_payment_date = serializer.validated_data.get("payment_date")
+        ranges = [
+            BackfillRange(
+                player_id=entry["player_id"],
+                start_month=entry["start_month"],
+                end_month=entry["end_month"],
+                payment_date=entry.get("payment_date") or default_payment_date,
+            )
+            for entry in serializer.validated_data["entries"]
+        ]
+        return StreamingHttpResponse(
+            self._stream_progress(ranges),
+            content_type="application/x-ndjson",
+        )
+
+    def _stream_progress(self, ranges):
+        processed = 0
+        created = 0
+        try:
+            for line in self._range_lines(ranges):
+                processed += 1
+                created += line.get("created_transactions", 0)
+                yield json.dumps(line) + "\n"
+        except Exception as e:
+            # The 200 is already sent, so the failure has to be reported in the body.
+            logger.exception("Bulk backfill stopped after %s range(s).", processed)
+            yield json.dumps(
+                {
+                    "done": False,
+                    "error": "Backfill stopped before finishing.",
+                    "details": str(e),
+                    "processed_ranges": processed,
+                    "created_transactions": created,
+                }
+            ) + "\n"
+            return
+
+        yield json.dumps(
+            {
+                "done": True,
+                "message": "Monthly payments backfilled successfully.",
+                "processed_ranges": processed,
+                "created_transactions": created,
+            }
+        ) + "\n"
+
+    def _range_lines(self, ranges):
+        for entry, result in iter_bulk_backfill_monthly_payments(ranges):
+            line = {
+                "player_id": entry.player_id,
+                "start_month": entry.start_month.isoformat(),
+                "end_month": entry.end_month.isoformat(),
+            }
+            if result is None:
+                line["error"] = "Player not found."
+            else:
+                line.update(
+                    {
+                        "created_transactions": result.created_count,
+                        "skipped_existing": result.skipped_existing,
+                        "skipped_leave_months": result.skipped_leave_months,
+                        "skipped_before_join": result.skipped_before_join,
+                        "transaction_ids": [transaction.id for transaction in result.created_transactions],
+                    }
+                )
+            yield line
@@ -0,0 +1,5 @@
+def post_worker_init(worker):
+    # Import the PhonePe SDK and fetch its token once per worker, not on the first payment.
+    from financials.phonepe_utils import warm_phonepe_client
+
+    warm_phonepe_client()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import InventoryCategory, InventoryItem, ItemAssignment, Sale
+from .models import InventoryCategory, InventoryItem, InventoryMovement, ItemAssignment, Sale
 
 class InventoryCategoryAdmin(admin.ModelAdmin):
     list_display = ('name',)
@@ -31,7 +31,20 @@ class SaleAdmin(admin.ModelAdmin):
     search_fields = ('item__name', 'player__first_name', 'player__last_name')
     list_filter = ('sale_date',)
 
+class InventoryMovementAdmin(admin.ModelAdmin):
+    list_display = ('item', 'movement_type', 'quantity', 'team', 'player', 'recorded_by', 'created_at')
+    search_fields = ('item__name', 'notes')
+    list_filter = ('movement_type', 'created_at')
+
+    # The ledger is written by inventory.services alongside the counters; editing rows here would desync them.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 admin.site.register(InventoryCategory, InventoryCategoryAdmin)
 admin.site.register(InventoryItem, InventoryItemAdmin)
 admin.site.register(ItemAssignment, ItemAssignmentAdmin)
 admin.site.register(Sale, SaleAdmin)
+admin.site.register(InventoryMovement, InventoryMovementAdmin)
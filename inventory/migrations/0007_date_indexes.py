@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_inventoryitem_image_and_description_optional"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="itemassignment",
+            name="date_assigned",
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="sale",
+            name="sale_date",
+            field=models.DateField(db_index=True),
+        ),
+    ]
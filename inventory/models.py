@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 from teams.models import Team
@@ -63,14 +64,16 @@ class InventoryItem(models.Model):
             self.distributed_quantity == 0
         ):
             self.available_quantity = self.quantity
-        self.full_clean()
+        # Only the counter invariant; full_clean() would add FK lookups to every
+        # write. Stock changes go through inventory.services, not save().
+        self.clean()
         return super().save(*args, **kwargs)
 
 class ItemAssignment(models.Model):
     item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, limit_choices_to={'type': 'team_kit'})
     team = models.ForeignKey(Team, on_delete=models.CASCADE)
     quantity_assigned = models.PositiveIntegerField()
-    date_assigned = models.DateField()
+    date_assigned = models.DateField(db_index=True)
 
     def __str__(self):
         return f"{self.quantity_assigned} x {self.item.name} assigned to {self.team.name}"
@@ -79,7 +82,7 @@ class Sale(models.Model):
     item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, limit_choices_to={'type': 'merchandise'})
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
     quantity_sold = models.PositiveIntegerField()
-    sale_date = models.DateField()
+    sale_date = models.DateField(db_index=True)
 
     def __str__(self):
         return f"Sale of {self.quantity_sold} x {self.item.name} to {self.player}"
@@ -88,3 +91,32 @@ class Sale(models.Model):
         super().clean()
         if self.item and self.item.price is None:
             raise ValidationError("Selected merchandise item must have a price before a sale can be recorded.")
+
+
+class InventoryMovement(models.Model):
+    """One line of the stock ledger; ``inventory.services.apply_movements`` writes it with the counter updates."""
+
+    MOVEMENT_TYPE_CHOICES = [
+        ('restock', 'Restock'),
+        ('sale', 'Sale'),
+        ('assignment', 'Assignment'),
+        ('return', 'Return'),
+        ('missing', 'Marked Missing'),
+        ('destroyed', 'Destroyed'),
+    ]
+
+    item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='movements')
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPE_CHOICES)
+    quantity = models.PositiveIntegerField()
+    sale = models.ForeignKey(Sale, on_delete=models.SET_NULL, null=True, blank=True, related_name='movements')
+    assignment = models.ForeignKey(
+        ItemAssignment, on_delete=models.SET_NULL, null=True, blank=True, related_name='movements'
+    )
+    team = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True)
+    player = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True)
+    notes = models.TextField(blank=True)
+    recorded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} of {self.quantity} x {self.item.name}"
@@ -0,0 +1,128 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from cricket_club.cache import get_or_build
+from cricket_club.exports import iter_by_pk
+from teams.models import Team
+
+from .models import InventoryCategory, InventoryItem, InventoryMovement, ItemAssignment, Sale
+
+STOCK_REPORT_CACHE_TIMEOUT = 300
+
+# The cached report is keyed on the version of each of these models; stock
+# movements bump InventoryItem and InventoryMovement themselves.
+STOCK_REPORT_MODELS = (InventoryCategory, InventoryItem, InventoryMovement, ItemAssignment, Sale, Team)
+
+COUNTER_FIELDS = ("quantity", "available_quantity", "missing_quantity", "destroyed_quantity", "distributed_quantity")
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+ZERO = Value(Decimal("0.00"), output_field=MONEY)
+
+MOVEMENT_EXPORT_HEADER = (
+    "id", "created_at", "item", "movement_type", "quantity", "team", "player", "recorded_by", "notes",
+)
+
+
+def _money(value):
+    return str((value or Decimal("0")).quantize(Decimal("0.01")))
+
+
+def compute_stock_report():
+    """
+    Stock on hand and its value per item and per category, merchandise
+    revenue (``quantity_sold * price``) and kit held by each team, with one
+    grouped query per section.
+    """
+    stock_value = Coalesce(Sum(F("available_quantity") * F("price"), output_field=MONEY), ZERO)
+
+    items = list(
+        InventoryItem.objects.order_by("category__name", "name").values(
+            "id", "name", "type", "price", "category_id", *COUNTER_FIELDS
+        )
+    )
+    sales = {
+        row["item_id"]: row
+        for row in Sale.objects.values("item_id")
+        .annotate(
+            units_sold=Sum("quantity_sold"),
+            revenue=Coalesce(Sum(F("quantity_sold") * F("item__price"), output_field=MONEY), ZERO),
+        )
+        .order_by()
+    }
+    categories = list(
+        InventoryItem.objects.values("category_id", "category__name")
+        .annotate(item_count=Count("id"), stock_value=stock_value, **{field: Sum(field) for field in COUNTER_FIELDS})
+        .order_by("category__name")
+    )
+    kit_rows = (
+        ItemAssignment.objects.values("team_id", "team__name", "item_id", "item__name")
+        .annotate(units=Sum("quantity_assigned"))
+        .order_by("team__name", "item__name")
+    )
+
+    teams = {}
+    for row in kit_rows:
+        team = teams.setdefault(
+            row["team_id"], {"team_id": row["team_id"], "team": row["team__name"], "units": 0, "items": []}
+        )
+        team["units"] += row["units"]
+        team["items"].append({"item_id": row["item_id"], "item": row["item__name"], "units": row["units"]})
+
+    item_rows = []
+    for item in items:
+        sold = sales.get(item["id"], {})
+        price = item["price"]
+        item_rows.append(
+            {
+                **item,
+                "price": _money(price) if price is not None else None,
+                "stock_value": _money((price or 0) * item["available_quantity"]),
+                "units_sold": sold.get("units_sold", 0),
+                "revenue": _money(sold.get("revenue")),
+            }
+        )
+
+    return {
+        "totals": {
+            **{field: sum(item[field] for item in items) for field in COUNTER_FIELDS},
+            "stock_value": _money(sum((category["stock_value"] for category in categories), Decimal("0"))),
+            "merchandise_revenue": _money(sum((row["revenue"] for row in sales.values()), Decimal("0"))),
+            "units_sold": sum(row["units_sold"] for row in sales.values()),
+        },
+        "categories": [
+            {
+                "category_id": category["category_id"],
+                "category": category["category__name"],
+                "item_count": category["item_count"],
+                **{field: category[field] for field in COUNTER_FIELDS},
+                "stock_value": _money(category["stock_value"]),
+            }
+            for category in categories
+        ],
+        "items": item_rows,
+        "kit_by_team": list(teams.values()),
+    }
+
+
+def get_stock_report():
+    return get_or_build(
+        "inventory:stock-report", STOCK_REPORT_MODELS, compute_stock_report, timeout=STOCK_REPORT_CACHE_TIMEOUT
+    )
+
+
+def movement_export_rows(queryset):
+    """CSV rows for ``queryset`` of movements, read from the database in chunks."""
+    for movement in iter_by_pk(queryset.select_related("item", "team", "player", "recorded_by")):
+        player = movement.player
+        yield (
+            movement.id,
+            movement.created_at.isoformat(),
+            movement.item.name,
+            movement.movement_type,
+            movement.quantity,
+            movement.team.name if movement.team else "",
+            f"{player.first_name} {player.last_name}".strip() if player else "",
+            movement.recorded_by.phone_number if movement.recorded_by else "",
+            movement.notes,
+        )
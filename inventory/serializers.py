@@ -1,18 +1,24 @@
 from rest_framework import serializers
-from cricket_club.upload_validators import validate_uploaded_image
-from .models import InventoryCategory, InventoryItem, ItemAssignment, Sale
+from cricket_club.images import ImageVariantField
+from cricket_club.upload_validators import ValidatedImageField
+from .models import InventoryCategory, InventoryItem, InventoryMovement, ItemAssignment, Sale
 
 
 class InventoryCategorySerializer(serializers.ModelSerializer):
+    image = ValidatedImageField(required=False, allow_null=True)
+    thumbnail_url = ImageVariantField("thumbnail", source="image")
+
     class Meta:
         model = InventoryCategory
-        fields = ['id', 'name', 'description', 'image']
-
-    def validate_image(self, value):
-        return validate_uploaded_image(value)
+        fields = ['id', 'name', 'description', 'image', 'thumbnail_url']
 
 class InventoryItemSerializer(serializers.ModelSerializer):
     category_detail = InventoryCategorySerializer(source='category', read_only=True)
+    image = ValidatedImageField(required=False, allow_null=True)
+    thumbnail_url = ImageVariantField("thumbnail", source="image")
+    # Opening stock on create, posted to the ledger as a restock. Afterwards
+    # stock only moves through movements, sales and assignments.
+    quantity = serializers.IntegerField(min_value=0, required=False)
 
     class Meta:
         model = InventoryItem
@@ -23,6 +29,7 @@ class InventoryItemSerializer(serializers.ModelSerializer):
             'name',
             'description',
             'image',
+            'thumbnail_url',
             'quantity',
             'available_quantity',
             'missing_quantity',
@@ -31,9 +38,21 @@ class InventoryItemSerializer(serializers.ModelSerializer):
             'price',
             'type',
         ]
+        read_only_fields = ['available_quantity', 'missing_quantity', 'destroyed_quantity', 'distributed_quantity']
+
+    def validate_quantity(self, value):
+        if self.instance is not None and value != self.instance.quantity:
+            raise serializers.ValidationError("Record a restock, loss or return in /api/inventory-movements/ to change stock.")
+        return value
 
-    def validate_image(self, value):
-        return validate_uploaded_image(value)
+    def update(self, instance, validated_data):
+        # Save only the edited columns, so counters moved by the ledger since this
+        # request read the row are not written back.
+        validated_data.pop('quantity', None)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 class ItemAssignmentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -44,3 +63,30 @@ class SaleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sale
         fields = ['id', 'item', 'player', 'quantity_sold', 'sale_date']
+
+
+class InventoryMovementSerializer(serializers.ModelSerializer):
+    # Sales and assignments are recorded through their own endpoints, which create the linked rows.
+    movement_type = serializers.ChoiceField(
+        choices=[
+            choice for choice in InventoryMovement.MOVEMENT_TYPE_CHOICES if choice[0] not in ('sale', 'assignment')
+        ]
+    )
+    quantity = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = InventoryMovement
+        fields = [
+            'id',
+            'item',
+            'movement_type',
+            'quantity',
+            'sale',
+            'assignment',
+            'team',
+            'player',
+            'notes',
+            'recorded_by',
+            'created_at',
+        ]
+        read_only_fields = ['sale', 'assignment', 'recorded_by', 'created_at']
@@ -0,0 +1,131 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F
+
+from cricket_club.cache import invalidate_models
+
+from .models import InventoryItem, InventoryMovement, ItemAssignment
+
+# How one unit of each movement shifts an item's counters.
+MOVEMENT_EFFECTS = {
+    "restock": {"quantity": 1, "available_quantity": 1},
+    "sale": {"available_quantity": -1, "distributed_quantity": 1},
+    "assignment": {"available_quantity": -1, "distributed_quantity": 1},
+    "return": {"distributed_quantity": -1, "available_quantity": 1},
+    "missing": {"available_quantity": -1, "missing_quantity": 1},
+    "destroyed": {"available_quantity": -1, "destroyed_quantity": 1},
+}
+COUNTER_FIELDS = (
+    "quantity",
+    "available_quantity",
+    "missing_quantity",
+    "destroyed_quantity",
+    "distributed_quantity",
+)
+
+
+@dataclass(frozen=True)
+class Movement:
+    item_id: int
+    movement_type: str
+    quantity: int
+    team_id: int = None
+    player_id: int = None
+    sale_id: int = None
+    assignment_id: int = None
+    notes: str = ""
+
+
+class InsufficientStock(Exception):
+    """Raised with ``{item_id: message}`` when a batch would drive a counter below zero."""
+
+    def __init__(self, shortages):
+        super().__init__("; ".join(shortages.values()))
+        self.shortages = shortages
+
+
+def apply_movements(movements, *, recorded_by=None):
+    """
+    Applies a batch of movements atomically: the affected items are locked
+    (in id order, so concurrent batches cannot deadlock), the net change per
+    item is checked against the locked counters, then written with one
+    ``F()`` UPDATE per item and logged to the ledger. Either every movement
+    applies or none does.
+    """
+    deltas = defaultdict(Counter)
+    for movement in movements:
+        for field, sign in MOVEMENT_EFFECTS[movement.movement_type].items():
+            deltas[movement.item_id][field] += sign * movement.quantity
+
+    with transaction.atomic():
+        locked = {
+            row["pk"]: row
+            for row in InventoryItem.objects.select_for_update()
+            .filter(pk__in=deltas)
+            .order_by("pk")
+            .values("pk", "name", *COUNTER_FIELDS)
+        }
+        shortages = {}
+        for item_id, changes in deltas.items():
+            row = locked.get(item_id)
+            if row is None:
+                shortages[item_id] = f"Inventory item {item_id} does not exist."
+                continue
+            for field, delta in changes.items():
+                if row[field] + delta < 0:
+                    shortages[item_id] = (
+                        f"{row['name']}: {row[field]} {field.replace('_', ' ')} on hand, {-delta} needed."
+                    )
+                    break
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        for item_id, changes in deltas.items():
+            updates = {field: F(field) + delta for field, delta in changes.items() if delta}
+            if updates:
+                InventoryItem.objects.filter(pk=item_id).update(**updates)
+        entries = InventoryMovement.objects.bulk_create(
+            [
+                InventoryMovement(
+                    item_id=movement.item_id,
+                    movement_type=movement.movement_type,
+                    quantity=movement.quantity,
+                    team_id=movement.team_id,
+                    player_id=movement.player_id,
+                    sale_id=movement.sale_id,
+                    assignment_id=movement.assignment_id,
+                    notes=movement.notes,
+                    recorded_by=recorded_by,
+                )
+                for movement in movements
+            ]
+        )
+        invalidate_models(InventoryItem, InventoryMovement)
+    return entries
+
+
+def sale_movement(sale, movement_type="sale"):
+    return Movement(sale.item_id, movement_type, sale.quantity_sold, player_id=sale.player_id, sale_id=sale.pk)
+
+
+def assignment_movement(assignment, movement_type="assignment"):
+    return Movement(
+        assignment.item_id,
+        movement_type,
+        assignment.quantity_assigned,
+        team_id=assignment.team_id,
+        assignment_id=assignment.pk,
+    )
+
+
+def distribute_kit(rows, *, recorded_by=None):
+    """
+    Records a whole kit-distribution sheet (``item``/``team``/``quantity_assigned``/
+    ``date_assigned`` rows) in one transaction; a shortage on any row records nothing.
+    """
+    with transaction.atomic():
+        assignments = [ItemAssignment.objects.create(**row) for row in rows]
+        apply_movements([assignment_movement(assignment) for assignment in assignments], recorded_by=recorded_by)
+    return assignments
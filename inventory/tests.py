@@ -1,9 +1,17 @@
-from django.test import TestCase
+import csv
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from io import BytesIO
 from PIL import Image
-from .models import InventoryItem, Sale, ItemAssignment
+from rest_framework import status
+from rest_framework.test import APIClient
+from .models import InventoryCategory, InventoryItem, InventoryMovement, Sale, ItemAssignment
 from .serializers import InventoryCategorySerializer, InventoryItemSerializer
+from .services import Movement, apply_movements, distribute_kit
 from players.models import Player
 from teams.models import Team
 from financials.models import Transaction
@@ -68,6 +76,7 @@ class ItemAssignmentModelTest(TestCase):
         self.assertEqual(str(assignment), '5 x Team Helmet assigned to Test Team')
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class InventoryCategoryImageValidationTest(TestCase):
     def _build_test_image(self):
         buffer = BytesIO()
@@ -98,6 +107,7 @@ class InventoryCategoryImageValidationTest(TestCase):
         self.assertTrue(serializer.is_valid(), serializer.errors)
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class InventoryItemImageValidationTest(TestCase):
     def _build_test_image(self):
         buffer = BytesIO()
@@ -140,3 +150,197 @@ class InventoryItemImageValidationTest(TestCase):
             }
         )
         self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class InventoryMovementTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(phone_number='9100000001', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.player = Player.objects.create(first_name='Kit', last_name='Buyer', phone_number='9100000002')
+        self.team = Team.objects.create(name='Kit XI')
+        self.other_team = Team.objects.create(name='Kit XII')
+        self.shirt = InventoryItem.objects.create(name='Club Shirt', quantity=10, price=500, type='merchandise')
+        self.helmet = InventoryItem.objects.create(name='Helmet', quantity=6, type='team_kit')
+
+    def assertCounters(self, item, **expected):
+        item.refresh_from_db()
+        self.assertEqual({field: getattr(item, field) for field in expected}, expected)
+
+    def test_sale_moves_stock_and_is_logged(self):
+        response = self.client.post(
+            '/api/sales/',
+            {'item': self.shirt.id, 'player': self.player.id, 'quantity_sold': 3, 'sale_date': '2026-10-01'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertCounters(self.shirt, available_quantity=7, distributed_quantity=3)
+        movement = InventoryMovement.objects.get(sale_id=response.data['id'])
+        self.assertEqual((movement.movement_type, movement.quantity, movement.recorded_by), ('sale', 3, self.user))
+
+    def test_oversold_sale_is_rejected_and_rolled_back(self):
+        response = self.client.post(
+            '/api/sales/',
+            {'item': self.shirt.id, 'player': self.player.id, 'quantity_sold': 11, 'sale_date': '2026-10-01'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(Transaction.objects.filter(category='merchandise').exists())
+        self.assertCounters(self.shirt, available_quantity=10, distributed_quantity=0)
+
+    def test_editing_and_deleting_a_sale_return_stock(self):
+        sale_id = self.client.post(
+            '/api/sales/',
+            {'item': self.shirt.id, 'player': self.player.id, 'quantity_sold': 3, 'sale_date': '2026-10-01'},
+            format='json',
+        ).data['id']
+
+        self.client.patch(f'/api/sales/{sale_id}/', {'quantity_sold': 1}, format='json')
+        self.assertCounters(self.shirt, available_quantity=9, distributed_quantity=1)
+
+        self.client.delete(f'/api/sales/{sale_id}/')
+        self.assertCounters(self.shirt, available_quantity=10, distributed_quantity=0)
+
+    def test_kit_sheet_is_applied_all_or_nothing(self):
+        sheet = [
+            {'item': self.helmet.id, 'team': self.team.id, 'quantity_assigned': 4, 'date_assigned': '2026-10-01'},
+            {'item': self.helmet.id, 'team': self.other_team.id, 'quantity_assigned': 3, 'date_assigned': '2026-10-01'},
+        ]
+
+        short = self.client.post('/api/item-assignments/bulk/', sheet, format='json')
+        self.assertEqual(short.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(short.data), ['quantity'])
+        self.assertFalse(ItemAssignment.objects.exists())
+        self.assertCounters(self.helmet, available_quantity=6)
+
+        sheet[1]['quantity_assigned'] = 2
+        response = self.client.post('/api/item-assignments/bulk/', sheet, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertCounters(self.helmet, available_quantity=0, distributed_quantity=6)
+        self.assertEqual(InventoryMovement.objects.filter(movement_type='assignment').count(), 2)
+
+    def test_losses_returns_and_restocks_are_posted_to_the_ledger(self):
+        for movement_type, quantity in (('missing', 2), ('destroyed', 1), ('restock', 4)):
+            response = self.client.post(
+                '/api/inventory-movements/',
+                {'item': self.helmet.id, 'movement_type': movement_type, 'quantity': quantity},
+                format='json',
+            )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertCounters(
+            self.helmet, quantity=10, available_quantity=7, missing_quantity=2, destroyed_quantity=1
+        )
+
+        nothing_out = self.client.post(
+            '/api/inventory-movements/',
+            {'item': self.helmet.id, 'movement_type': 'return', 'quantity': 1},
+            format='json',
+        )
+        self.assertEqual(nothing_out.status_code, status.HTTP_400_BAD_REQUEST)
+        sale_type = self.client.post(
+            '/api/inventory-movements/',
+            {'item': self.helmet.id, 'movement_type': 'sale', 'quantity': 1},
+            format='json',
+        )
+        self.assertEqual(sale_type.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_counters_add_up_after_repeated_batches(self):
+        apply_movements([Movement(self.shirt.id, 'sale', 1) for _ in range(4)])
+        apply_movements([Movement(self.shirt.id, 'return', 1), Movement(self.shirt.id, 'missing', 2)])
+        self.assertCounters(self.shirt, available_quantity=5, distributed_quantity=3, missing_quantity=2)
+
+    def test_opening_stock_is_posted_as_a_restock(self):
+        response = self.client.post(
+            '/api/inventory-items/',
+            {'name': 'Pads', 'quantity': 12, 'available_quantity': 99, 'type': 'team_kit'},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['quantity'], response.data['available_quantity']), (12, 12))
+        movement = InventoryMovement.objects.get(item_id=response.data['id'])
+        self.assertEqual((movement.movement_type, movement.quantity, movement.recorded_by), ('restock', 12, self.user))
+
+    def test_item_edits_leave_stock_counters_alone(self):
+        stale = InventoryItem.objects.get(pk=self.shirt.pk)
+        apply_movements([Movement(self.shirt.id, 'sale', 3)])
+
+        serializer = InventoryItemSerializer(stale, data={'name': 'Home Shirt', 'available_quantity': 50}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertCounters(self.shirt, quantity=10, available_quantity=7, distributed_quantity=3)
+        self.assertEqual(InventoryItem.objects.get(pk=self.shirt.pk).name, 'Home Shirt')
+        changed = self.client.patch(f'/api/inventory-items/{self.shirt.id}/', {'quantity': 20}, format='json')
+        self.assertEqual(changed.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('quantity', changed.data)
+        self.assertCounters(self.shirt, quantity=10)
+
+    def test_item_save_skips_full_validation_queries(self):
+        category = InventoryCategory.objects.create(name='Headgear')
+        self.helmet.category = category
+        self.helmet.save()
+
+        with self.assertNumQueries(1):
+            self.helmet.save()
+
+
+class StockReportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=get_user_model().objects.create_user(phone_number='9100000003', password='password123')
+        )
+        self.player = Player.objects.create(first_name='Report', last_name='Buyer', phone_number='9100000004')
+        self.team = Team.objects.create(name='Report XI')
+        apparel = InventoryCategory.objects.create(name='Apparel')
+        self.shirt = InventoryItem.objects.create(
+            name='Club Shirt', category=apparel, quantity=10, price=500, type='merchandise'
+        )
+        self.cap = InventoryItem.objects.create(name='Cap', category=apparel, quantity=4, price='150.50', type='merchandise')
+        self.helmet = InventoryItem.objects.create(name='Helmet', quantity=6, type='team_kit')
+        apply_movements([Movement(self.shirt.id, 'sale', 3, player_id=self.player.id)])
+        Sale.objects.create(item=self.shirt, player=self.player, quantity_sold=3, sale_date=date(2026, 10, 1))
+        distribute_kit(
+            [{'item': self.helmet, 'team': self.team, 'quantity_assigned': 2, 'date_assigned': date(2026, 10, 1)}]
+        )
+
+    def test_report_totals(self):
+        report = self.client.get('/api/inventory-items/report/').data
+
+        self.assertEqual(report['totals']['available_quantity'], 7 + 4 + 4)
+        self.assertEqual(report['totals']['stock_value'], '4102.00')
+        self.assertEqual(report['totals']['merchandise_revenue'], '1500.00')
+        apparel = next(row for row in report['categories'] if row['category'] == 'Apparel')
+        self.assertEqual((apparel['item_count'], apparel['distributed_quantity']), (2, 3))
+        shirt = next(row for row in report['items'] if row['id'] == self.shirt.id)
+        self.assertEqual((shirt['units_sold'], shirt['revenue'], shirt['stock_value']), (3, '1500.00', '3500.00'))
+        self.assertEqual(
+            report['kit_by_team'],
+            [{'team_id': self.team.id, 'team': 'Report XI', 'units': 2,
+              'items': [{'item_id': self.helmet.id, 'item': 'Helmet', 'units': 2}]}],
+        )
+
+    def test_report_is_cached_until_stock_moves(self):
+        self.client.get('/api/inventory-items/report/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/inventory-items/report/')
+
+        apply_movements([Movement(self.cap.id, 'missing', 1)])
+
+        report = self.client.get('/api/inventory-items/report/').data
+        self.assertEqual(report['totals']['missing_quantity'], 1)
+
+    def test_movement_history_streams_as_csv(self):
+        response = self.client.get('/api/inventory-movements/export/?movement_type=assignment')
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:5], ['id', 'created_at', 'item', 'movement_type', 'quantity'])
+        self.assertEqual([row[2:6] for row in rows[1:]], [['Helmet', 'assignment', '2', 'Report XI']])
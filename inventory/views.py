@@ -1,25 +1,169 @@
-from rest_framework import viewsets
-from .models import InventoryCategory, InventoryItem, ItemAssignment, Sale
+from django.db import transaction
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from cricket_club.exports import streaming_csv_response
+from cricket_club.filters import QueryParamFilterMixin, choice, parse_date, start_of_day, start_of_next_day
+from .models import InventoryCategory, InventoryItem, InventoryMovement, ItemAssignment, Sale
+from .reports import MOVEMENT_EXPORT_HEADER, get_stock_report, movement_export_rows
 from .serializers import (
     InventoryCategorySerializer,
     InventoryItemSerializer,
+    InventoryMovementSerializer,
     ItemAssignmentSerializer,
     SaleSerializer,
 )
+from .services import (
+    COUNTER_FIELDS,
+    InsufficientStock,
+    Movement,
+    apply_movements,
+    assignment_movement,
+    distribute_kit,
+    sale_movement,
+)
+
+
+def apply_or_reject(movements, user):
+    """Applies ``movements``, turning a stock shortage into a 400 (which also rolls back the request's writes)."""
+    try:
+        return apply_movements(movements, recorded_by=user)
+    except InsufficientStock as exc:
+        raise serializers.ValidationError({"quantity": list(exc.shortages.values())})
 
 
 class InventoryCategoryViewSet(viewsets.ModelViewSet):
     queryset = InventoryCategory.objects.all()
     serializer_class = InventoryCategorySerializer
 
-class InventoryItemViewSet(viewsets.ModelViewSet):
-    queryset = InventoryItem.objects.all()
+class InventoryItemViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
+    queryset = InventoryItem.objects.select_related("category")
     serializer_class = InventoryItemSerializer
+    filter_params = {
+        "category": ("category_id", int),
+        "type": ("type", choice(InventoryItem.TYPE_CHOICES)),
+    }
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        quantity = serializer.validated_data.pop("quantity", 0)
+        item = serializer.save()
+        if quantity:
+            apply_or_reject([Movement(item.pk, "restock", quantity, notes="Opening stock")], self.request.user)
+            item.refresh_from_db(fields=COUNTER_FIELDS)
 
-class ItemAssignmentViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"])
+    def report(self, request):
+        """Stock snapshot and valuation: per item, per category, merchandise revenue and kit per team."""
+        return Response(get_stock_report())
+
+class ItemAssignmentViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = ItemAssignment.objects.all()
     serializer_class = ItemAssignmentSerializer
+    filter_params = {
+        "item": ("item_id", int),
+        "team": ("team_id", int),
+        "date_from": ("date_assigned__gte", parse_date),
+        "date_to": ("date_assigned__lte", parse_date),
+    }
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        assignment = serializer.save()
+        apply_or_reject([assignment_movement(assignment)], self.request.user)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        before = assignment_movement(serializer.instance, "return")
+        assignment = serializer.save()
+        after = assignment_movement(assignment)
+        if (before.item_id, before.quantity) != (after.item_id, after.quantity):
+            apply_or_reject([before, after], self.request.user)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        apply_or_reject([assignment_movement(instance, "return")], self.request.user)
+        instance.delete()
 
-class SaleViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Records a kit-distribution sheet (a list of assignments) all-or-nothing."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            assignments = distribute_kit(serializer.validated_data, recorded_by=request.user)
+        except InsufficientStock as exc:
+            raise serializers.ValidationError({"quantity": list(exc.shortages.values())})
+        return Response(self.get_serializer(assignments, many=True).data, status=status.HTTP_201_CREATED)
+
+class SaleViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
+    filter_params = {
+        "item": ("item_id", int),
+        "player": ("player_id", int),
+        "date_from": ("sale_date__gte", parse_date),
+        "date_to": ("sale_date__lte", parse_date),
+    }
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        sale = serializer.save()
+        apply_or_reject([sale_movement(sale)], self.request.user)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        before = sale_movement(serializer.instance, "return")
+        sale = serializer.save()
+        after = sale_movement(sale)
+        if (before.item_id, before.quantity) != (after.item_id, after.quantity):
+            apply_or_reject([before, after], self.request.user)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        apply_or_reject([sale_movement(instance, "return")], self.request.user)
+        instance.delete()
+
+class InventoryMovementViewSet(
+    QueryParamFilterMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """The stock ledger. Restocks, returns and losses are posted here; sales and assignments log themselves."""
+
+    queryset = InventoryMovement.objects.all()
+    serializer_class = InventoryMovementSerializer
+    filter_params = {
+        "item": ("item_id", int),
+        "movement_type": ("movement_type", choice(InventoryMovement.MOVEMENT_TYPE_CHOICES)),
+        "team": ("team_id", int),
+        "date_from": ("created_at__gte", start_of_day),
+        "date_to": ("created_at__lt", start_of_next_day),
+    }
+    filter_actions = ("list", "export")
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """The (filtered) ledger as a CSV download, streamed row by row."""
+        return streaming_csv_response(
+            "inventory-movements.csv",
+            MOVEMENT_EXPORT_HEADER,
+            movement_export_rows(self.filter_queryset(self.get_queryset())),
+        )
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        movement = Movement(
+            item_id=data["item"].pk,
+            movement_type=data["movement_type"],
+            quantity=data["quantity"],
+            team_id=data["team"].pk if data.get("team") else None,
+            player_id=data["player"].pk if data.get("player") else None,
+            notes=data.get("notes", ""),
+        )
+        [entry] = apply_or_reject([movement], request.user)
+        return Response(self.get_serializer(entry).data, status=status.HTTP_201_CREATED)
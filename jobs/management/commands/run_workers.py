@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.services import (
+    claim_next_job,
+    enqueue_scheduled_jobs,
+    requeue_stale_jobs,
+    run_job,
+    run_pending_jobs,
+    warm_workers,
+)
+
+
+def _work(worker_name, poll_interval):
+    connections.close_all()
+    warm_workers()
+    while True:
+        close_old_connections()
+        requeue_stale_jobs()
+        enqueue_scheduled_jobs()
+        job = claim_next_job(worker_name)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+
+
+class Command(BaseCommand):
+    help = 'Runs background job workers against the database-backed job queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker processes.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--burst', action='store_true', help='Run every due job once in this process, then exit.')
+
+    def handle(self, *args, **options):
+        base_name = f"{socket.gethostname()}:{os.getpid()}"
+
+        if options['burst']:
+            enqueue_scheduled_jobs()
+            processed = run_pending_jobs(worker_name=base_name)
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s).'))
+            return
+
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=_work,
+                args=(f"{base_name}-{index}", options['poll_interval']),
+                daemon=True,
+            )
+            for index in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {len(processes)} worker process(es).'))
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
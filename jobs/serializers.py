@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "name",
+            "payload",
+            "status",
+            "attempts",
+            "max_attempts",
+            "run_after",
+            "result",
+            "last_error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get("request")
+        if data["last_error"] and not (request and request.user.is_staff):
+            # Tracebacks are for staff; the job's owner gets the final "Error: message" line.
+            data["last_error"] = data["last_error"].strip().splitlines()[-1]
+        return data
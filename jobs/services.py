@@ -0,0 +1,244 @@
+import logging
+import threading
+import traceback
+from datetime import datetime, time, timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+STALE_LOCK_SECONDS = 15 * 60
+# Running jobs refresh ``locked_at`` this often, so only a dead worker's lock goes stale.
+HEARTBEAT_SECONDS = 60
+CLAIM_CANDIDATES = 10
+
+_handlers: Dict[str, Callable] = {}
+_boot_hooks: List[Callable] = []
+_daily_schedules: Dict[str, time] = {}
+# The latest run each schedule was queued for in this process, to skip the INSERT attempt.
+_queued_runs: Dict[str, str] = {}
+
+
+class RetryLater(Exception):
+    """Raised by a handler whose work is not finished yet, e.g. a pending payment."""
+
+
+def register(name: str):
+    """Registers the decorated function as the handler for jobs called ``name``."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def on_worker_boot(func):
+    """Registers a warm-up callable that every worker process runs before claiming jobs."""
+    _boot_hooks.append(func)
+    return func
+
+
+def warm_workers() -> None:
+    for hook in _boot_hooks:
+        try:
+            hook()
+        except Exception:
+            logger.exception("Worker boot hook %s failed.", getattr(hook, "__name__", hook))
+
+
+def schedule_daily(name: str, at: time) -> None:
+    """Runs the ``name`` job once a day at ``at``, local time. Workers queue each run; see ``enqueue_scheduled_jobs``."""
+    _daily_schedules[name] = at
+
+
+def _latest_run(at: time, now: datetime) -> datetime:
+    local_now = timezone.localtime(now)
+    run = local_now.replace(hour=at.hour, minute=at.minute, second=0, microsecond=0)
+    return run if run <= local_now else run - timedelta(days=1)
+
+
+def enqueue_scheduled_jobs(now: Optional[datetime] = None) -> int:
+    """
+    Queues the latest due run of every daily schedule, unless it was queued
+    already. Each run carries a unique ``schedule_key``, so any number of
+    workers queue it exactly once, and a run missed while no worker was up is
+    queued by the next one to start.
+    """
+    now = now or timezone.now()
+    queued = 0
+    for name, at in _daily_schedules.items():
+        run = _latest_run(at, now)
+        key = f"{name}@{run.isoformat()}"
+        if _queued_runs.get(name) == key:
+            continue
+        try:
+            with transaction.atomic():
+                Job.objects.create(name=name, run_after=run, schedule_key=key)
+            queued += 1
+        except IntegrityError:
+            pass
+        _queued_runs[name] = key
+    return queued
+
+
+def get_handler(name: str) -> Optional[Callable]:
+    return _handlers.get(name)
+
+
+def enqueue(name: str, payload: Optional[dict] = None, *, delay: Optional[timedelta] = None, max_attempts: int = 5, requested_by=None) -> Job:
+    if name not in _handlers:
+        raise ValueError(f"No job handler registered for '{name}'.")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts,
+        requested_by=requested_by,
+    )
+
+
+def enqueue_on_commit(name: str, payload: Optional[dict] = None, **kwargs) -> None:
+    """Enqueues once the surrounding transaction commits, so workers see its rows."""
+    transaction.on_commit(lambda: enqueue(name, payload, **kwargs))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS))
+
+
+def claim_next_job(worker_name: str) -> Optional[Job]:
+    """
+    Claims the oldest due job. The claim is a conditional UPDATE on the queued
+    status, so concurrent workers never run the same job and no row locks or
+    broker are needed.
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        Job.objects.filter(status=Job.STATUS_QUEUED, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:CLAIM_CANDIDATES]
+    )
+    for job_id in candidate_ids:
+        claimed = Job.objects.filter(id=job_id, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING,
+            locked_at=now,
+            locked_by=worker_name,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def refresh_job_lock(job: Job) -> int:
+    """Marks ``job`` as still alive, provided the same worker still holds it."""
+    return Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING, locked_by=job.locked_by).update(
+        locked_at=timezone.now()
+    )
+
+
+class _Heartbeat:
+    """Calls ``refresh_job_lock`` every ``HEARTBEAT_SECONDS`` from a background thread while a job runs."""
+
+    def __init__(self, job: Job):
+        self.job = job
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"job-heartbeat-{job.pk}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self):
+        try:
+            while not self._stopped.wait(HEARTBEAT_SECONDS):
+                try:
+                    refresh_job_lock(self.job)
+                except Exception:
+                    logger.exception("Heartbeat for job %s #%s failed.", self.job.name, self.job.pk)
+        finally:
+            connection.close()
+
+
+def run_job(job: Job) -> Job:
+    handler = get_handler(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No job handler registered for '{job.name}'.")
+        with _Heartbeat(job):
+            result = handler(**job.payload)
+    except Exception as exc:
+        _record_failure(job, exc)
+    else:
+        job.status = Job.STATUS_SUCCEEDED
+        job.result = result
+        job.last_error = ""
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "result", "last_error", "finished_at", "updated_at"])
+    return job
+
+
+def _record_failure(job: Job, exc: Exception) -> None:
+    permanent = isinstance(exc, LookupError) or job.attempts >= job.max_attempts
+    if isinstance(exc, RetryLater):
+        job.last_error = str(exc)
+    else:
+        logger.exception("Job %s #%s failed (attempt %s).", job.name, job.pk, job.attempts)
+        job.last_error = traceback.format_exc()
+    if permanent:
+        job.status = Job.STATUS_FAILED
+        job.finished_at = timezone.now()
+    else:
+        job.status = Job.STATUS_QUEUED
+        job.run_after = timezone.now() + retry_delay(job.attempts)
+    job.locked_at = None
+    job.locked_by = ""
+    job.save(update_fields=["status", "last_error", "finished_at", "run_after", "locked_at", "locked_by", "updated_at"])
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Returns jobs whose worker died mid-run (no heartbeat for
+    ``STALE_LOCK_SECONDS``) to the queue. A job that has used up its attempts
+    fails instead, so one that keeps killing its worker is not retried forever.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=STALE_LOCK_SECONDS))
+    exhausted = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.STATUS_FAILED,
+        last_error="Worker lost while running the job.",
+        finished_at=now,
+        locked_at=None,
+        locked_by="",
+    )
+    if exhausted:
+        logger.error("Failed %s job(s) whose worker was lost on their last attempt.", exhausted)
+    return stale.update(
+        status=Job.STATUS_QUEUED,
+        locked_at=None,
+        locked_by="",
+        run_after=now,
+    )
+
+
+def run_pending_jobs(worker_name: str = "inline", limit: Optional[int] = None) -> int:
+    """Drains due jobs in the current process; used by ``run_workers --burst`` and tests."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job(worker_name)
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,237 @@
+import threading
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import Job
+from .services import (
+    RetryLater,
+    claim_next_job,
+    enqueue,
+    enqueue_scheduled_jobs,
+    refresh_job_lock,
+    register,
+    requeue_stale_jobs,
+    retry_delay,
+    run_pending_jobs,
+    schedule_daily,
+)
+
+calls = []
+
+
+@register("tests.echo")
+def echo_job(value):
+    calls.append(value)
+    return {"value": value}
+
+
+@register("tests.flaky")
+def flaky_job():
+    raise RetryLater("not yet")
+
+
+@register("tests.broken")
+def broken_job():
+    raise ValueError("boom")
+
+
+@register("tests.slow")
+def slow_job():
+    heartbeat_seen.wait(1)
+    return {"heartbeat": heartbeat_seen.is_set()}
+
+
+heartbeat_seen = threading.Event()
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_rejects_unknown_handlers(self):
+        with self.assertRaises(ValueError):
+            enqueue("tests.missing")
+
+    def test_due_jobs_run_and_store_their_result(self):
+        job = enqueue("tests.echo", {"value": 3})
+        later = enqueue("tests.echo", {"value": 4}, delay=timedelta(hours=1))
+
+        self.assertEqual(run_pending_jobs(), 1)
+
+        job.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {"value": 3})
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(later.status, Job.STATUS_QUEUED)
+        self.assertEqual(calls, [3])
+
+    def test_claimed_job_is_not_handed_to_a_second_worker(self):
+        enqueue("tests.echo", {"value": 1})
+
+        first = claim_next_job("worker-a")
+        second = claim_next_job("worker-b")
+
+        self.assertEqual(first.status, Job.STATUS_RUNNING)
+        self.assertEqual(first.locked_by, "worker-a")
+        self.assertIsNone(second)
+
+    def test_failures_back_off_exponentially_then_give_up(self):
+        job = enqueue("tests.broken", max_attempts=2)
+
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertIn("boom", job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + retry_delay(1) - timedelta(seconds=5))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_retry_later_requeues_without_traceback(self):
+        job = enqueue("tests.flaky")
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertEqual(job.last_error, "not yet")
+        self.assertEqual(retry_delay(2), 2 * retry_delay(1))
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = enqueue("tests.echo", {"value": 1})
+        claim_next_job("dead-worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+
+    def test_stale_jobs_on_their_last_attempt_fail(self):
+        lost = enqueue("tests.echo", {"value": 1}, max_attempts=1)
+        retried = enqueue("tests.echo", {"value": 2}, max_attempts=2)
+        claim_next_job("dead-worker")
+        claim_next_job("dead-worker")
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        lost.refresh_from_db()
+        retried.refresh_from_db()
+        self.assertEqual((lost.status, lost.last_error, lost.locked_by), (Job.STATUS_FAILED, "Worker lost while running the job.", ""))
+        self.assertIsNotNone(lost.finished_at)
+        self.assertEqual(retried.status, Job.STATUS_QUEUED)
+
+    def test_heartbeat_keeps_long_running_jobs_claimed(self):
+        job = enqueue("tests.echo", {"value": 1})
+        job = claim_next_job("live-worker")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(refresh_job_lock(job), 1)
+        self.assertEqual(requeue_stale_jobs(), 0)
+
+        # A lock taken over by another worker is not refreshed by the old one.
+        Job.objects.filter(pk=job.pk).update(locked_by="other-worker")
+        self.assertEqual(refresh_job_lock(job), 0)
+
+    def test_running_jobs_beat_from_a_background_thread(self):
+        heartbeat_seen.clear()
+        enqueue("tests.slow")
+        with mock.patch("jobs.services.HEARTBEAT_SECONDS", 0.01), mock.patch(
+            "jobs.services.refresh_job_lock", side_effect=lambda job: heartbeat_seen.set()
+        ):
+            run_pending_jobs()
+        self.assertEqual(Job.objects.get().result, {"heartbeat": True})
+
+    def test_daily_schedules_queue_each_run_once(self):
+        with mock.patch.dict("jobs.services._daily_schedules", clear=True), mock.patch.dict(
+            "jobs.services._queued_runs", clear=True
+        ):
+            schedule_daily("tests.echo", at=time(2, 0))
+            night = timezone.make_aware(datetime(2026, 3, 10, 1, 0))
+
+            self.assertEqual(enqueue_scheduled_jobs(night), 1)
+            # Another worker process, without this one's memo, hits the unique key.
+            with mock.patch.dict("jobs.services._queued_runs", clear=True):
+                self.assertEqual(enqueue_scheduled_jobs(night), 0)
+            self.assertEqual(enqueue_scheduled_jobs(night + timedelta(hours=2)), 1)
+
+        runs = list(Job.objects.order_by("run_after").values_list("run_after", flat=True))
+        self.assertEqual(
+            [timezone.localtime(run).replace(tzinfo=None) for run in runs],
+            [datetime(2026, 3, 9, 2, 0), datetime(2026, 3, 10, 2, 0)],
+        )
+
+    def test_run_workers_burst_drains_the_queue(self):
+        enqueue("tests.echo", {"value": 1})
+        enqueue("tests.echo", {"value": 2})
+
+        call_command("run_workers", "--burst", stdout=StringIO())
+
+        self.assertEqual(sorted(calls), [1, 2])
+        self.assertFalse(Job.objects.exclude(status=Job.STATUS_SUCCEEDED).exists())
+
+
+class JobStatusApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        User = get_user_model()
+        self.admin_user = User.objects.create_user(phone_number="9000000001", password="password", is_staff=True)
+        self.member = User.objects.create_user(phone_number="9000000002", password="password")
+        self.own_job = enqueue("tests.echo", {"value": 1}, requested_by=self.member)
+        self.other_job = enqueue("tests.echo", {"value": 2}, requested_by=self.admin_user)
+
+    def test_members_only_see_their_own_jobs(self):
+        self.client.force_authenticate(user=self.member)
+        response = self.client.get("/api/jobs/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["id"] for job in response.data["results"]], [self.own_job.id])
+
+        response = self.client.get(f"/api/jobs/{self.other_job.id}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_members_get_an_error_summary_not_the_traceback(self):
+        failed = enqueue("tests.broken", max_attempts=1, requested_by=self.member)
+        run_pending_jobs()
+
+        self.client.force_authenticate(user=self.member)
+        self.assertEqual(self.client.get(f"/api/jobs/{failed.id}/").data["last_error"], "ValueError: boom")
+
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertIn("Traceback", self.client.get(f"/api/jobs/{failed.id}/").data["last_error"])
+
+    def test_staff_see_all_jobs(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get("/api/jobs/")
+        self.assertEqual([job["id"] for job in response.data["results"]], [self.other_job.id, self.own_job.id])
+
+        response = self.client.get("/api/jobs/", {"status": "succeeded"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_background_billing_returns_job_id(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(
+            "/api/financials/generate-monthly-invoices/",
+            {"billing_date": "2026-03-01", "background": True},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        job = Job.objects.get(pk=response.data["job_id"])
+        self.assertEqual(job.payload, {"billing_date": "2026-03-01"})
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result["due_date"], "2026-03-10")
+        self.assertEqual(job.result["created_invoices"], 0)
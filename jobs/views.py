@@ -0,0 +1,23 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from cricket_club.filters import QueryParamFilterMixin, choice
+from cricket_club.pagination import NewestFirstCursorPagination
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(QueryParamFilterMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
+    filter_params = {
+        "status": ("status", choice(Job.STATUS_CHOICES)),
+        "name": ("name", str),
+    }
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return self.queryset
+        return self.queryset.filter(requested_by=user)
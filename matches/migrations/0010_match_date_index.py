@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("matches", "0009_match_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="match",
+            name="date",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
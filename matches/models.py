@@ -38,7 +38,7 @@ class Match(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="scheduled")
     match_type = models.CharField(max_length=20, choices=MATCH_TYPE_CHOICES, default="friendly")
     tournament = models.ForeignKey(Tournament, on_delete=models.SET_NULL, null=True, blank=True, related_name="matches")
-    date = models.DateTimeField()
+    date = models.DateTimeField(db_index=True)
     match_format = models.CharField(max_length=20, choices=MATCH_FORMAT_CHOICES, null=True, blank=True)
     overs_per_side = models.PositiveSmallIntegerField(null=True, blank=True)
     ball_type = models.CharField(max_length=20, choices=BALL_TYPE_CHOICES, null=True, blank=True)
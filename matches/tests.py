@@ -1,4 +1,5 @@
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 from .models import Match
 from .serializers import MatchSerializer
@@ -226,3 +227,25 @@ class MatchSerializerTest(TestCase):
         )
         serializer = MatchSerializer(instance=match)
         self.assertEqual(serializer.data['result_summary'], 'Team Four won by 8 balls')
+
+
+class MatchListFilterTests(TestCase):
+    def setUp(self):
+        self.home = Team.objects.create(name="Home XI")
+        self.away = Team.objects.create(name="Away XI")
+        self.bystander = Team.objects.create(name="Bystanders")
+        base = timezone.make_aware(datetime.datetime(2026, 5, 1, 9, 0))
+        self.may_first = Match.objects.create(team1=self.home, team2=self.away, date=base)
+        self.may_second = Match.objects.create(team1=self.away, external_opponent="Visitors", date=base + datetime.timedelta(days=1, hours=14))
+        Match.objects.create(team1=self.bystander, external_opponent="Visitors", date=base + datetime.timedelta(days=1), status="completed")
+
+    def test_date_range_is_inclusive_of_whole_days(self):
+        response = self.client.get("/api/matches/", {"date_from": "2026-05-02", "date_to": "2026-05-02", "status": "scheduled"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.may_second.id])
+
+    def test_team_filter_matches_either_side(self):
+        response = self.client.get("/api/matches/", {"team": self.away.id})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.may_first.id, self.may_second.id])
+
+        response = self.client.get("/api/matches/", {"team": "abc"})
+        self.assertEqual(response.status_code, 400)
@@ -1,11 +1,36 @@
+from django.db.models import Q
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from cricket_club.cache import CachedListMixin, ConditionalGetMixin
+from cricket_club.filters import QueryParamFilterMixin, choice, start_of_day, start_of_next_day
+from teams.models import Team
 from .models import Match, Lineup
 from .serializers import MatchSerializer, LineupSerializer
 
-class MatchViewSet(viewsets.ModelViewSet):
+class MatchViewSet(ConditionalGetMixin, CachedListMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Match.objects.all()
     serializer_class = MatchSerializer
+    # result_summary reads team names.
+    cache_models = (Match, Team)
+    filter_params = {
+        "status": ("status", choice(Match.STATUS_CHOICES)),
+        "match_type": ("match_type", choice(Match.MATCH_TYPE_CHOICES)),
+        "result": ("result", choice(Match.RESULT_CHOICES)),
+        "tournament": ("tournament_id", int),
+        "ground": ("ground_id", int),
+        "date_from": ("date__gte", start_of_day),
+        "date_to": ("date__lt", start_of_next_day),
+    }
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        team_id = self.request.query_params.get("team")
+        if self.action == "list" and team_id:
+            if not team_id.isdigit():
+                raise ValidationError({"team": f"Invalid value '{team_id}'."})
+            queryset = queryset.filter(Q(team1_id=team_id) | Q(team2_id=team_id))
+        return queryset
 
     def get_permissions(self):
         if self.action in ("list", "retrieve"):
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MediaGalleryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "media_gallery"
+
+    def ready(self):
+        import media_gallery.signals
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from media_gallery.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes resumable media uploads that were abandoned before completion.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Purge uploads untouched for this many hours.')
+
+    def handle(self, *args, **options):
+        purged = purge_stale_uploads(max_age_hours=options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} abandoned upload(s).'))
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media_gallery", "0003_media_uploaded_by"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="media",
+            name="uploaded_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media_gallery", "0004_media_uploaded_at_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="media",
+            name="width",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="height",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="image_format",
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name="media",
+            name="exif_orientation",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_approved_counts(apps, schema_editor):
+    Media = apps.get_model("media_gallery", "Media")
+    MediaTypeCount = apps.get_model("media_gallery", "MediaTypeCount")
+    counts = dict(
+        Media.objects.filter(is_approved=True).values_list("media_type").annotate(total=Count("id")).order_by()
+    )
+    MediaTypeCount.objects.bulk_create(
+        [
+            MediaTypeCount(media_type=media_type, approved_count=counts.get(media_type, 0))
+            for media_type in ("photo", "video", "other")
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media_gallery", "0006_mediaupload"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(fields=["is_approved", "uploaded_at", "id"], name="media_feed_idx"),
+        ),
+        migrations.CreateModel(
+            name="MediaTypeCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "media_type",
+                    models.CharField(
+                        choices=[("photo", "Photo"), ("video", "Video"), ("other", "Other")],
+                        max_length=10,
+                        unique=True,
+                    ),
+                ),
+                ("approved_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_approved_counts, migrations.RunPython.noop),
+    ]
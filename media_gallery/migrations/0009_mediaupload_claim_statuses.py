@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media_gallery", "0008_media_rejection_fields"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mediaupload",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("uploading", "Uploading"),
+                    ("receiving", "Receiving"),
+                    ("completing", "Completing"),
+                    ("complete", "Complete"),
+                ],
+                default="uploading",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import os
+
 from django.db import models
 from django.conf import settings
 
@@ -28,7 +30,83 @@ class Media(models.Model):
         blank=True,
         related_name="approved_media_items",
     )
-    uploaded_at = models.DateTimeField(auto_now_add=True)
+    rejected_at = models.DateTimeField(null=True, blank=True)
+    rejected_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="rejected_media_items",
+    )
+    uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Captured from the upload's header when it is validated; width and height
+    # are as displayed, i.e. after the EXIF orientation is applied.
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    image_format = models.CharField(max_length=10, blank=True)
+    exif_orientation = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves the gallery feed: approved rows, newest first, keyset-paginated on (uploaded_at, id).
+            models.Index(fields=["is_approved", "uploaded_at", "id"], name="media_feed_idx"),
+        ]
 
     def __str__(self):
         return self.title or self.file.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "is_approved" in field_names and "media_type" in field_names:
+            instance._stored_counted_type = instance.counted_type
+        return instance
+
+    @property
+    def counted_type(self):
+        """The ``MediaTypeCount`` row this item adds to; None while it is unapproved."""
+        return self.media_type if self.is_approved else None
+
+
+class MediaTypeCount(models.Model):
+    """Approved media per type, kept current on approval and deletion so totals never count the gallery."""
+
+    media_type = models.CharField(max_length=10, choices=Media.MEDIA_TYPE_CHOICES, unique=True)
+    approved_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.media_type}: {self.approved_count}"
+
+
+class MediaUpload(models.Model):
+    """A resumable upload in progress; its bytes live in ``part_path`` until it is completed."""
+
+    STATUS_CHOICES = [
+        ("uploading", "Uploading"),
+        # A chunk, or the final move into storage, is being written by one request.
+        ("receiving", "Receiving"),
+        ("completing", "Completing"),
+        ("complete", "Complete"),
+    ]
+
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="media_uploads",
+    )
+    title = models.CharField(max_length=100, blank=True)
+    media_type = models.CharField(max_length=10, choices=Media.MEDIA_TYPE_CHOICES)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="uploading")
+    media = models.OneToOneField(Media, on_delete=models.SET_NULL, null=True, blank=True, related_name="upload")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def part_path(self):
+        return os.path.join(settings.MEDIA_UPLOAD_TEMP_DIR, f"{self.pk}.part")
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size})"
@@ -1,11 +1,14 @@
 from rest_framework import serializers
+from cricket_club.images import ImageVariantField
 from cricket_club.upload_validators import validate_uploaded_image
-from .models import Media
+from .models import Media, MediaUpload
 
 
 class MediaSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.SerializerMethodField()
     approved_by_name = serializers.SerializerMethodField()
+    thumbnail_url = ImageVariantField("thumbnail", source="file")
+    medium_url = ImageVariantField("medium", source="file")
 
     class Meta:
         model = Media
@@ -13,6 +16,8 @@ class MediaSerializer(serializers.ModelSerializer):
             "id",
             "title",
             "file",
+            "thumbnail_url",
+            "medium_url",
             "media_type",
             "uploaded_by",
             "uploaded_by_name",
@@ -20,7 +25,13 @@ class MediaSerializer(serializers.ModelSerializer):
             "approved_at",
             "approved_by",
             "approved_by_name",
+            "rejected_at",
+            "rejected_by",
             "uploaded_at",
+            "width",
+            "height",
+            "image_format",
+            "exif_orientation",
         ]
         read_only_fields = [
             "uploaded_by",
@@ -29,7 +40,13 @@ class MediaSerializer(serializers.ModelSerializer):
             "approved_at",
             "approved_by",
             "approved_by_name",
+            "rejected_at",
+            "rejected_by",
             "uploaded_at",
+            "width",
+            "height",
+            "image_format",
+            "exif_orientation",
         ]
 
     def validate(self, attrs):
@@ -37,7 +54,13 @@ class MediaSerializer(serializers.ModelSerializer):
         media_type = attrs.get("media_type") or getattr(self.instance, "media_type", None)
         file_obj = attrs.get("file")
         if media_type == "photo" and file_obj:
-            validate_uploaded_image(file_obj)
+            metadata = validate_uploaded_image(file_obj).image_metadata
+            attrs.update(
+                width=metadata["width"],
+                height=metadata["height"],
+                image_format=metadata["format"],
+                exif_orientation=metadata["orientation"],
+            )
         return attrs
 
     def get_uploaded_by_name(self, obj):
@@ -51,3 +74,25 @@ class MediaSerializer(serializers.ModelSerializer):
             return None
         full_name = f"{user.first_name} {user.last_name}".strip()
         return full_name or user.phone_number
+
+
+class MediaUploadSerializer(serializers.ModelSerializer):
+    # Photos are small enough for a single POST to /api/media/, where they are validated and resized.
+    media_type = serializers.ChoiceField(choices=[("video", "Video"), ("other", "Other")])
+
+    class Meta:
+        model = MediaUpload
+        fields = ["id", "title", "media_type", "filename", "total_size", "offset", "status", "media", "created_at"]
+        read_only_fields = ["offset", "status", "media", "created_at"]
+
+
+class MediaModerationSerializer(serializers.Serializer):
+    """Selects media for bulk moderation by ``ids`` or by ``filter`` (the media list's query parameters)."""
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=1000)
+    filter = serializers.DictField(child=serializers.CharField(), required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'.")
+        return attrs
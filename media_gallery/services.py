@@ -0,0 +1,88 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from cricket_club.cache import invalidate_models
+
+from .models import Media, MediaTypeCount
+
+
+def approved_media_counts():
+    """Approved media per type, read from the counter table."""
+    counts = {media_type: 0 for media_type, _label in Media.MEDIA_TYPE_CHOICES}
+    counts.update(MediaTypeCount.objects.values_list("media_type", "approved_count"))
+    return counts
+
+
+def rebuild_approved_counts():
+    """Recounts the counter table from ``Media``; the fallback whenever an increment cannot be applied."""
+    counts = dict(
+        Media.objects.filter(is_approved=True).values_list("media_type").annotate(total=Count("id")).order_by()
+    )
+    for media_type, _label in Media.MEDIA_TYPE_CHOICES:
+        MediaTypeCount.objects.update_or_create(
+            media_type=media_type, defaults={"approved_count": counts.get(media_type, 0)}
+        )
+
+
+def adjust_approved_counts(changes):
+    """
+    Applies ``{media_type: delta}`` to the counter table with ``F()`` updates.
+    Bulk paths that skip model signals call this with the net change of the batch.
+    """
+    for media_type, delta in Counter(changes).items():
+        if not delta or media_type is None:
+            continue
+        updated = MediaTypeCount.objects.filter(media_type=media_type).update(
+            approved_count=F("approved_count") + delta
+        )
+        if not updated:
+            rebuild_approved_counts()
+            return
+
+
+MAX_MODERATION_BATCH = 1000
+
+APPROVED = "approved"
+REJECTED = "rejected"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+
+
+def moderate_media(queryset, *, approve, user, requested_ids=()):
+    """
+    Approves (or rejects) every item of ``queryset`` with a single UPDATE.
+    Returns ``{id: outcome}``, including ``NOT_FOUND`` for ``requested_ids``
+    that matched nothing. The update skips model signals, so the approved
+    counters and the cache are brought up to date here, once per batch.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values_list("id", "media_type", "is_approved", "rejected_at"))
+        if approve:
+            targets = [row for row in rows if not row[2]]
+            changes = {"is_approved": True, "approved_at": now, "approved_by": user, "rejected_at": None, "rejected_by": None}
+            deltas = Counter(media_type for _id, media_type, _approved, _rejected in targets)
+        else:
+            targets = [row for row in rows if row[2] or row[3] is None]
+            changes = {"is_approved": False, "approved_at": None, "approved_by": None, "rejected_at": now, "rejected_by": user}
+            deltas = {
+                media_type: -count
+                for media_type, count in Counter(
+                    media_type for _id, media_type, approved, _rejected in targets if approved
+                ).items()
+            }
+
+        target_ids = [row[0] for row in targets]
+        if target_ids:
+            Media.objects.filter(id__in=target_ids).update(**changes)
+            adjust_approved_counts(deltas)
+            invalidate_models(Media)
+
+    outcome = APPROVED if approve else REJECTED
+    outcomes = {media_id: NOT_FOUND for media_id in requested_ids}
+    outcomes.update({row[0]: UNCHANGED for row in rows})
+    outcomes.update({media_id: outcome for media_id in target_ids})
+    return outcomes
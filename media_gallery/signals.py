@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Media
+from .services import adjust_approved_counts, rebuild_approved_counts
+
+_UNKNOWN = object()
+
+
+@receiver(post_save, sender=Media)
+def count_approval_changes(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance.__dict__.get("_stored_counted_type", _UNKNOWN)
+    current = instance.counted_type
+    if previous is _UNKNOWN:
+        # Loaded with deferred approval fields, so the old state is unknown.
+        rebuild_approved_counts()
+    elif previous != current:
+        adjust_approved_counts({previous: -1, current: 1})
+    instance._stored_counted_type = current
+
+
+@receiver(post_delete, sender=Media)
+def count_deletions(sender, instance, **kwargs):
+    previous = instance.__dict__.get("_stored_counted_type", _UNKNOWN)
+    if previous is _UNKNOWN:
+        rebuild_approved_counts()
+    else:
+        adjust_approved_counts({previous: -1})
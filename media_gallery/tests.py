@@ -1,15 +1,30 @@
+import os
+import tempfile
+from datetime import timedelta
 from io import BytesIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from PIL import Image
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from .models import Media
+from cricket_club.images import VARIANT_SIZES, variant_name
+from cricket_club.jobs import RENDER_IMAGE_VARIANTS_JOB
+from jobs.models import Job
+from jobs.services import run_pending_jobs
 
+from .models import Media, MediaUpload
+from .services import approved_media_counts
+from .uploads import CLAIM_TIMEOUT, append_chunk
 
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class MediaApprovalTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -45,7 +60,7 @@ class MediaApprovalTests(TestCase):
         self.client.force_authenticate(user=None)
         list_response = self.client.get("/api/media/")
         self.assertEqual(list_response.status_code, status.HTTP_200_OK)
-        self.assertEqual(list_response.data, [])
+        self.assertEqual(list_response.data["results"], [])
 
     def test_admin_can_approve_media(self):
         user = self.user_model.objects.create_user(phone_number="9000000002", password="password123")
@@ -76,8 +91,8 @@ class MediaApprovalTests(TestCase):
         self.client.force_authenticate(user=None)
         list_response = self.client.get("/api/media/")
         self.assertEqual(list_response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(list_response.data), 1)
-        self.assertEqual(list_response.data[0]["id"], media.id)
+        self.assertEqual(len(list_response.data["results"]), 1)
+        self.assertEqual(list_response.data["results"][0]["id"], media.id)
 
     def test_serializer_returns_uploader_name(self):
         user = self.user_model.objects.create_user(
@@ -98,3 +113,317 @@ class MediaApprovalTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["uploaded_by"], user.id)
         self.assertEqual(response.data["uploaded_by_name"], "Shubham Singh")
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class MediaVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(phone_number="9000000005", password="password123")
+
+    def _build_test_image(self, name="large.jpg", size=(2000, 1500)):
+        buffer = BytesIO()
+        Image.new("RGB", size, color="teal").save(buffer, format="JPEG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+    def test_upload_writes_webp_variants(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            "/api/media/",
+            {"title": "Wide", "media_type": "photo", "file": self._build_test_image()},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        media = Media.objects.get(id=response.data["id"])
+        self.assertEqual((media.width, media.height, media.image_format, media.exif_orientation), (2000, 1500, "JPEG", 1))
+        for variant, edge in VARIANT_SIZES.items():
+            name = variant_name(media.file.name, variant)
+            self.assertTrue(default_storage.exists(name))
+            with default_storage.open(name) as handle, Image.open(handle) as rendered:
+                self.assertEqual(rendered.format, "WEBP")
+                self.assertEqual(rendered.size, (edge, edge * 3 // 4))
+        self.assertTrue(response.data["thumbnail_url"].endswith("/thumbnail.webp"))
+        self.assertTrue(response.data["medium_url"].endswith("/medium.webp"))
+
+    def _legacy_media(self, content):
+        media = Media(title="Legacy", media_type="photo", is_approved=True)
+        media.file.save("legacy.jpg", content, save=False)
+        Media.objects.bulk_create([media])
+        return media
+
+    def test_variants_missing_from_older_uploads_are_rendered_by_a_job(self):
+        media = self._legacy_media(self._build_test_image())
+        thumbnail = variant_name(media.file.name, "thumbnail")
+
+        first = self.client.get("/api/media/")
+        self.assertTrue(first.data["results"][0]["thumbnail_url"].endswith(media.file.url))
+        self.assertFalse(default_storage.exists(thumbnail))
+        self.assertEqual(Job.objects.filter(name=RENDER_IMAGE_VARIANTS_JOB).count(), 1)
+
+        self.client.get(f"/api/media/{media.id}/")
+        self.assertEqual(Job.objects.filter(name=RENDER_IMAGE_VARIANTS_JOB).count(), 1)
+
+        run_pending_jobs()
+        self.assertTrue(default_storage.exists(thumbnail))
+        detail = self.client.get(f"/api/media/{media.id}/")
+        self.assertTrue(detail.data["thumbnail_url"].endswith("/thumbnail.webp"))
+
+    def test_unreadable_images_are_not_decoded_again(self):
+        media = self._legacy_media(SimpleUploadedFile("legacy.jpg", b"not an image", content_type="image/jpeg"))
+        self.client.get(f"/api/media/{media.id}/")
+        run_pending_jobs()
+
+        with mock.patch("cricket_club.images.enqueue") as queued:
+            response = self.client.get(f"/api/media/{media.id}/")
+        self.assertTrue(response.data["thumbnail_url"].endswith(media.file.url))
+        queued.assert_not_called()
+
+    def test_replacing_or_deleting_the_image_removes_its_variants(self):
+        media = Media.objects.create(title="Swap", media_type="photo", file=self._build_test_image("first.jpg"))
+        media = Media.objects.get(pk=media.pk)
+        old_thumbnail = variant_name(media.file.name, "thumbnail")
+        self.assertTrue(default_storage.exists(old_thumbnail))
+
+        media.file = self._build_test_image("second.jpg")
+        with self.captureOnCommitCallbacks(execute=True):
+            media.save()
+        new_thumbnail = variant_name(media.file.name, "thumbnail")
+        self.assertFalse(default_storage.exists(old_thumbnail))
+        self.assertTrue(default_storage.exists(new_thumbnail))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Media.objects.get(pk=media.pk).delete()
+        self.assertFalse(default_storage.exists(new_thumbnail))
+
+    def test_non_image_media_has_no_variants(self):
+        media = Media.objects.create(
+            title="Clip",
+            media_type="video",
+            file=SimpleUploadedFile("clip.mp4", b"\x00\x00\x00\x18ftypmp42", content_type="video/mp4"),
+            is_approved=True,
+        )
+
+        response = self.client.get(f"/api/media/{media.id}/")
+
+        self.assertIsNone(response.data["thumbnail_url"])
+        self.assertFalse(default_storage.exists(variant_name(media.file.name, "thumbnail")))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MEDIA_UPLOAD_TEMP_DIR=tempfile.mkdtemp())
+class ResumableUploadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(phone_number="9000000006", password="password123")
+        self.client.force_authenticate(user=self.user)
+        self.payload = bytes(range(256)) * 1000
+
+    def _start(self, **overrides):
+        data = {"filename": "final.mp4", "total_size": len(self.payload), "media_type": "video", "title": "Final"}
+        data.update(overrides)
+        return self.client.post("/api/media-uploads/", data, format="json")
+
+    def _append(self, upload_id, offset, chunk):
+        return self.client.generic(
+            "PATCH",
+            f"/api/media-uploads/{upload_id}/",
+            chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunks_resume_from_the_last_received_offset(self):
+        upload_id = self._start().data["id"]
+
+        self.assertEqual(self._append(upload_id, 0, self.payload[:100000]).data["offset"], 100000)
+        # A retried chunk at a stale offset is refused with the offset to resume from.
+        stale = self._append(upload_id, 0, self.payload[:100000])
+        self.assertEqual(stale.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(stale.data["offset"], 100000)
+        self.assertEqual(self.client.get(f"/api/media-uploads/{upload_id}/").data["offset"], 100000)
+
+        early = self.client.post(f"/api/media-uploads/{upload_id}/complete/")
+        self.assertEqual(early.status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(self._append(upload_id, 100000, self.payload[100000:]).data["offset"], len(self.payload))
+        completed = self.client.post(f"/api/media-uploads/{upload_id}/complete/")
+
+        self.assertEqual(completed.status_code, status.HTTP_201_CREATED)
+        media = Media.objects.get(id=completed.data["id"])
+        self.assertFalse(media.is_approved)
+        self.assertEqual(media.uploaded_by, self.user)
+        self.assertEqual(media.media_type, "video")
+        with media.file.open("rb") as handle:
+            self.assertEqual(handle.read(), self.payload)
+        self.assertFalse(os.path.exists(MediaUpload.objects.get(id=upload_id).part_path))
+
+    def test_chunk_in_flight_refuses_a_concurrent_retry_without_blocking(self):
+        upload_id = self._start().data["id"]
+        retried = {}
+
+        class RetryingStream(BytesIO):
+            # Sends the same chunk again while the first request is still streaming its body.
+            def read(inner, size=-1):
+                if not retried:
+                    retried["response"] = self._append(upload_id, 0, self.payload[:1000])
+                return BytesIO.read(inner, size)
+
+        upload = append_chunk(upload_id, 0, RetryingStream(self.payload[:1000]), 1000)
+
+        self.assertEqual(retried["response"].status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(retried["response"].data["offset"], 0)
+        self.assertEqual((upload.offset, upload.status), (1000, "uploading"))
+
+    def test_abandoned_claims_are_taken_over(self):
+        upload_id = self._start().data["id"]
+        MediaUpload.objects.filter(pk=upload_id).update(
+            status="receiving", updated_at=timezone.now() - CLAIM_TIMEOUT - timedelta(seconds=1)
+        )
+        self.assertEqual(self._append(upload_id, 0, self.payload[:10]).data["offset"], 10)
+
+    def test_chunk_past_declared_size_is_rejected(self):
+        upload_id = self._start(total_size=10).data["id"]
+        response = self._append(upload_id, 0, b"x" * 11)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["offset"], 0)
+
+    def test_photos_use_the_single_request_endpoint(self):
+        self.assertEqual(self._start(media_type="photo").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_uploads_are_private_to_their_owner(self):
+        upload_id = self._start().data["id"]
+        other = get_user_model().objects.create_user(phone_number="9000000007", password="password123")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self._append(upload_id, 0, b"x").status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MediaFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.uploader = get_user_model().objects.create_user(phone_number="9000000008", password="password123")
+
+    def _media(self, name, media_type="video", is_approved=True):
+        return Media.objects.create(
+            title=name,
+            file=f"media_uploads/{name}.mp4",
+            media_type=media_type,
+            uploaded_by=self.uploader,
+            approved_by=self.uploader if is_approved else None,
+            is_approved=is_approved,
+        )
+
+    def test_feed_pages_newest_approved_first_in_constant_queries(self):
+        created = [self._media(f"clip-{index}") for index in range(5)]
+        self._media("pending", is_approved=False)
+
+        with self.assertNumQueries(2):
+            first = self.client.get("/api/media/feed/?page_size=3")
+        second = self.client.get(first.data["next"])
+
+        ids = [item["id"] for item in first.data["results"] + second.data["results"]]
+        self.assertEqual(ids, [media.id for media in reversed(created)])
+        self.assertEqual(first.data["results"][0]["uploaded_by_name"], "9000000008")
+        self.assertEqual(first.data["approved_counts"], {"photo": 0, "video": 5, "other": 0})
+
+    def test_feed_applies_media_type_filter(self):
+        self._media("clip")
+        other = self._media("brochure", media_type="other")
+        response = self.client.get("/api/media/feed/?media_type=other")
+        self.assertEqual([item["id"] for item in response.data["results"]], [other.id])
+
+    def test_counts_follow_approval_type_changes_and_deletes(self):
+        pending = self._media("pending", is_approved=False)
+        approved = self._media("approved")
+        self.assertEqual(approved_media_counts()["video"], 1)
+
+        admin = get_user_model().objects.create_user(phone_number="9000000009", password="password123", is_staff=True)
+        self.client.force_authenticate(user=admin)
+        self.client.post(f"/api/media/{pending.id}/approve/")
+        self.assertEqual(approved_media_counts()["video"], 2)
+
+        approved.media_type = "other"
+        approved.save()
+        self.assertEqual(approved_media_counts(), {"photo": 0, "video": 1, "other": 1})
+
+        Media.objects.filter(pk=pending.pk).delete()
+        Media.objects.only("id").get(pk=approved.pk).delete()
+        self.assertEqual(approved_media_counts(), {"photo": 0, "video": 0, "other": 0})
+
+
+class BulkModerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(
+            phone_number="9000000010", password="password123", is_staff=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def _media(self, name, media_type="video", is_approved=False):
+        return Media.objects.create(
+            title=name, file=f"media_uploads/{name}.mp4", media_type=media_type, is_approved=is_approved
+        )
+
+    def test_bulk_approve_reports_per_id_outcomes(self):
+        pending = [self._media(f"pending-{index}") for index in range(3)]
+        approved = self._media("approved", is_approved=True)
+        ids = [media.id for media in pending] + [approved.id, 999999]
+
+        with self.assertNumQueries(5):
+            response = self.client.post("/api/media/bulk-approve/", {"ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 3)
+        outcomes = {row["id"]: row["outcome"] for row in response.data["results"]}
+        self.assertEqual(outcomes[approved.id], "unchanged")
+        self.assertEqual(outcomes[999999], "not_found")
+        self.assertTrue(all(outcomes[media.id] == "approved" for media in pending))
+        self.assertEqual(Media.objects.filter(is_approved=True, approved_by=self.admin).count(), 3)
+        self.assertEqual(approved_media_counts()["video"], 4)
+
+    def test_bulk_approval_invalidates_cached_lists_once(self):
+        pending = self._media("pending")
+        public = APIClient()
+        self.assertEqual(public.get("/api/media/").data["results"], [])
+
+        self.client.post("/api/media/bulk-approve/", {"ids": [pending.id]}, format="json")
+
+        self.assertEqual([item["id"] for item in public.get("/api/media/").data["results"]], [pending.id])
+
+    def test_bulk_reject_by_filter(self):
+        photo = self._media("photo", media_type="photo", is_approved=True)
+        video = self._media("video", is_approved=True)
+
+        response = self.client.post(
+            "/api/media/bulk-reject/", {"filter": {"media_type": "photo"}}, format="json"
+        )
+
+        self.assertEqual(response.data["results"], [{"id": photo.id, "outcome": "rejected"}])
+        self.assertFalse(response.data["truncated"])
+        photo.refresh_from_db()
+        video.refresh_from_db()
+        self.assertFalse(photo.is_approved)
+        self.assertEqual(photo.rejected_by, self.admin)
+        self.assertTrue(video.is_approved)
+        self.assertEqual(approved_media_counts(), {"photo": 0, "video": 1, "other": 0})
+
+    def test_requires_ids_or_filter_and_admin(self):
+        self.assertEqual(
+            self.client.post("/api/media/bulk-approve/", {}, format="json").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.client.post("/api/media/bulk-reject/", {"filter": {"media_type": "film"}}, format="json").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        member = get_user_model().objects.create_user(phone_number="9000000011", password="password123")
+        self.client.force_authenticate(user=member)
+        self.assertEqual(
+            self.client.post("/api/media/bulk-approve/", {"ids": [1]}, format="json").status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
@@ -0,0 +1,176 @@
+"""
+Resumable media uploads.
+
+A client starts an upload with the file's name and total size, then sends the
+bytes in chunks, each tagged with the offset it starts at. Chunks are streamed
+from the request into a part file (never into memory), so a dropped connection
+only costs the chunk in flight: the client asks for the current offset and
+carries on from there. Completing the upload moves the part file into storage
+as a pending ``Media`` item.
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Media, MediaUpload
+
+STREAM_BLOCK_SIZE = 64 * 1024
+CLAIMED_STATUSES = ("receiving", "completing")
+CLAIM_TIMEOUT = timedelta(minutes=15)
+
+
+class UploadError(Exception):
+    """A request that does not fit the upload's state; ``offset`` tells the client where to resume."""
+
+    def __init__(self, message, offset=None):
+        super().__init__(message)
+        self.offset = offset
+
+
+class _PartFile(File):
+    # Storages move a file that reports a temporary path instead of copying it.
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def start_upload(user, *, filename, total_size, media_type, title=""):
+    if total_size > settings.MEDIA_UPLOAD_MAX_BYTES:
+        raise UploadError(f"Uploads are limited to {settings.MEDIA_UPLOAD_MAX_BYTES} bytes.")
+    upload = MediaUpload.objects.create(
+        uploaded_by=user,
+        filename=os.path.basename(filename),
+        total_size=total_size,
+        media_type=media_type,
+        title=title,
+    )
+    os.makedirs(settings.MEDIA_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(upload.part_path, "wb").close()
+    return upload
+
+
+def _claim(upload_id, claimed_status, **expected):
+    """
+    Moves an idle upload to ``claimed_status`` with one conditional UPDATE, so
+    at most one request works on it at a time and no row lock is held while it
+    does. A claim older than ``CLAIM_TIMEOUT`` belongs to a request that died
+    and may be taken over. Returns the claim time, which the request's final
+    UPDATE must match, or None when the upload is busy or not in the
+    ``expected`` state.
+    """
+    now = timezone.now()
+    idle = Q(status="uploading") | Q(status__in=CLAIMED_STATUSES, updated_at__lt=now - CLAIM_TIMEOUT)
+    claimed = MediaUpload.objects.filter(idle, pk=upload_id, **expected).update(status=claimed_status, updated_at=now)
+    return now if claimed else None
+
+
+def _release(upload_id, claimed_status, claimed_at):
+    MediaUpload.objects.filter(pk=upload_id, status=claimed_status, updated_at=claimed_at).update(
+        status="uploading", updated_at=timezone.now()
+    )
+
+
+def _refusal(upload_id, *, offset=None, total_size=None):
+    """The ``UploadError`` explaining why a claim on ``upload_id`` failed."""
+    upload = MediaUpload.objects.get(pk=upload_id)
+    if upload.status == "complete":
+        return UploadError("Upload is already complete.", upload.offset)
+    if upload.status in CLAIMED_STATUSES:
+        return UploadError("Another request for this upload is still in progress.", upload.offset)
+    if total_size is not None:
+        return UploadError("Upload is missing bytes.", upload.offset)
+    return UploadError("Offset does not match the bytes received so far.", upload.offset)
+
+
+def append_chunk(upload_id, offset, stream, length):
+    """
+    Writes ``length`` bytes read from ``stream`` at ``offset``, which must be
+    the upload's current offset. The upload is claimed before the body is
+    read, so a retry of the same chunk is refused at once instead of
+    interleaving; the body is streamed with no transaction open, and the new
+    offset is committed only by the claim that wrote it. A chunk that is cut
+    short leaves the offset where it was.
+    """
+    upload = MediaUpload.objects.get(pk=upload_id)
+    if offset + length > upload.total_size:
+        raise UploadError("Chunk runs past the declared file size.", upload.offset)
+    claimed_at = _claim(upload_id, "receiving", offset=offset)
+    if claimed_at is None:
+        raise _refusal(upload_id)
+
+    written = 0
+    try:
+        with open(upload.part_path, "r+b") as part:
+            # Anything past the recorded offset is left over from a chunk that failed mid-write.
+            part.seek(offset)
+            while written < length:
+                block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                part.write(block)
+                written += len(block)
+            part.truncate()
+    except BaseException:
+        _release(upload_id, "receiving", claimed_at)
+        raise
+    if written != length:
+        _release(upload_id, "receiving", claimed_at)
+        raise UploadError("Chunk ended before its declared length.", offset)
+
+    committed = MediaUpload.objects.filter(pk=upload_id, status="receiving", updated_at=claimed_at).update(
+        status="uploading", offset=offset + length, updated_at=timezone.now()
+    )
+    if not committed:
+        raise UploadError("Chunk took too long and was superseded.", MediaUpload.objects.get(pk=upload_id).offset)
+    upload.refresh_from_db()
+    return upload
+
+
+def complete_upload(upload_id):
+    """
+    Turns a fully received upload into a pending ``Media`` item. The part file
+    is moved into storage under a claim, outside any transaction; only the
+    rows are written in one.
+    """
+    upload = MediaUpload.objects.get(pk=upload_id)
+    claimed_at = _claim(upload_id, "completing", offset=upload.total_size)
+    if claimed_at is None:
+        raise _refusal(upload_id, total_size=upload.total_size)
+
+    media = Media(
+        title=upload.title,
+        media_type=upload.media_type,
+        uploaded_by=upload.uploaded_by,
+        is_approved=False,
+    )
+    try:
+        with open(upload.part_path, "rb") as part:
+            media.file.save(upload.filename, _PartFile(part), save=False)
+        with transaction.atomic():
+            media.save()
+            finished = MediaUpload.objects.filter(pk=upload_id, status="completing", updated_at=claimed_at).update(
+                status="complete", media=media, updated_at=timezone.now()
+            )
+            if not finished:
+                raise UploadError("Completion took too long and was superseded.", upload.offset)
+    except BaseException:
+        _release(upload_id, "completing", claimed_at)
+        raise
+    if os.path.exists(upload.part_path):
+        os.remove(upload.part_path)
+    return media
+
+
+def purge_stale_uploads(max_age_hours=24):
+    """Deletes unfinished uploads untouched for ``max_age_hours`` along with their part files."""
+    cutoff = timezone.now() - timedelta(hours=max_age_hours)
+    stale = list(MediaUpload.objects.exclude(status="complete").filter(updated_at__lt=cutoff))
+    for upload in stale:
+        if os.path.exists(upload.part_path):
+            os.remove(upload.part_path)
+    MediaUpload.objects.filter(pk__in=[upload.pk for upload in stale]).delete()
+    return len(stale)
@@ -1,27 +1,56 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.utils import timezone
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from .models import Media
-from .serializers import MediaSerializer
+from cricket_club.cache import CachedListMixin, ConditionalGetMixin, conditional_response, get_or_build
+from cricket_club.pagination import IdCursorPagination
+from cricket_club.filters import (
+    QueryParamFilterMixin,
+    apply_filter_params,
+    choice,
+    parse_bool,
+    start_of_day,
+    start_of_next_day,
+)
+from .models import Media, MediaUpload
+from .serializers import MediaModerationSerializer, MediaSerializer, MediaUploadSerializer
+from .services import APPROVED, MAX_MODERATION_BATCH, REJECTED, approved_media_counts, moderate_media
+from .uploads import UploadError, append_chunk, complete_upload, start_upload
 
 
-class MediaViewSet(viewsets.ModelViewSet):
+class MediaCursorPagination(IdCursorPagination):
+    # Cursor on the upload time (indexed); id breaks ties between same-instant uploads.
+    ordering = ("-uploaded_at", "-id")
+
+
+class MediaViewSet(ConditionalGetMixin, CachedListMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Media.objects.all()
     serializer_class = MediaSerializer
+    # Only non-staff lists are cached, and those only contain approved media.
+    cache_models = (Media, get_user_model())
+    pagination_class = MediaCursorPagination
+    filter_params = {
+        "media_type": ("media_type", choice(Media.MEDIA_TYPE_CHOICES)),
+        "uploaded_from": ("uploaded_at__gte", start_of_day),
+        "uploaded_to": ("uploaded_at__lt", start_of_next_day),
+        "is_approved": ("is_approved", parse_bool),
+    }
+    filter_actions = ("list", "feed")
 
     def get_queryset(self):
-        queryset = self.queryset.order_by("-uploaded_at")
+        queryset = self.queryset.select_related("uploaded_by", "approved_by").order_by("-uploaded_at")
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated and user.is_staff:
             return queryset
         return queryset.filter(is_approved=True)
 
     def get_permissions(self):
-        if self.action in ("list", "retrieve"):
+        if self.action in ("list", "retrieve", "feed"):
             return [AllowAny()]
-        if self.action == "approve":
+        if self.action in ("approve", "bulk_approve", "bulk_reject"):
             return [IsAuthenticated(), IsAdminUser()]
         return [IsAuthenticated()]
 
@@ -33,6 +62,32 @@ class MediaViewSet(viewsets.ModelViewSet):
             approved_by=None,
         )
 
+    @action(detail=False, methods=["get"])
+    def feed(self, request):
+        """
+        Approved media for infinite-scroll galleries, identical for every
+        caller: newest first, keyset-paginated over ``media_feed_idx``, with
+        per-type totals read from the counter table rather than counted.
+        """
+        def build():
+            queryset = self.filter_queryset(
+                Media.objects.filter(is_approved=True).select_related("uploaded_by", "approved_by")
+            )
+            page = self.paginate_queryset(queryset)
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            response.data["approved_counts"] = approved_media_counts()
+            return response.data
+
+        return conditional_response(
+            request,
+            self.cache_models,
+            lambda: Response(
+                get_or_build(
+                    "media:feed", self.cache_models, build, request.build_absolute_uri(), timeout=self.cache_timeout
+                )
+            ),
+        )
+
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         media = self.get_object()
@@ -42,5 +97,105 @@ class MediaViewSet(viewsets.ModelViewSet):
         media.is_approved = True
         media.approved_at = timezone.now()
         media.approved_by = request.user
-        media.save(update_fields=["is_approved", "approved_at", "approved_by"])
+        media.rejected_at = None
+        media.rejected_by = None
+        media.save(update_fields=["is_approved", "approved_at", "approved_by", "rejected_at", "rejected_by"])
         return Response(self.get_serializer(media).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], url_path="bulk-approve")
+    def bulk_approve(self, request):
+        return self._moderate(request, approve=True)
+
+    @action(detail=False, methods=["post"], url_path="bulk-reject")
+    def bulk_reject(self, request):
+        return self._moderate(request, approve=False)
+
+    def _moderate(self, request, approve):
+        """
+        Body: ``{"ids": [...]}`` or ``{"filter": {"media_type": "photo", "is_approved": "false", ...}}``.
+        A filter moderates at most ``MAX_MODERATION_BATCH`` items, oldest first;
+        ``truncated`` says whether more matched.
+        """
+        serializer = MediaModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data.get("ids", [])
+        truncated = False
+        if ids:
+            queryset = Media.objects.filter(id__in=ids)
+        else:
+            matched = apply_filter_params(Media.objects.all(), serializer.validated_data["filter"], self.filter_params)
+            matched_ids = list(matched.order_by("id").values_list("id", flat=True)[: MAX_MODERATION_BATCH + 1])
+            truncated = len(matched_ids) > MAX_MODERATION_BATCH
+            queryset = Media.objects.filter(id__in=matched_ids[:MAX_MODERATION_BATCH])
+
+        outcomes = moderate_media(queryset, approve=approve, user=request.user, requested_ids=ids)
+        changed = APPROVED if approve else REJECTED
+        return Response(
+            {
+                "updated": sum(1 for outcome in outcomes.values() if outcome == changed),
+                "truncated": truncated,
+                "results": [{"id": media_id, "outcome": outcome} for media_id, outcome in sorted(outcomes.items())],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MediaUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Resumable upload of large media:
+
+    1. ``POST /api/media-uploads/`` with ``filename``, ``total_size`` and ``media_type``.
+    2. ``PATCH /api/media-uploads/{id}/`` with the raw bytes as the body and an
+       ``Upload-Offset`` header; a 409 carries the offset to resume from, which
+       ``GET /api/media-uploads/{id}/`` also reports.
+    3. ``POST /api/media-uploads/{id}/complete/`` once every byte is in; returns the pending media item.
+    """
+
+    queryset = MediaUpload.objects.all()
+    serializer_class = MediaUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return self.queryset.filter(uploaded_by=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = start_upload(request.user, **serializer.validated_data)
+        except UploadError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
+
+    def partial_update(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "Upload-Offset and Content-Length headers are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if length > settings.MEDIA_UPLOAD_CHUNK_MAX_BYTES:
+            return Response(
+                {"error": f"Chunks are limited to {settings.MEDIA_UPLOAD_CHUNK_MAX_BYTES} bytes."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        try:
+            # request.stream is read block by block; the chunk is never held in memory whole.
+            upload = append_chunk(upload.pk, offset, request.stream, length)
+        except UploadError as exc:
+            return Response({"error": str(exc), "offset": exc.offset}, status=status.HTTP_409_CONFLICT)
+        return Response({"offset": upload.offset, "total_size": upload.total_size}, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            media = complete_upload(upload.pk)
+        except UploadError as exc:
+            return Response({"error": str(exc), "offset": exc.offset}, status=status.HTTP_409_CONFLICT)
+        return Response(
+            MediaSerializer(media, context=self.get_serializer_context()).data, status=status.HTTP_201_CREATED
+        )
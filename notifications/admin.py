@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import WhatsAppDelivery
+
+
+@admin.register(WhatsAppDelivery)
+class WhatsAppDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("recipient", "template", "status", "created_at")
+    list_filter = ("status", "template")
+    search_fields = ("recipient", "provider_message_id")
@@ -1,32 +1,125 @@
 import logging
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
 
+import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.utils import timezone
 
-try:
-    from twilio.base.exceptions import TwilioRestException
-    from twilio.rest import Client
-except ImportError:  # pragma: no cover - optional dependency
-    TwilioRestException = Exception
-    Client = None
+from .models import WhatsAppDelivery
 
 logger = logging.getLogger(__name__)
 
+REQUEST_TIMEOUT_SECONDS = 10
 
-def _get_twilio_client() -> Optional[Client]:
-    account_sid = getattr(settings, "TWILIO_ACCOUNT_SID", None)
-    auth_token = getattr(settings, "TWILIO_AUTH_TOKEN", None)
+TEMPLATES = {
+    "onboarding": (
+        "Welcome to the club, {first_name}! "
+        "Your membership and subscription are now active. "
+        "Admission invoice will appear in your account shortly."
+    ),
+    "payment_received": (
+        "Hi {first_name}, we received your payment of ₹{amount} "
+        "for {category} on {paid_on}. Thank you!"
+    ),
+    "invoice_issued": (
+        "Hi {first_name}, your {category} invoice of ₹{amount} "
+        "is due on {due_date}."
+    ),
+}
 
-    if not Client or not (account_sid and auth_token):
-        logger.warning("Twilio credentials missing; WhatsApp message skipped.")
-        return None
 
-    try:
-        return Client(account_sid, auth_token)
-    except Exception:  # pragma: no cover - defensive logging
-        logger.exception("Failed to instantiate Twilio client.")
+@dataclass
+class WhatsAppMessage:
+    """One outbound message: either a named template plus context, or a literal body."""
+    phone_number: str
+    template: str = ""
+    context: dict = field(default_factory=dict)
+    body: str = ""
+    player_id: Optional[int] = None
+
+    def render(self) -> str:
+        return self.body or TEMPLATES[self.template].format(**self.context)
+
+
+@dataclass
+class _Outcome:
+    status: str
+    provider_message_id: str = ""
+    error: str = ""
+
+
+class RateLimiter:
+    """Spaces send start times so at most ``rate`` requests begin per second, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_session: Optional[requests.Session] = None
+_limiter: Optional[RateLimiter] = None
+_state_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """One keep-alive connection pool per process, sized to the dispatcher's thread pool."""
+    global _session
+    with _state_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.WHATSAPP_MAX_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _get_rate_limiter() -> RateLimiter:
+    global _limiter
+    with _state_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(settings.WHATSAPP_RATE_PER_SECOND)
+        return _limiter
+
+
+def reset_dispatcher() -> None:
+    """Drops the pooled session and rate limiter, e.g. after settings change in tests."""
+    global _session, _limiter
+    with _state_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _limiter = None
+
+
+def _twilio_config() -> Optional[dict]:
+    account_sid = getattr(settings, "TWILIO_ACCOUNT_SID", None)
+    auth_token = getattr(settings, "TWILIO_AUTH_TOKEN", None)
+    from_number = getattr(settings, "TWILIO_WHATSAPP_NUMBER", None)
+    if not (account_sid and auth_token and from_number):
         return None
+    base_url = getattr(settings, "TWILIO_API_BASE_URL", "https://api.twilio.com").rstrip("/")
+    return {
+        "url": f"{base_url}/2010-04-01/Accounts/{account_sid}/Messages.json",
+        "auth": (account_sid, auth_token),
+        "from": _format_whatsapp_number(from_number) or from_number,
+    }
 
 
 def _format_whatsapp_number(phone_number: str) -> Optional[str]:
@@ -43,51 +136,145 @@ def _format_whatsapp_number(phone_number: str) -> Optional[str]:
     return f"whatsapp:{sanitized}"
 
 
-def send_whatsapp_message(phone_number: str, body: str) -> bool:
+def _send_one(config: dict, to_number: str, body: str) -> _Outcome:
+    _get_rate_limiter().wait()
+    try:
+        response = _get_http_session().post(
+            config["url"],
+            data={"From": config["from"], "To": to_number, "Body": body},
+            auth=config["auth"],
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+        if response.status_code >= 400:
+            logger.error("Twilio rejected WhatsApp message to %s: %s", to_number, response.text)
+            return _Outcome(WhatsAppDelivery.STATUS_FAILED, error=response.text[:1000])
+        # The message was accepted; a body that is not Twilio's JSON (a proxy
+        # page, say) only costs us the message sid.
+        try:
+            payload = response.json()
+        except ValueError:
+            logger.warning("Twilio accepted WhatsApp message to %s with a non-JSON body.", to_number)
+            payload = {}
+    except requests.RequestException as exc:
+        logger.exception("Failed to send WhatsApp message to %s", to_number)
+        return _Outcome(WhatsAppDelivery.STATUS_FAILED, error=str(exc))
+
+    sid = payload.get("sid", "") if isinstance(payload, dict) else ""
+    return _Outcome(WhatsAppDelivery.STATUS_SENT, provider_message_id=sid or "")
+
+
+def dispatch_whatsapp(messages: Iterable[WhatsAppMessage]) -> List[WhatsAppDelivery]:
     """
-    Sends a WhatsApp message via Twilio. Returns True if queued successfully.
+    Sends a batch of WhatsApp messages concurrently and records one
+    ``WhatsAppDelivery`` row per message, in input order.
+
+    Sends share the process-wide connection pool and rate limit; the outcome
+    rows are written with a single bulk insert once every send has finished.
     """
-    client = _get_twilio_client()
-    from_number = getattr(settings, "TWILIO_WHATSAPP_NUMBER", None)
-    if not client or not from_number:
-        logger.warning("Twilio WhatsApp configuration missing; message skipped.")
-        return False
+    messages = list(messages)
+    config = _twilio_config()
+    if config is None and messages:
+        logger.warning("Twilio WhatsApp configuration missing; %s message(s) skipped.", len(messages))
 
-    to_number = _format_whatsapp_number(phone_number)
-    if not to_number:
-        logger.warning("Invalid WhatsApp recipient; message skipped.")
-        return False
+    recipients = [_format_whatsapp_number(message.phone_number) for message in messages]
+    bodies = [message.render() for message in messages]
+    outcomes: List[Optional[_Outcome]] = [None] * len(messages)
 
-    try:
-        client.messages.create(
-            body=body,
-            from_=from_number,
-            to=to_number,
-        )
-        return True
-    except TwilioRestException:
-        logger.exception("Failed to send WhatsApp message to %s", to_number)
-        return False
+    pending = []
+    for index, to_number in enumerate(recipients):
+        if config is None:
+            outcomes[index] = _Outcome(WhatsAppDelivery.STATUS_SKIPPED, error="Twilio WhatsApp configuration missing.")
+        elif not to_number:
+            outcomes[index] = _Outcome(WhatsAppDelivery.STATUS_SKIPPED, error="Invalid WhatsApp recipient.")
+        else:
+            pending.append(index)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(settings.WHATSAPP_MAX_WORKERS, len(pending))) as pool:
+            futures = {
+                index: pool.submit(_send_one, config, recipients[index], bodies[index])
+                for index in pending
+            }
+        for index, future in futures.items():
+            try:
+                outcomes[index] = future.result()
+            except Exception as exc:
+                # One bad send must not cost the batch its delivery rows.
+                logger.exception("Unexpected error sending WhatsApp message to %s", recipients[index])
+                outcomes[index] = _Outcome(WhatsAppDelivery.STATUS_FAILED, error=str(exc)[:1000])
+
+    return WhatsAppDelivery.objects.bulk_create(
+        [
+            WhatsAppDelivery(
+                player_id=message.player_id,
+                recipient=recipients[index] or message.phone_number or "",
+                template=message.template,
+                body=bodies[index],
+                status=outcomes[index].status,
+                provider_message_id=outcomes[index].provider_message_id,
+                error=outcomes[index].error,
+            )
+            for index, message in enumerate(messages)
+        ]
+    )
+
+
+def send_whatsapp_message(phone_number: str, body: str) -> bool:
+    """
+    Sends a WhatsApp message via Twilio. Returns True if queued successfully.
+    """
+    delivery = dispatch_whatsapp([WhatsAppMessage(phone_number=phone_number, body=body)])[0]
+    return delivery.status == WhatsAppDelivery.STATUS_SENT
 
 
 def notify_player_onboarding(player) -> bool:
     if not player.phone_number:
         return False
-    body = (
-        f"Welcome to the club, {player.first_name}! "
-        "Your membership and subscription are now active. "
-        "Admission invoice will appear in your account shortly."
-    )
-    return send_whatsapp_message(player.phone_number, body)
+    delivery = dispatch_whatsapp([
+        WhatsAppMessage(
+            phone_number=player.phone_number,
+            template="onboarding",
+            context={"first_name": player.first_name},
+            player_id=player.pk,
+        )
+    ])[0]
+    return delivery.status == WhatsAppDelivery.STATUS_SENT
 
 
 def notify_payment_received(transaction) -> bool:
     player = transaction.player
     if not player.phone_number:
         return False
-    paid_on = transaction.payment_date or timezone.localdate()
-    body = (
-        f"Hi {player.first_name}, we received your payment of ₹{transaction.amount} "
-        f"for {transaction.get_category_display()} on {paid_on}. Thank you!"
+    delivery = dispatch_whatsapp([
+        WhatsAppMessage(
+            phone_number=player.phone_number,
+            template="payment_received",
+            context={
+                "first_name": player.first_name,
+                "amount": transaction.amount,
+                "category": transaction.get_category_display(),
+                "paid_on": transaction.payment_date or timezone.localdate(),
+            },
+            player_id=player.pk,
+        )
+    ])[0]
+    return delivery.status == WhatsAppDelivery.STATUS_SENT
+
+
+def notify_invoices_issued(transactions) -> List[WhatsAppDelivery]:
+    """Fans one invoice message out per transaction whose player has a phone number."""
+    return dispatch_whatsapp(
+        WhatsAppMessage(
+            phone_number=transaction.player.phone_number,
+            template="invoice_issued",
+            context={
+                "first_name": transaction.player.first_name,
+                "amount": transaction.amount,
+                "category": transaction.get_category_display(),
+                "due_date": transaction.due_date,
+            },
+            player_id=transaction.player_id,
+        )
+        for transaction in transactions
+        if transaction.player.phone_number
     )
-    return send_whatsapp_message(player.phone_number, body)
@@ -0,0 +1,152 @@
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from django.test import TestCase, override_settings
+
+from .models import WhatsAppDelivery
+from .services import (
+    RateLimiter,
+    WhatsAppMessage,
+    dispatch_whatsapp,
+    reset_dispatcher,
+    send_whatsapp_message,
+)
+
+
+class FakeTwilioHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        server = self.server
+        with server.lock:
+            server.requests.append(
+                {
+                    "path": self.path,
+                    "auth": self.headers.get("Authorization"),
+                    "form": form,
+                    "client_port": self.client_address[1],
+                }
+            )
+            sid = f"SM{len(server.requests):04d}"
+
+        content_type = "application/json"
+        if form["To"] in server.rejected:
+            status_code, body = 400, json.dumps({"code": 63003, "message": "Invalid destination"}).encode()
+        elif form["To"] in server.html_replies:
+            status_code, body, content_type = 200, b"<html>Accepted</html>", "text/html"
+        else:
+            status_code, body = 201, json.dumps({"sid": sid, "status": "queued"}).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class WhatsAppDispatcherTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTwilioHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.rejected = set()
+        self.server.html_replies = set()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings_override = override_settings(
+            TWILIO_ACCOUNT_SID="AC123",
+            TWILIO_AUTH_TOKEN="secret",
+            TWILIO_WHATSAPP_NUMBER="+14155238886",
+            TWILIO_API_BASE_URL=f"http://127.0.0.1:{self.server.server_port}",
+            WHATSAPP_MAX_WORKERS=4,
+            WHATSAPP_RATE_PER_SECOND=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        reset_dispatcher()
+        self.addCleanup(reset_dispatcher)
+
+    def test_batch_is_sent_over_pooled_connections_and_recorded(self):
+        messages = [
+            WhatsAppMessage(
+                phone_number=f"+9190000{index:05d}",
+                template="invoice_issued",
+                context={"first_name": f"P{index}", "amount": "750.00", "category": "Monthly", "due_date": "2026-03-10"},
+            )
+            for index in range(40)
+        ]
+
+        with self.assertNumQueries(1):
+            deliveries = dispatch_whatsapp(messages)
+
+        self.assertEqual(len(self.server.requests), 40)
+        self.assertEqual([delivery.status for delivery in deliveries], [WhatsAppDelivery.STATUS_SENT] * 40)
+        self.assertEqual(WhatsAppDelivery.objects.filter(status=WhatsAppDelivery.STATUS_SENT).count(), 40)
+        self.assertEqual(deliveries[3].recipient, "whatsapp:+919000000003")
+        self.assertEqual(deliveries[3].body, "Hi P3, your Monthly invoice of ₹750.00 is due on 2026-03-10.")
+
+        first = self.server.requests[0]
+        self.assertEqual(first["path"], "/2010-04-01/Accounts/AC123/Messages.json")
+        self.assertEqual(first["auth"], "Basic " + base64.b64encode(b"AC123:secret").decode())
+        self.assertEqual(first["form"]["From"], "whatsapp:+14155238886")
+        # Keep-alive connections are reused instead of opening one per message.
+        self.assertLessEqual(len({request["client_port"] for request in self.server.requests}), 4)
+
+    def test_rejections_and_invalid_numbers_are_recorded_per_recipient(self):
+        self.server.rejected.add("whatsapp:+910000000002")
+
+        deliveries = dispatch_whatsapp(
+            [
+                WhatsAppMessage(phone_number="+910000000001", body="ok"),
+                WhatsAppMessage(phone_number="+910000000002", body="rejected"),
+                WhatsAppMessage(phone_number="9876543210", body="no country code"),
+            ]
+        )
+
+        self.assertEqual(
+            [delivery.status for delivery in deliveries],
+            [WhatsAppDelivery.STATUS_SENT, WhatsAppDelivery.STATUS_FAILED, WhatsAppDelivery.STATUS_SKIPPED],
+        )
+        self.assertEqual(deliveries[0].provider_message_id[:2], "SM")
+        self.assertIn("Invalid destination", deliveries[1].error)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_accepted_message_with_non_json_body_is_still_recorded(self):
+        self.server.html_replies.add("whatsapp:+910000000002")
+
+        deliveries = dispatch_whatsapp(
+            [
+                WhatsAppMessage(phone_number="+910000000001", body="json"),
+                WhatsAppMessage(phone_number="+910000000002", body="html"),
+            ]
+        )
+
+        self.assertEqual([delivery.status for delivery in deliveries], [WhatsAppDelivery.STATUS_SENT] * 2)
+        self.assertTrue(deliveries[0].provider_message_id.startswith("SM"))
+        self.assertEqual(deliveries[1].provider_message_id, "")
+        self.assertEqual(WhatsAppDelivery.objects.count(), 2)
+
+    def test_missing_configuration_skips_without_network(self):
+        with override_settings(TWILIO_AUTH_TOKEN=None):
+            self.assertFalse(send_whatsapp_message("+910000000001", "hello"))
+
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(WhatsAppDelivery.objects.get().status, WhatsAppDelivery.STATUS_SKIPPED)
+
+    def test_rate_limiter_spaces_request_starts(self):
+        limiter = RateLimiter(50)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - started, 5 / 50 - 0.01)
@@ -49,8 +49,8 @@ admin.site.register(Player, PlayerAdmin)
 
 @admin.register(Membership)
 class MembershipAdmin(admin.ModelAdmin):
-    list_display = ("player", "join_date", "status", "fee_exempt")
-    list_filter = ("status", "fee_exempt")
+    list_display = ("player", "join_date", "status", "membership_active", "fee_exempt")
+    list_filter = ("status", "membership_active", "fee_exempt")
     search_fields = ("player__first_name", "player__last_name", "player__phone_number")
     inlines = (MembershipLeaveInline,)
 
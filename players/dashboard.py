@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Prefetch, Q, Subquery
+from django.utils import timezone
+
+from cricket_club.cache import get_or_build
+from financials.models import Transaction
+from financials.serializers import TransactionSerializer
+from matches.models import Match
+from matches.serializers import MatchSerializer
+from media_gallery.models import Media
+from media_gallery.serializers import MediaSerializer
+from teams.models import Team
+from teams.serializers import TEAM_PLAYER_FIELDS, TeamSerializer, TeamSummarySerializer
+
+from .models import Player
+from .serializers import PlayerSerializer, with_player_read_plan
+
+DASHBOARD_SHARED_CACHE_TIMEOUT = 300
+RECENT_MEDIA_LIMIT = 10
+
+
+def recent_media_payload():
+    """Latest approved media; identical for every player, so cached once."""
+    def build():
+        media = (
+            Media.objects.filter(is_approved=True)
+            .select_related("uploaded_by", "approved_by")
+            .order_by("-uploaded_at")[:RECENT_MEDIA_LIMIT]
+        )
+        return MediaSerializer(media, many=True).data
+
+    return get_or_build(
+        "dashboard:recent-media", (Media, get_user_model()), build, timeout=DASHBOARD_SHARED_CACHE_TIMEOUT
+    )
+
+
+def team_directory_payload():
+    """Every team as a light summary, ordered by name; shared by all players."""
+    def build():
+        return TeamSummarySerializer(Team.objects.order_by("name"), many=True).data
+
+    return get_or_build("dashboard:team-directory", (Team,), build, timeout=DASHBOARD_SHARED_CACHE_TIMEOUT)
+
+
+def _player_transactions(player):
+    """
+    Fetches the most recent transaction and the oldest open monthly invoice in
+    a single query and returns them as ``(last, membership_due)``.
+    """
+    player_transactions = Transaction.objects.filter(player_id=OuterRef("player_id"))
+    last = player_transactions.order_by("-payment_date", "-due_date", "-id").values("id")[:1]
+    oldest_unpaid = (
+        player_transactions.filter(category="monthly", paid=False, waived=False)
+        .order_by("due_date", "id")
+        .values("id")[:1]
+    )
+    rows = {
+        txn.id: txn
+        for txn in Transaction.objects.filter(player=player).filter(
+            Q(id=Subquery(last)) | Q(id=Subquery(oldest_unpaid))
+        )
+        .annotate(last_id=Subquery(last), oldest_unpaid_id=Subquery(oldest_unpaid))
+    }
+    if not rows:
+        return None, None
+    sample = next(iter(rows.values()))
+    return rows.get(sample.last_id), rows.get(sample.oldest_unpaid_id)
+
+
+def get_dashboard_player(user):
+    return with_player_read_plan(Player.objects.filter(user=user)).first()
+
+
+def build_dashboard(player, request):
+    teams = list(
+        Team.objects.filter(players=player)
+        .prefetch_related(Prefetch("players", queryset=Player.objects.only(*TEAM_PLAYER_FIELDS)))
+        .order_by("name")
+    )
+    team_ids = {team.id for team in teams}
+    upcoming_matches = []
+    if team_ids:
+        upcoming_matches = Match.objects.filter(
+            Q(team1_id__in=team_ids) | Q(team2_id__in=team_ids),
+            date__gte=timezone.now(),
+        ).order_by("date")
+    last_transaction, membership_transaction = _player_transactions(player)
+
+    profile_picture_url = None
+    if player.profile_picture:
+        profile_picture_url = request.build_absolute_uri(player.profile_picture.url)
+
+    return {
+        "player": PlayerSerializer(player).data,
+        "profile_picture": profile_picture_url,
+        "teams": TeamSerializer(teams, many=True).data,
+        "other_teams": [team for team in team_directory_payload() if team["id"] not in team_ids],
+        "upcoming_matches": MatchSerializer(upcoming_matches, many=True).data,
+        "last_transaction": TransactionSerializer(last_transaction).data if last_transaction else None,
+        "membership_payment": {
+            "required": bool(membership_transaction),
+            "transaction": (
+                TransactionSerializer(membership_transaction).data
+                if membership_transaction else None
+            )
+        },
+        "media": recent_media_payload(),
+        "media_upload_endpoint": "/api/media/"
+    }
@@ -0,0 +1,20 @@
+"""Background job handlers for membership upkeep."""
+from datetime import time
+
+from django.utils import timezone
+
+from jobs.services import register, schedule_daily
+
+from .services import refresh_membership_statuses
+
+REFRESH_MEMBERSHIP_STATUSES_JOB = "players.refresh_membership_statuses"
+
+# Nightly, shortly after the date rolls over.
+schedule_daily(REFRESH_MEMBERSHIP_STATUSES_JOB, at=time(0, 15))
+
+
+@register(REFRESH_MEMBERSHIP_STATUSES_JOB)
+def run_membership_refresh():
+    as_of = timezone.localdate()
+    changes = refresh_membership_statuses(as_of=as_of)
+    return {"as_of": as_of.isoformat(), **changes}
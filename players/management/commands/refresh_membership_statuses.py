@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from players.services import refresh_membership_statuses
+
+
+class Command(BaseCommand):
+    help = 'Moves memberships across the lapse/left thresholds as the date rolls over.'
+
+    def handle(self, *args, **options):
+        changes = refresh_membership_statuses()
+
+        for field_name, count in changes.items():
+            self.stdout.write(f'{field_name}: {count} membership(s) updated.')
+
+        self.stdout.write(self.style.SUCCESS('Finished refreshing membership statuses.'))
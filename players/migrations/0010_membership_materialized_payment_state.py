@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+MEMBERSHIP_LAPSE_DAYS = 30
+
+
+def populate_payment_state(apps, schema_editor):
+    Membership = apps.get_model("players", "Membership")
+    Transaction = apps.get_model("financials", "Transaction")
+    Membership.objects.update(
+        oldest_unpaid_due_date=Subquery(
+            Transaction.objects.filter(
+                player_id=OuterRef("player_id"),
+                category="monthly",
+                paid=False,
+                waived=False,
+            )
+            .order_by("due_date", "id")
+            .values("due_date")[:1]
+        )
+    )
+    lapse_cutoff = date.today() - timedelta(days=MEMBERSHIP_LAPSE_DAYS)
+    Membership.objects.filter(oldest_unpaid_due_date__lt=lapse_cutoff).update(membership_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("players", "0009_leaverequest"),
+        ("financials", "0008_transaction_waived_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="membership",
+            name="oldest_unpaid_due_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="membership",
+            name="membership_active",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(populate_payment_state, migrations.RunPython.noop),
+    ]
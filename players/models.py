@@ -65,33 +65,24 @@ class Player(models.Model):
             return Membership.STATUS_PENDING
         if membership.fee_exempt:
             return Membership.STATUS_ACTIVE
-
-        as_of = as_of or date.today()
-        oldest_due_date = self.oldest_unpaid_monthly_due_date()
-        if not oldest_due_date:
-            return Membership.STATUS_ACTIVE
-
-        left_cutoff = as_of - timedelta(days=self.MEMBERSHIP_LEFT_DAYS)
-        lapse_cutoff = as_of - timedelta(days=self.MEMBERSHIP_LAPSE_DAYS)
-        if oldest_due_date < left_cutoff:
-            return Membership.STATUS_LEFT
-        if oldest_due_date < lapse_cutoff:
-            return Membership.STATUS_INACTIVE
-        return Membership.STATUS_ACTIVE
+        return membership.status_for(self.oldest_unpaid_monthly_due_date(), as_of=as_of)
 
     def sync_membership_status(self, as_of=None, *, save=True):
+        """
+        Recomputes the membership status and the materialized payment state
+        (oldest unpaid due date and ``membership_active``) from transactions.
+        """
         membership = getattr(self, "membership", None)
         if membership is None:
             return None
 
-        computed_status = self.computed_membership_status(as_of=as_of)
-        if computed_status and membership.status != computed_status:
-            membership.status = computed_status
-            if save:
-                membership.save(update_fields=["status"])
+        changed_fields = membership.apply_unpaid_due_date(
+            self.oldest_unpaid_monthly_due_date(), as_of=as_of
+        )
+        if changed_fields and save:
+            membership.save(update_fields=changed_fields)
         return membership.status
 
-
     def save(self, *args, **kwargs):
         if self.user:
             if not self.first_name:
@@ -127,6 +118,44 @@ class Membership(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
     fee_exempt = models.BooleanField(default=False)
     fee_exempt_reason = models.CharField(max_length=255, blank=True)
+    # Materialized from the player's monthly transactions; kept current by
+    # transaction/leave signals and the nightly refresh_membership_statuses job.
+    oldest_unpaid_due_date = models.DateField(null=True, blank=True)
+    membership_active = models.BooleanField(default=True)
+
+    def status_for(self, oldest_due_date, as_of=None):
+        if self.status == self.STATUS_PENDING:
+            return self.STATUS_PENDING
+        if self.fee_exempt or not oldest_due_date:
+            return self.STATUS_ACTIVE
+
+        as_of = as_of or date.today()
+        left_cutoff = as_of - timedelta(days=Player.MEMBERSHIP_LEFT_DAYS)
+        lapse_cutoff = as_of - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS)
+        if oldest_due_date < left_cutoff:
+            return self.STATUS_LEFT
+        if oldest_due_date < lapse_cutoff:
+            return self.STATUS_INACTIVE
+        return self.STATUS_ACTIVE
+
+    def apply_unpaid_due_date(self, oldest_due_date, as_of=None):
+        """
+        Updates the materialized payment state in memory and returns the names
+        of the fields that changed. ``membership_active`` always follows
+        ``Player.membership_active`` and is measured from today.
+        """
+        lapse_cutoff = date.today() - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS)
+        values = {
+            "oldest_unpaid_due_date": oldest_due_date,
+            "membership_active": oldest_due_date is None or oldest_due_date >= lapse_cutoff,
+            "status": self.status_for(oldest_due_date, as_of=as_of),
+        }
+        changed_fields = []
+        for field_name, value in values.items():
+            if getattr(self, field_name) != value:
+                setattr(self, field_name, value)
+                changed_fields.append(field_name)
+        return changed_fields
 
     def month_bounds(self, billing_date):
         month_start = billing_date.replace(day=1)
@@ -1,12 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
 from accounts.phone_utils import normalize_phone_number
-from cricket_club.upload_validators import validate_uploaded_image
+from cricket_club.images import ImageVariantField
+from cricket_club.upload_validators import ValidatedImageField
 from .models import LeaveRequest, Player, Membership, MembershipLeave
 from teams.models import Team
-from tournaments.models import TournamentParticipation
+from tournaments.models import Tournament, TournamentParticipation
 
 class MembershipLeaveSerializer(serializers.ModelSerializer):
     class Meta:
@@ -80,8 +82,29 @@ class PlayerTournamentParticipationSerializer(serializers.ModelSerializer):
         model = TournamentParticipation
         fields = ['id', 'tournament', 'tournament_name', 'tournament_start_date']
 
+# Every model PlayerSerializer reads through the read plan; cached player
+# payloads are keyed on these.
+PLAYER_READ_MODELS = (Player, Membership, MembershipLeave, Team, TournamentParticipation, Tournament)
+
+
+def with_player_read_plan(queryset):
+    """
+    Loads everything ``PlayerSerializer`` renders in a fixed number of
+    queries: the membership join plus one prefetch per nested relation.
+    """
+    return queryset.select_related("membership").prefetch_related(
+        Prefetch("membership__leave_periods", queryset=MembershipLeave.objects.all()),
+        Prefetch("teams", queryset=Team.objects.only("id", "name")),
+        Prefetch("captain_of", queryset=Team.objects.only("id", "name", "captain_id")),
+        Prefetch(
+            "tournament_participations",
+            queryset=TournamentParticipation.objects.select_related("tournament"),
+        ),
+    )
+
+
 class PlayerSerializer(serializers.ModelSerializer):
-    membership_active = serializers.BooleanField(read_only=True)
+    membership_active = serializers.BooleanField(source="membership.membership_active", read_only=True)
     membership = MembershipSerializer(read_only=True)
     membership_join_date = serializers.DateField(write_only=True, required=False)
     membership_status = serializers.ChoiceField(
@@ -95,11 +118,13 @@ class PlayerSerializer(serializers.ModelSerializer):
     captain_of = PlayerTeamSerializer(many=True, read_only=True)
     tournament_participations = PlayerTournamentParticipationSerializer(many=True, read_only=True)
     password = serializers.CharField(write_only=True, required=False)
+    profile_picture = ValidatedImageField(required=False, allow_null=True)
+    thumbnail_url = ImageVariantField("thumbnail", source="profile_picture")
 
     class Meta:
         model = Player
         fields = [
-            'id', 'first_name', 'last_name', 'age', 'role', 'profile_picture',
+            'id', 'first_name', 'last_name', 'age', 'role', 'profile_picture', 'thumbnail_url',
             'phone_number', 'membership_active', 'membership', 'teams',
             'captain_of', 'tournament_participations', 'password',
             'membership_join_date', 'membership_status',
@@ -123,9 +148,6 @@ class PlayerSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"phone_number": "Account with this phone number already exists."})
         return attrs
 
-    def validate_profile_picture(self, value):
-        return validate_uploaded_image(value)
-
     def create(self, validated_data):
         password = validated_data.pop('password', None)
         membership_join_date = validated_data.pop('membership_join_date', None)
@@ -1,11 +1,13 @@
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import Optional
 
 from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
 from django.utils import timezone
 
 from .models import Membership, Player, Subscription
+from cricket_club.cache import invalidate_models
 from financials.models import Transaction
 
 ADMISSION_FEE = Decimal("2000.00")
@@ -54,3 +56,83 @@ def onboard_player(
         "subscription": subscription,
         "admission_invoice": admission_invoice,
     }
+
+
+def refresh_player_membership(player_id, *, as_of=None):
+    """
+    Recomputes one player's materialized membership state. Writes with a
+    queryset update so it is safe to call while the player is being deleted.
+    """
+    membership = Membership.objects.filter(player_id=player_id).first()
+    if membership is None:
+        return None
+    oldest_due_date = (
+        Transaction.objects.filter(player_id=player_id, category="monthly", paid=False, waived=False)
+        .order_by("due_date", "id")
+        .values_list("due_date", flat=True)
+        .first()
+    )
+    changed_fields = membership.apply_unpaid_due_date(oldest_due_date, as_of=as_of)
+    if changed_fields:
+        Membership.objects.filter(pk=membership.pk).update(
+            **{field_name: getattr(membership, field_name) for field_name in changed_fields}
+        )
+        invalidate_models(Membership)
+    return membership
+
+
+@transaction.atomic
+def refresh_membership_statuses(*, as_of: Optional[date] = None):
+    """
+    Nightly date rollover: re-derives every membership's oldest unpaid due
+    date, then moves players across the lapse/left thresholds with a fixed
+    number of set-based UPDATEs. Returns the number of rows changed per field.
+    """
+    as_of = as_of or timezone.localdate()
+    lapse_cutoff = as_of - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS)
+    left_cutoff = as_of - timedelta(days=Player.MEMBERSHIP_LEFT_DAYS)
+    active_cutoff = date.today() - timedelta(days=Player.MEMBERSHIP_LAPSE_DAYS)
+
+    Membership.objects.update(
+        oldest_unpaid_due_date=Subquery(
+            Transaction.objects.filter(
+                player_id=OuterRef("player_id"),
+                category="monthly",
+                paid=False,
+                waived=False,
+            )
+            .order_by("due_date", "id")
+            .values("due_date")[:1]
+        )
+    )
+
+    invalidate_models(Membership)
+
+    paid_up = Q(oldest_unpaid_due_date__isnull=True)
+    memberships = Membership.objects.all()
+    billable = memberships.exclude(status=Membership.STATUS_PENDING)
+    overdue = billable.filter(fee_exempt=False, oldest_unpaid_due_date__isnull=False)
+    return {
+        "membership_active": (
+            memberships.filter(membership_active=False)
+            .filter(paid_up | Q(oldest_unpaid_due_date__gte=active_cutoff))
+            .update(membership_active=True)
+            + memberships.filter(membership_active=True, oldest_unpaid_due_date__lt=active_cutoff)
+            .update(membership_active=False)
+        ),
+        Membership.STATUS_ACTIVE: (
+            billable.exclude(status=Membership.STATUS_ACTIVE)
+            .filter(paid_up | Q(fee_exempt=True) | Q(oldest_unpaid_due_date__gte=lapse_cutoff))
+            .update(status=Membership.STATUS_ACTIVE)
+        ),
+        Membership.STATUS_INACTIVE: (
+            overdue.exclude(status=Membership.STATUS_INACTIVE)
+            .filter(oldest_unpaid_due_date__lt=lapse_cutoff, oldest_unpaid_due_date__gte=left_cutoff)
+            .update(status=Membership.STATUS_INACTIVE)
+        ),
+        Membership.STATUS_LEFT: (
+            overdue.exclude(status=Membership.STATUS_LEFT)
+            .filter(oldest_unpaid_due_date__lt=left_cutoff)
+            .update(status=Membership.STATUS_LEFT)
+        ),
+    }
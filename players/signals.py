@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Player, Membership, Subscription
+from .models import Player, Membership, MembershipLeave, Subscription
+from .services import refresh_player_membership
 from financials.models import Transaction
 import datetime
 
@@ -32,3 +33,15 @@ def handle_new_player_creation(sender, instance, created, **kwargs):
             paid=False,
             payment_date=datetime.date.today()
         )
+
+
+@receiver(post_save, sender=MembershipLeave)
+@receiver(post_delete, sender=MembershipLeave)
+def refresh_membership_after_leave_change(sender, instance, **kwargs):
+    player_id = (
+        Membership.objects.filter(pk=instance.membership_id)
+        .values_list("player_id", flat=True)
+        .first()
+    )
+    if player_id is not None:
+        refresh_player_membership(player_id)
@@ -1,11 +1,25 @@
-from django.test import TestCase
+import tempfile
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
 from rest_framework import status
 from PIL import Image
 from io import BytesIO
-from .models import LeaveRequest, MembershipLeave, Player, RegistrationRequest, Subscription
+from django.core.management import call_command
+from io import StringIO
+from .models import LeaveRequest, Membership, MembershipLeave, Player, RegistrationRequest, Subscription
+from .serializers import PlayerSerializer
+from .jobs import REFRESH_MEMBERSHIP_STATUSES_JOB
+from .services import refresh_membership_statuses
+from jobs.services import enqueue, run_pending_jobs
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from teams.models import Team
+from matches.models import Match
+from django.core.cache import cache
+from django.utils import timezone
+from tournaments.models import Tournament, TournamentParticipation
 from financials.models import Transaction
 from datetime import date, timedelta
 
@@ -95,6 +109,201 @@ class PlayerModelTest(TestCase):
         self.assertEqual(status_value, "active")
         self.assertTrue(self.player.membership_active)
 
+class MaterializedMembershipStatusTests(TestCase):
+    def setUp(self):
+        self.player = Player.objects.create(first_name="Cached", last_name="Status", phone_number="8100000001")
+        Membership.objects.filter(player=self.player).update(status="active", join_date=date(2024, 1, 1))
+
+    def _membership(self):
+        return Membership.objects.get(player=self.player)
+
+    def test_monthly_transaction_changes_recompute_membership(self):
+        invoice = Transaction.objects.create(
+            player=self.player,
+            category='monthly',
+            amount=750,
+            due_date=date.today() - timedelta(days=45),
+            paid=False,
+        )
+        membership = self._membership()
+        self.assertEqual(membership.status, "inactive")
+        self.assertFalse(membership.membership_active)
+        self.assertEqual(membership.oldest_unpaid_due_date, invoice.due_date)
+
+        invoice.paid = True
+        invoice.save()
+        membership = self._membership()
+        self.assertEqual(membership.status, "active")
+        self.assertTrue(membership.membership_active)
+        self.assertIsNone(membership.oldest_unpaid_due_date)
+
+    def test_player_read_uses_materialized_column(self):
+        Transaction.objects.create(
+            player=self.player,
+            category='monthly',
+            amount=750,
+            due_date=date.today() - timedelta(days=45),
+            paid=False,
+        )
+        player = Player.objects.select_related("membership").get(pk=self.player.pk)
+
+        with self.assertNumQueries(0):
+            membership_active = PlayerSerializer().fields["membership_active"].get_attribute(player)
+
+        self.assertFalse(membership_active)
+
+    def test_nightly_refresh_moves_players_across_thresholds(self):
+        Transaction.objects.create(
+            player=self.player,
+            category='monthly',
+            amount=750,
+            due_date=date.today() - timedelta(days=20),
+            paid=False,
+        )
+        self.assertEqual(self._membership().status, "active")
+
+        changes = refresh_membership_statuses(as_of=date.today() + timedelta(days=20))
+
+        self.assertEqual(changes["inactive"], 1)
+        self.assertEqual(self._membership().status, "inactive")
+
+        call_command("refresh_membership_statuses", stdout=StringIO())
+        self.assertEqual(self._membership().status, "active")
+
+    def test_nightly_refresh_runs_from_the_job_queue(self):
+        Transaction.objects.create(
+            player=self.player,
+            category='monthly',
+            amount=750,
+            due_date=date.today() - timedelta(days=45),
+            paid=False,
+        )
+        # State drifted with no write, e.g. the date rolled over.
+        Membership.objects.filter(player=self.player).update(status="active", membership_active=True)
+
+        job = enqueue(REFRESH_MEMBERSHIP_STATUSES_JOB)
+        run_pending_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.result["as_of"], timezone.localdate().isoformat())
+        self.assertEqual(self._membership().status, "inactive")
+
+    def test_dashboard_read_does_not_write_membership(self):
+        user = get_user_model().objects.create_user(phone_number="8100000001", password=VALID_PASSWORD)
+        self.player.user = user
+        self.player.save(update_fields=["user"])
+        Membership.objects.filter(player=self.player).update(status="left")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.get("/api/auth/dashboard/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._membership().status, "left")
+
+
+class PlayerListQueryPlanTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.team = Team.objects.create(name="Roster XI")
+        self.tournament = Tournament.objects.create(name="Summer Cup", start_date=date(2026, 5, 1), entry_fee=500)
+
+    def _add_players(self, count):
+        for _ in range(count):
+            index = Player.objects.count()
+            player = Player.objects.create(first_name=f"Roster{index}", last_name="Player", phone_number=f"82000{index:05d}")
+            self.team.players.add(player)
+            TournamentParticipation.objects.create(player=player, tournament=self.tournament)
+            MembershipLeave.objects.create(
+                membership=player.membership, start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+            )
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/players/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(context.captured_queries)
+
+    def test_list_query_count_is_independent_of_roster_size(self):
+        self._add_players(2)
+        _, small_roster_queries = self._count_list_queries()
+
+        self._add_players(8)
+        response, large_roster_queries = self._count_list_queries()
+
+        self.assertEqual(small_roster_queries, large_roster_queries)
+        self.assertEqual(len(response.data["results"]), 10)
+        first = response.data["results"][0]
+        self.assertEqual(first["teams"], [{"id": self.team.id, "name": "Roster XI"}])
+        self.assertEqual(first["tournament_participations"][0]["tournament_name"], "Summer Cup")
+        self.assertEqual(len(first["membership"]["leave_periods"]), 1)
+
+    def test_list_is_cursor_paginated(self):
+        self._add_players(3)
+
+        first_page = self.client.get("/api/players/", {"page_size": 2})
+        second_page = self.client.get(first_page.data["next"])
+
+        self.assertEqual(len(first_page.data["results"]), 2)
+        self.assertEqual(len(second_page.data["results"]), 1)
+        self.assertIsNone(second_page.data["next"])
+
+
+class PlayerDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user(phone_number="8500000001", password=VALID_PASSWORD)
+        self.player = Player.objects.create(user=self.user, first_name="Dash", last_name="Board", phone_number="8500000001")
+        self.my_team = Team.objects.create(name="Alpha", captain=self.player)
+        self.my_team.players.add(self.player)
+        self.other_team = Team.objects.create(name="Bravo")
+        self.match = Match.objects.create(
+            team1=self.other_team, team2=self.my_team, date=timezone.now() + timedelta(days=3),
+        )
+        Match.objects.create(team1=self.other_team, external_opponent="Guests", date=timezone.now() + timedelta(days=4))
+        Transaction.objects.create(
+            player=self.player, category="merchandise", amount=300, due_date=date(2026, 2, 1),
+            paid=True, payment_date=date(2026, 2, 2),
+        )
+        self.unpaid = Transaction.objects.create(
+            player=self.player, category="monthly", amount=1050, due_date=date(2026, 3, 10), paid=False,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_dashboard_sections(self):
+        response = self.client.get("/api/auth/dashboard/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([team["name"] for team in response.data["teams"]], ["Alpha"])
+        self.assertEqual(response.data["other_teams"], [
+            {"id": self.other_team.id, "name": "Bravo", "captain": None, "logo": None, "thumbnail_url": None},
+        ])
+        self.assertEqual([match["id"] for match in response.data["upcoming_matches"]], [self.match.id])
+        expected_last = (
+            Transaction.objects.filter(player=self.player).order_by("-payment_date", "-due_date", "-id").first()
+        )
+        self.assertEqual(response.data["last_transaction"]["id"], expected_last.id)
+        self.assertEqual(response.data["membership_payment"]["transaction"]["id"], self.unpaid.id)
+        self.assertTrue(response.data["membership_payment"]["required"])
+
+    def test_shared_sections_are_cached_between_players(self):
+        self.client.get("/api/auth/dashboard/")
+        with CaptureQueriesContext(connection) as warm:
+            self.client.get("/api/auth/dashboard/")
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get("/api/auth/dashboard/")
+
+        self.assertEqual(len(cold.captured_queries) - len(warm.captured_queries), 2)
+
+        Team.objects.create(name="Charlie")
+        response = self.client.get("/api/auth/dashboard/")
+        self.assertEqual([team["name"] for team in response.data["other_teams"]], ["Bravo", "Charlie"])
+
+
 class AuthTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -332,6 +541,7 @@ class AuthTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class PlayerImageUploadValidationTests(TestCase):
     def _build_test_image(self, name="profile.png", image_format="PNG"):
         buffer = BytesIO()
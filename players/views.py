@@ -2,19 +2,22 @@ from rest_framework import viewsets, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
-from django.db.models import Q
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from rest_framework_simplejwt.views import TokenObtainPairView
 from drf_spectacular.utils import extend_schema
 from django.db import transaction
-from .models import LeaveRequest, MembershipLeave, Player, RegistrationRequest
+from cricket_club.cache import CachedListMixin, ConditionalGetMixin
+from cricket_club.filters import QueryParamFilterMixin, choice, parse_bool
+from .models import LeaveRequest, Membership, MembershipLeave, Player, RegistrationRequest
 from .serializers import (
     LeaveRequestReviewSerializer,
     LeaveRequestSerializer,
     MembershipLeaveSerializer,
+    PLAYER_READ_MODELS,
     PlayerSerializer,
+    with_player_read_plan,
 )
 from .auth_serializers import (
     ApproveRegistrationSerializer,
@@ -22,20 +25,25 @@ from .auth_serializers import (
     RegisterSerializer,
     RegistrationRequestSerializer,
 )
-from teams.models import Team
-from teams.serializers import TeamSerializer
-from matches.models import Match
-from matches.serializers import MatchSerializer
-from financials.models import Transaction
-from financials.serializers import TransactionSerializer
-from media_gallery.models import Media
-from media_gallery.serializers import MediaSerializer
+from .dashboard import build_dashboard, get_dashboard_player
 
 User = get_user_model()
 
-class PlayerViewSet(viewsets.ModelViewSet):
+class PlayerViewSet(ConditionalGetMixin, CachedListMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
+    cache_models = PLAYER_READ_MODELS
+    filter_params = {
+        "role": ("role", choice(Player.ROLE_CHOICES)),
+        "membership_status": ("membership__status", choice(Membership.STATUS_CHOICES)),
+        "membership_active": ("membership__membership_active", parse_bool),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            return with_player_read_plan(queryset)
+        return queryset
 
     def get_permissions(self):
         if self.action in ("list", "retrieve"):
@@ -204,54 +212,10 @@ class PlayerDashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        player = getattr(request.user, "player", None)
+        player = get_dashboard_player(request.user)
         if not player:
             return Response({"error": "Player profile not found."}, status=status.HTTP_404_NOT_FOUND)
-        player.sync_membership_status()
-
-        teams = Team.objects.filter(players=player).distinct()
-        upcoming_matches = Match.objects.filter(
-            Q(team1__in=teams) | Q(team2__in=teams),
-            date__gte=timezone.now()
-        ).distinct().order_by("date")
-
-        other_teams = Team.objects.exclude(id__in=teams.values_list("id", flat=True)).order_by("name")
-
-        last_transaction = (
-            Transaction.objects.filter(player=player)
-            .order_by("-payment_date", "-due_date", "-id")
-            .first()
-        )
-
-        membership_transaction = (
-            Transaction.objects.filter(player=player, category="monthly", paid=False, waived=False)
-            .order_by("due_date", "id")
-            .first()
-        )
-
-        recent_media = Media.objects.filter(is_approved=True).order_by("-uploaded_at")[:10]
-
-        profile_picture_url = None
-        if player.profile_picture:
-            profile_picture_url = request.build_absolute_uri(player.profile_picture.url)
-
-        return Response({
-            "player": PlayerSerializer(player).data,
-            "profile_picture": profile_picture_url,
-            "teams": TeamSerializer(teams, many=True).data,
-            "other_teams": TeamSerializer(other_teams, many=True).data,
-            "upcoming_matches": MatchSerializer(upcoming_matches, many=True).data,
-            "last_transaction": TransactionSerializer(last_transaction).data if last_transaction else None,
-            "membership_payment": {
-                "required": bool(membership_transaction),
-                "transaction": (
-                    TransactionSerializer(membership_transaction).data
-                    if membership_transaction else None
-                )
-            },
-            "media": MediaSerializer(recent_media, many=True).data,
-            "media_upload_endpoint": "/api/media/"
-        }, status=status.HTTP_200_OK)
+        return Response(build_dashboard(player, request), status=status.HTTP_200_OK)
 
 
 class MembershipLeaveListCreateView(APIView):
@@ -1,11 +1,46 @@
 from rest_framework import serializers
-from cricket_club.upload_validators import validate_uploaded_image
+from cricket_club.images import ImageVariantField
+from cricket_club.upload_validators import ValidatedImageField
 from players.serializers import PlayerSerializer
 from .models import Team, Player  # Ensure Player is imported or available via apps.get_model
 
+TEAM_PLAYER_FIELDS = ("id", "first_name", "last_name", "role", "profile_picture")
+
+
+def wants_expanded_players(request):
+    if request is None:
+        return False
+    expand = request.query_params.get("expand", "")
+    return "players" in {value.strip() for value in expand.split(",")}
+
+
+class TeamPlayerSerializer(serializers.ModelSerializer):
+    """Compact roster entry; ``?expand=players`` swaps in the full ``PlayerSerializer``."""
+    name = serializers.SerializerMethodField()
+    thumbnail_url = ImageVariantField("thumbnail", source="profile_picture")
+
+    class Meta:
+        model = Player
+        fields = ['id', 'name', 'role', 'profile_picture', 'thumbnail_url']
+        read_only_fields = fields
+
+    def get_name(self, obj):
+        return f"{obj.first_name} {obj.last_name}".strip()
+
+
+class TeamSummarySerializer(serializers.ModelSerializer):
+    """Team without its roster, for directory-style listings."""
+    thumbnail_url = ImageVariantField("thumbnail", source="logo")
+
+    class Meta:
+        model = Team
+        fields = ['id', 'name', 'captain', 'logo', 'thumbnail_url']
+        read_only_fields = fields
+
+
 class TeamSerializer(serializers.ModelSerializer):
-    # 1. For Reading: Returns full player objects (Nested)
-    players = PlayerSerializer(many=True, read_only=True)
+    # 1. For Reading: Returns a compact roster (or full player objects with ?expand=players)
+    players = TeamPlayerSerializer(many=True, read_only=True)
 
     # 2. For Writing: Accepts a list of IDs (e.g., [1, 2, 5])
     # The 'source' argument maps this back to the 'players' field on your Model
@@ -15,11 +50,15 @@ class TeamSerializer(serializers.ModelSerializer):
         queryset=Player.objects.all(),
         source='players' 
     )
+    logo = ValidatedImageField(required=False, allow_null=True)
+    thumbnail_url = ImageVariantField("thumbnail", source="logo")
 
     class Meta:
         model = Team
         # Add 'player_ids' to the fields list
-        fields = ['id', 'name', 'captain', 'logo', 'players', 'player_ids']
+        fields = ['id', 'name', 'captain', 'logo', 'thumbnail_url', 'players', 'player_ids']
 
-    def validate_logo(self, value):
-        return validate_uploaded_image(value)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if wants_expanded_players(self.context.get("request")):
+            self.fields["players"] = PlayerSerializer(many=True, read_only=True)
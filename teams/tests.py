@@ -1,7 +1,10 @@
-from django.test import TestCase
+import tempfile
+from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from io import BytesIO
 from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
 from .models import Team
 from players.models import Player
 from .serializers import TeamSerializer
@@ -22,6 +25,7 @@ class TeamModelTest(TestCase):
         self.assertEqual(str(team), "Test Team")
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class TeamLogoValidationTest(TestCase):
     def _build_test_image(self):
         buffer = BytesIO()
@@ -56,3 +60,38 @@ class TeamLogoValidationTest(TestCase):
 
     def _build_captain(self):
         return Player.objects.create(first_name="Logo", last_name="Captain", age=29, role="all_rounder")
+
+
+class TeamRosterProjectionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.teams = []
+        for team_index in range(2):
+            team = Team.objects.create(name=f"Roster {team_index}")
+            for player_index in range(3):
+                team.players.add(
+                    Player.objects.create(
+                        first_name=f"P{team_index}{player_index}",
+                        last_name="Member",
+                        role="bowler",
+                        phone_number=f"830000{team_index}{player_index}00",
+                    )
+                )
+            self.teams.append(team)
+
+    def test_list_returns_compact_roster_in_constant_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/teams/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        roster_entry = response.data["results"][0]["players"][0]
+        self.assertEqual(set(roster_entry), {"id", "name", "role", "profile_picture", "thumbnail_url"})
+        self.assertEqual(roster_entry["name"], "P00 Member")
+
+    def test_expand_players_returns_full_player_objects(self):
+        response = self.client.get("/api/teams/", {"expand": "players"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        roster_entry = response.data["results"][0]["players"][0]
+        self.assertIn("membership", roster_entry)
+        self.assertIn("tournament_participations", roster_entry)
@@ -1,11 +1,29 @@
+from django.db.models import Prefetch
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from .models import Team
-from .serializers import TeamSerializer
+from cricket_club.cache import CachedListMixin, ConditionalGetMixin
+from cricket_club.filters import QueryParamFilterMixin
+from players.serializers import PLAYER_READ_MODELS, with_player_read_plan
+from .models import Player, Team
+from .serializers import TEAM_PLAYER_FIELDS, TeamSerializer, wants_expanded_players
 
-class TeamViewSet(viewsets.ModelViewSet):
+class TeamViewSet(ConditionalGetMixin, CachedListMixin, QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
+    cache_models = PLAYER_READ_MODELS
+    filter_params = {
+        "player": ("players", int),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ("list", "retrieve"):
+            return queryset
+        if wants_expanded_players(self.request):
+            players = with_player_read_plan(Player.objects.all())
+        else:
+            players = Player.objects.only(*TEAM_PLAYER_FIELDS)
+        return queryset.prefetch_related(Prefetch("players", queryset=players))
 
     def get_permissions(self):
         if self.action in ("list", "retrieve"):
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tournaments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tournament",
+            name="start_date",
+            field=models.DateField(db_index=True),
+        ),
+    ]
@@ -3,7 +3,7 @@ from players.models import Player
 
 class Tournament(models.Model):
     name = models.CharField(max_length=100)
-    start_date = models.DateField()
+    start_date = models.DateField(db_index=True)
     entry_fee = models.DecimalField(max_digits=10, decimal_places=2)
 
     def __str__(self):
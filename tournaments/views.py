@@ -1,11 +1,20 @@
 from rest_framework import viewsets
+from cricket_club.filters import QueryParamFilterMixin, parse_date
 from .models import Tournament, TournamentParticipation
 from .serializers import TournamentSerializer, TournamentParticipationSerializer
 
-class TournamentViewSet(viewsets.ModelViewSet):
+class TournamentViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = Tournament.objects.all()
     serializer_class = TournamentSerializer
+    filter_params = {
+        "start_from": ("start_date__gte", parse_date),
+        "start_to": ("start_date__lte", parse_date),
+    }
 
-class TournamentParticipationViewSet(viewsets.ModelViewSet):
+class TournamentParticipationViewSet(QueryParamFilterMixin, viewsets.ModelViewSet):
     queryset = TournamentParticipation.objects.all()
     serializer_class = TournamentParticipationSerializer
+    filter_params = {
+        "player": ("player_id", int),
+        "tournament": ("tournament_id", int),
+    }